@@ -0,0 +1,152 @@
+"""
+Project catalog benchmark: upsert throughput and filtered query latency.
+
+Upserts --projects synthetic cleaned extractions (free-text areas in mixed
+units, BHK spellings, amenities, towers and location highlights) into a
+catalog in a temporary directory, then times --queries filtered floorplan
+queries across the whole corpus. Reports median and p95 latency in
+milliseconds.
+
+    python benchmarks/catalog_query.py --projects 20000 --max-ms 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "brochure-analyzer"))
+
+from brochure_analyzer.catalog import Catalog  # noqa: E402
+
+CITIES = {
+    "Pune": ("Baner", "Wakad", "Hinjewadi", "Kharadi", "Hadapsar"),
+    "Mumbai": ("Powai", "Thane", "Andheri", "Borivali", "Chembur"),
+    "Bengaluru": ("Whitefield", "Sarjapur", "Hebbal", "Yelahanka", "Electronic City"),
+    "Hyderabad": ("Gachibowli", "Kondapur", "Kokapet", "Miyapur", "Kukatpally"),
+}
+BUILDERS = ("Godrej Properties", "Lodha", "Prestige", "Sobha", "Kolte Patil", "Brigade", "Puravankara", "Shapoorji")
+BHK_TYPES = ("1 BHK", "2BHK", "2.5 BHK", "3 BHK", "3 BHK + Study", "Three Bedroom", "4 BHK Duplex", "1 RK", "Studio")
+AMENITIES = ("Swimming Pool", "Gymnasium", "Club House", "Jogging Track", "Children's Play Area", "Yoga/Meditation Area",
+             "Party Lawn", "Indoor Games", "24x7 Security", "EV Charging Stations", "Rain Water Harvesting")
+CATEGORIES = ("Metro Station", "Airport", "School", "Hospital", "Shopping Center / Market / Mall", "Railway Station")
+
+QUERIES = (
+    {"city": "Pune", "bhk": 3, "max_sqft": 1200},
+    {"city": "mumbai", "locality": "Powai", "bhk": 2},
+    {"builder": "Lodha", "bhk": 3, "area": "carpet", "max_sqft": 1100},
+    {"city": "Bengaluru", "amenities": ["Swimming Pool", "Gymnasium"], "min_sqft": 1500},
+    {"city": "Mumbai", "bhk": 0},
+    {"city": "Hyderabad", "locality": "Kokapet", "unit_type": "duplex"},
+)
+
+
+def _area(rng: random.Random, sqft: float) -> str:
+    unit = rng.random()
+    if unit < 0.6:
+        return f"{sqft:,.0f} sq.ft."
+    if unit < 0.8:
+        return f"{sqft / 10.7639:.2f} Sq. Mtr"
+    if unit < 0.9:
+        return f"{sqft:.0f} - {sqft * 1.08:.0f} SFT"
+    return "Not Present"
+
+
+def make_extraction(rng: random.Random, project: int) -> Dict[str, Any]:
+    city = rng.choice(list(CITIES))
+    floorplans = []
+    for bhk_type in rng.sample(BHK_TYPES, rng.randint(2, 5)):
+        carpet = rng.uniform(350, 2400)
+        floorplans.append({
+            "bhkType": bhk_type,
+            "carpetArea": _area(rng, carpet),
+            "builtupArea": _area(rng, carpet * 1.15),
+            "superBuiltupArea": _area(rng, carpet * 1.35),
+            "saleableArea": "Not Present",
+            "totalArea": "Not Present",
+        })
+    towers = [f"Tower {chr(65 + i)}" for i in range(rng.randint(1, 8))]
+    return {
+        "projectName": f"Project {project}",
+        "projectAddress": {"Address": f"Survey {project}", "City": city, "Locality": rng.choice(CITIES[city])},
+        "builder": {"name": rng.choice(BUILDERS)},
+        "floorplanConfigs": floorplans,
+        "amenities": rng.sample(AMENITIES, rng.randint(3, len(AMENITIES))),
+        "area": {"project_area": f"{rng.uniform(1, 40):.1f} Acres", "open_area": f"{rng.randint(40, 80)}%"},
+        "tower_count": len(towers),
+        "tower_names": towers,
+        "unit_count": str(rng.randint(100, 2000)),
+        "rera": f"P5210{project:07d}",
+        "location_highlights": [
+            {"category": category, "location_name": f"{category} {i}", "distance": f"{rng.uniform(0.3, 25):.1f} Km"}
+            for i, category in enumerate(rng.sample(CATEGORIES, 4))
+        ],
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(projects: int, queries: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="catalog-bench-") as catalog_dir:
+        catalog = Catalog(catalog_dir)
+        extractions = [make_extraction(rng, project) for project in range(projects)]
+        start = time.perf_counter()
+        for project, extraction in enumerate(extractions):
+            catalog.upsert_project(f"project{project}", extraction)
+        ingest = time.perf_counter() - start
+
+        # Re-ingesting unchanged extractions should be a hash lookup each.
+        start = time.perf_counter()
+        for project, extraction in enumerate(extractions[:1000]):
+            catalog.upsert_project(f"project{project}", extraction)
+        unchanged = (time.perf_counter() - start) / min(projects, 1000)
+
+        def timed() -> List[float]:
+            latencies = []
+            for i in range(queries):
+                begin = time.perf_counter()
+                catalog.find_floorplans(**QUERIES[i % len(QUERIES)])
+                latencies.append((time.perf_counter() - begin) * 1000)
+            return latencies
+
+        timed()  # warm the page cache
+        latencies = timed()
+        stats = catalog.stats()
+        return {
+            "projects": stats["projects"],
+            "floorplans": stats["floorplans"],
+            "ingest_s": ingest,
+            "projects_per_s": stats["projects"] / ingest,
+            "unchanged_ms": unchanged * 1000,
+            "p50_ms": statistics.median(latencies),
+            "p95_ms": _percentile(latencies, 0.95),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the project catalog.")
+    parser.add_argument("--projects", type=int, default=20000, help="Projects to upsert (default: 20000)")
+    parser.add_argument("--queries", type=int, default=120)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the query p50 exceeds this")
+    args = parser.parse_args(argv)
+
+    result = run(args.projects, args.queries)
+    print(f"{result['projects']} projects ({result['floorplans']} floorplans) upserted in "
+          f"{result['ingest_s']:.1f}s ({result['projects_per_s']:.0f}/s); "
+          f"unchanged re-upsert {result['unchanged_ms']:.2f}ms")
+    print(f"filtered queries  p50={result['p50_ms']:.2f}ms  p95={result['p95_ms']:.2f}ms")
+    if args.max_ms is not None and result["p50_ms"] > args.max_ms:
+        print(f"[REGRESSION] query p50 {result['p50_ms']:.2f}ms > {args.max_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Import-time benchmark for the CLI entry paths.
+
+Each scenario is timed in a fresh interpreter (median of --repeat runs) and
+checked for modules it must not load. `extract` imports exactly what
+`brochure_analyzer.cli.run_extract` does and must never import agentic_doc,
+pydantic or the wrapper (which pulls in the retrieval index and catalog);
+`full` is the remote-parse path for comparison and is skipped when
+agentic_doc is not installed.
+
+    python benchmarks/import_time.py --repeat 7 --max-ms 400
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, Any, List, Optional
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "brochure-analyzer")
+
+PKG = "brochure_analyzer"
+HEAVY_MODULES = (
+    "agentic_doc", "pydantic", "fitz", "PIL", "numpy",
+    f"{PKG}.wrapper", f"{PKG}.retrieval", f"{PKG}.catalog",
+)
+
+# name -> (statements to time, modules that must stay unloaded)
+SCENARIOS = {
+    "cli": (f"import {PKG}.cli", HEAVY_MODULES),
+    "extract": (
+        f"import {PKG}.cli; from {PKG}.elements_breakdown import BrochureProcessor; "
+        f"from {PKG}.metrics import JsonlSink, Metrics, configure_logging, profiled; "
+        f"from {PKG}.raster_cache import RasterCache; from {PKG}.dedup_store import DedupStore",
+        ("agentic_doc", "pydantic", f"{PKG}.wrapper", f"{PKG}.retrieval", f"{PKG}.catalog"),
+    ),
+    "full": (f"import {PKG}.wrapper; import agentic_doc.parse", ()),
+}
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+{statements}
+elapsed = time.perf_counter() - start
+loaded = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"ms": elapsed * 1000, "loaded": loaded}}))
+"""
+
+
+def _run_once(statements: str) -> Optional[Dict[str, Any]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SOURCE_DIR, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statements=statements, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        if "ModuleNotFoundError" in proc.stderr:
+            return None
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(name: str, repeat: int) -> Dict[str, Any]:
+    statements, forbidden = SCENARIOS[name]
+    runs: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        run = _run_once(statements)
+        if run is None:
+            return {"scenario": name, "skipped": "dependency not installed"}
+        runs.append(run)
+    loaded = runs[-1]["loaded"]
+    return {
+        "scenario": name,
+        "median_ms": round(statistics.median(r["ms"] for r in runs), 1),
+        "min_ms": round(min(r["ms"] for r in runs), 1),
+        "loaded": loaded,
+        "unexpected": [m for m in loaded if m in forbidden],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario (default: 5)")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Fail if the median `extract` import time exceeds this")
+    parser.add_argument("--json", default=None, help="Write the results to this path")
+    args = parser.parse_args(argv)
+
+    results = [measure(name, args.repeat) for name in SCENARIOS]
+    failed = False
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['scenario']:>8}: skipped ({result['skipped']})")
+            continue
+        print(f"{result['scenario']:>8}: {result['median_ms']:8.1f} ms median  "
+              f"{result['min_ms']:8.1f} ms min  loads {', '.join(result['loaded']) or '-'}")
+        if result["unexpected"]:
+            print(f"[ERROR] {result['scenario']} imported {', '.join(result['unexpected'])}")
+            failed = True
+        if result["scenario"] == "extract" and args.max_ms is not None and result["median_ms"] > args.max_ms:
+            print(f"[ERROR] extract import took {result['median_ms']} ms (limit {args.max_ms} ms)")
+            failed = True
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
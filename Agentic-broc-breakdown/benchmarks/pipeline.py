@@ -0,0 +1,270 @@
+"""
+Offline pipeline benchmark: synthetic brochures, stub parser, no API key.
+
+Each scenario runs in a fresh interpreter inside a scratch working directory,
+with `benchmarks/stubs` ahead of any installed agentic_doc. Per run it
+records per-stage wall time, peak RSS, pages rendered (full-page renders and
+clip renders, counted across worker processes) and bytes written.
+
+Scenarios:
+  single:<preset>   parse_stage + extract_stage for one brochure, then the
+                    time to the first streamed asset and the legacy
+                    `_load_pages_with_fitz` page render on their own
+  batch:<preset>    process_brochure_batch over --batch-copies brochures
+  pipeline:<preset> the asyncio pipeline over the same brochures (spawned
+                    workers, so pages are not counted)
+
+    python benchmarks/pipeline.py --save-baseline
+    python benchmarks/pipeline.py --baseline benchmarks/baselines/pipeline.json --fail-on-regression
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, Any, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(os.path.dirname(BENCH_DIR), "brochure-analyzer")
+STUB_DIR = os.path.join(BENCH_DIR, "stubs")
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines", "pipeline.json")
+
+OUTPUT_DIRS = ("Data", "Responses", "JSON_DIR", "Cache")
+
+# Metrics compared against a baseline, with the smallest change worth
+# reporting; below it, noise dominates.
+COMPARED = {"wall": 0.05, "peak_rss_mb": 5.0, "bytes_written": 64 * 1024}
+
+
+def _peak_rss_mb(children: bool = False) -> float:
+    # Linux carries ru_maxrss across fork+exec, so a child would report the
+    # benchmark parent's peak; VmHWM belongs to this process image only.
+    if not children and os.path.exists("/proc/self/status"):
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1 << 20) if sys.platform == "darwin" else usage / 1024
+
+
+def _bytes_written(root: str) -> int:
+    total = 0
+    for name in OUTPUT_DIRS:
+        for dirpath, _, files in os.walk(os.path.join(root, name)):
+            total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+    return total
+
+
+def _count_renders(counter_path: str) -> None:
+    # Every get_pixmap call appends one byte ("p" full page, "c" clip) to a
+    # shared file; forked batch workers inherit both the patch and the fd.
+    import fitz
+
+    fd = os.open(counter_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+    original = fitz.Page.get_pixmap
+
+    def get_pixmap(page, *args, **kwargs):
+        os.write(fd, b"c" if kwargs.get("clip") is not None else b"p")
+        return original(page, *args, **kwargs)
+
+    fitz.Page.get_pixmap = get_pixmap
+
+
+def _renders(counter_path: str) -> Dict[str, int]:
+    with open(counter_path, "rb") as f:
+        data = f.read()
+    return {"pages_rendered": data.count(b"p"), "clip_renders": data.count(b"c")}
+
+
+def _child(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scenario in this (fresh) process; cwd is a scratch directory."""
+    counter_path = os.path.abspath("renders.count")
+    _count_renders(counter_path)
+    stages: Dict[str, float] = {}
+    result: Dict[str, Any] = {"stages": stages}
+    start = time.perf_counter()
+
+    if spec["kind"] == "single":
+        from brochure_analyzer.wrapper import parse_stage, extract_stage
+        from brochure_analyzer.elements_breakdown import BrochureProcessor
+
+        pdf_path = spec["pdfs"][0]
+        t = time.perf_counter()
+        job = parse_stage(pdf_path)
+        stages["parse"] = time.perf_counter() - t
+        t = time.perf_counter()
+        outcome = extract_stage(job)
+        stages["extract"] = time.perf_counter() - t
+        result["wall"] = time.perf_counter() - start
+        result["peak_rss_mb"] = _peak_rss_mb()
+        result["bytes_written"] = _bytes_written(".")
+        result["assets"] = len(outcome["assets"]["saved"])
+        result.update(_renders(counter_path))
+
+        with open(job["json_file"], "r", encoding="utf-8") as f:
+            extraction = json.load(f)["extraction"]
+        processor = BrochureProcessor(pdf_path, extraction, output_dir=None)
+        t = time.perf_counter()
+        for _ in processor.iter_assets():
+            stages["first_asset"] = time.perf_counter() - t
+            break
+        processor = BrochureProcessor(pdf_path, extraction, output_dir=None)
+        pages = sorted({int(r["page"]) for r in processor._asset_requests()})
+        t = time.perf_counter()
+        processor._load_pages_with_fitz(pages)
+        stages["render_pages"] = time.perf_counter() - t
+        return result
+
+    if spec["kind"] == "batch":
+        from brochure_analyzer.batch import process_brochure_batch
+
+        summary = process_brochure_batch(spec["pdfs"], workers=spec["workers"])
+    else:
+        import asyncio
+        from brochure_analyzer.async_pipeline import aprocess_brochure_batch
+
+        summary = asyncio.run(aprocess_brochure_batch(spec["pdfs"], extract_workers=spec["workers"]))
+    stages["batch"] = result["wall"] = time.perf_counter() - start
+    result["peak_rss_mb"] = max(_peak_rss_mb(), _peak_rss_mb(children=True))
+    result["bytes_written"] = _bytes_written(".")
+    result["assets"] = sum(len(r["assets"]["saved"]) for r in summary["results"] if r.get("assets"))
+    result["failed"] = summary["failed"]
+    if spec["kind"] == "batch":
+        result.update(_renders(counter_path))
+    return result
+
+
+def run_scenario(spec: Dict[str, Any], parse_delay: float) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix="brochure-bench-")
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [STUB_DIR, SOURCE_DIR, os.environ.get("PYTHONPATH")])),
+        BROCHURE_BENCH_PARSE_DELAY=str(parse_delay),
+        BROCHURE_BENCH_CORPUS=os.path.dirname(os.path.abspath(spec["pdfs"][0])),
+    )
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", json.dumps(spec)],
+            cwd=work_dir, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{spec['name']} failed:\n{proc.stderr.strip()}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _median(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {"stages": {}}
+    for key in runs[0]:
+        if key == "stages":
+            for stage in runs[0]["stages"]:
+                merged["stages"][stage] = round(statistics.median(r["stages"][stage] for r in runs), 4)
+        elif isinstance(runs[0][key], float):
+            merged[key] = round(statistics.median(r[key] for r in runs), 4)
+        else:
+            merged[key] = runs[-1][key]
+    return merged
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a line for every metric that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        pairs = [(metric, current.get(metric), previous.get(metric), floor) for metric, floor in COMPARED.items()]
+        pairs += [(f"stages.{stage}", value, previous.get("stages", {}).get(stage), COMPARED["wall"])
+                  for stage, value in current.get("stages", {}).items()]
+        for metric, now, before, floor in pairs:
+            if now is None or before is None:
+                continue
+            if now > before * (1 + tolerance) and now - before > floor:
+                regressions.append(f"{name} {metric}: {before} -> {now} (+{(now / before - 1) * 100 if before else 0:.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with synthetic brochures.")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Directory for the generated brochures")
+    parser.add_argument("--preset", action="append", default=None, help="Presets for single runs (default: all)")
+    parser.add_argument("--batch-preset", default="small-raster", help="Preset for batch runs (default: small-raster)")
+    parser.add_argument("--batch-copies", type=int, default=8, help="Brochures per batch run (default: 8)")
+    parser.add_argument("--workers", type=int, default=4, help="Batch worker processes (default: 4)")
+    parser.add_argument("--parse-delay", type=float, default=0.5, help="Stub parse latency in seconds (default: 0.5)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; medians are reported (default: 3)")
+    parser.add_argument("--no-batch", action="store_true", help="Only run the single-brochure scenarios")
+    parser.add_argument("--json", default=None, help="Write the results to this path")
+    parser.add_argument("--baseline", default=None, help="Compare against this results file")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help=f"Save the results as the new baseline (default path: {os.path.relpath(BASELINE_PATH)})")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (default: 0.2)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_child(json.loads(args.child))))
+        return 0
+
+    from synthetic import PRESETS, make_corpus
+
+    specs = []
+    for preset in args.preset or list(PRESETS):
+        pdfs = make_corpus(args.corpus, [preset])
+        specs.append({"name": f"single:{preset}", "kind": "single", "pdfs": pdfs})
+    if not args.no_batch:
+        pdfs = make_corpus(os.path.join(args.corpus, "batch"), [args.batch_preset], args.batch_copies)
+        for kind in ("batch", "pipeline"):
+            specs.append({"name": f"{kind}:{args.batch_preset}", "kind": kind, "pdfs": pdfs, "workers": args.workers})
+
+    results: Dict[str, Any] = {
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"parse_delay": args.parse_delay, "repeat": args.repeat, "batch_copies": args.batch_copies,
+                   "workers": args.workers},
+        "results": {},
+    }
+    for spec in specs:
+        summary = _median([run_scenario(spec, args.parse_delay) for _ in range(args.repeat)])
+        results["results"][spec["name"]] = summary
+        stages = "  ".join(f"{stage}={value:.3f}s" for stage, value in summary["stages"].items())
+        renders = f"  pages={summary['pages_rendered']} clips={summary['clip_renders']}" if "pages_rendered" in summary else ""
+        print(f"{spec['name']:<24} wall={summary['wall']:.3f}s  rss={summary['peak_rss_mb']:.0f}MB  "
+              f"written={summary['bytes_written'] / 1e6:.1f}MB  assets={summary['assets']}{renders}  {stages}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"] or baseline.get("host") != results["host"]:
+            print(f"[WARNING] {args.baseline} was recorded with other settings or on another host")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if not regressions:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
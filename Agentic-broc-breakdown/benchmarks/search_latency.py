@@ -0,0 +1,116 @@
+"""
+Retrieval index benchmark: ingest throughput and query latency.
+
+Builds an index of --chunks synthetic brochure chunks (brochure-like
+vocabulary, --chunks-per-project per project) in a temporary directory, then
+times --queries searches over the whole corpus and filtered to one project.
+The last case opens a second index on the same directory, as another batch
+worker would, and has it add a project before every search, so each search
+first picks up a new generation. Reports median and p95 latency in
+milliseconds.
+
+    python benchmarks/search_latency.py --chunks 300000 --max-ms 10
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "brochure-analyzer"))
+
+from brochure_analyzer.retrieval import HashedTfidfEmbedder, RetrievalIndex  # noqa: E402
+
+WORDS = (
+    "bhk carpet area sq.ft sq.m tower floor balcony kitchen bedroom bathroom living dining clubhouse pool gym "
+    "yoga deck jogging track garden lobby parking lift security rera possession launch price booking metro "
+    "station school hospital mall airport highway baner wakad hinjewadi thane powai whitefield pune mumbai "
+    "bengaluru builder developer amenities masterplan location vastu ventilation sunlight premium luxury "
+    "affordable township acres open green podium terrace duplex penthouse villa plot"
+).split()
+
+QUERIES = (
+    "3 bhk carpet area",
+    "swimming pool and gym",
+    "distance to metro station",
+    "possession date rera",
+    "clubhouse amenities",
+    "penthouse terrace price",
+)
+
+
+def _text(rng: random.Random, project: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(20, 80))
+    return f"project{project} " + " ".join(words)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(chunks: int, per_project: int, queries: int, dim: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="retrieval-bench-") as index_dir:
+        index = RetrievalIndex(index_dir, embedder=HashedTfidfEmbedder(dim))
+        projects = max(1, chunks // per_project)
+        start = time.perf_counter()
+        for project in range(projects):
+            index.add_project(f"project{project}", [{"text": _text(rng, project)} for _ in range(per_project)])
+        ingest = time.perf_counter() - start
+
+        writer = RetrievalIndex(index_dir, embedder=HashedTfidfEmbedder(dim))
+
+        def timed(concurrent_writes: bool = False, **kwargs: Any) -> List[float]:
+            latencies = []
+            for i in range(queries):
+                query = QUERIES[i % len(QUERIES)]
+                if concurrent_writes:
+                    writer.add_project(f"writer{i}", [{"text": _text(rng, projects + i)}])
+                begin = time.perf_counter()
+                index.search(query, k=10, **kwargs)
+                latencies.append((time.perf_counter() - begin) * 1000)
+            return latencies
+
+        timed()  # warm the page cache
+        full = timed()
+        filtered = timed(projects=f"project{projects // 2}")
+        writes = timed(concurrent_writes=True)
+        return {
+            "chunks": index.stats()["chunks"],
+            "ingest_s": ingest,
+            "chunks_per_s": index.stats()["chunks"] / ingest,
+            "all_p50_ms": statistics.median(full),
+            "all_p95_ms": _percentile(full, 0.95),
+            "project_p50_ms": statistics.median(filtered),
+            "project_p95_ms": _percentile(filtered, 0.95),
+            "writer_p50_ms": statistics.median(writes),
+            "writer_p95_ms": _percentile(writes, 0.95),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the retrieval index.")
+    parser.add_argument("--chunks", type=int, default=300000, help="Chunks to index (default: 300000)")
+    parser.add_argument("--chunks-per-project", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the corpus-wide p50 exceeds this")
+    args = parser.parse_args(argv)
+
+    result = run(args.chunks, args.chunks_per_project, args.queries, args.dim)
+    print(f"{result['chunks']} chunks ingested in {result['ingest_s']:.1f}s ({result['chunks_per_s']:.0f}/s)")
+    print(f"all projects  p50={result['all_p50_ms']:.2f}ms  p95={result['all_p95_ms']:.2f}ms")
+    print(f"one project   p50={result['project_p50_ms']:.2f}ms  p95={result['project_p95_ms']:.2f}ms")
+    print(f"with a writer p50={result['writer_p50_ms']:.2f}ms  p95={result['writer_p95_ms']:.2f}ms")
+    if args.max_ms is not None and result["all_p50_ms"] > args.max_ms:
+        print(f"[REGRESSION] corpus-wide p50 {result['all_p50_ms']:.2f}ms > {args.max_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
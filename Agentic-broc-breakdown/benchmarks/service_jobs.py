@@ -0,0 +1,116 @@
+"""
+Service benchmark: warm workers behind the job queue versus one script per brochure.
+
+Both sides use the synthetic corpus and the stub parser, so no API key is
+needed. The baseline starts a fresh interpreter per brochure that runs
+`process_brochure_pdf` in its own scratch directory (as a cron job or shell
+loop would); the service is started once and brochures are submitted over
+HTTP. Reports:
+
+  latency     submission to completion for one brochure on an idle system
+              (median of --latency-runs)
+  throughput  jobs per minute for --jobs distinct brochures submitted at
+              once, with --workers scripts or workers in parallel
+
+    python benchmarks/service_jobs.py --jobs 24 --workers 2 --parse-delay 0.2
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(os.path.dirname(BENCH_DIR), "brochure-analyzer")
+STUB_DIR = os.path.join(BENCH_DIR, "stubs")
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus", "service")
+
+SCRIPT = "import sys; from brochure_analyzer.wrapper import process_brochure_pdf; process_brochure_pdf(sys.argv[1])"
+
+# Spawned workers inherit sys.path and the environment from this process.
+sys.path[:0] = [STUB_DIR, SOURCE_DIR, BENCH_DIR]
+
+from brochure_analyzer.service import BrochureService, ServiceClient  # noqa: E402
+from synthetic import make_corpus  # noqa: E402
+
+
+def _run_script(pdf: str) -> float:
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="service-bench-script-") as cwd:
+        subprocess.run([sys.executable, "-c", SCRIPT, pdf], cwd=cwd, env=os.environ.copy(), check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run_scripts(latency_pdfs: List[str], pdfs: List[str], workers: int) -> Dict[str, float]:
+    latencies = [_run_script(pdf) for pdf in latency_pdfs]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(_run_script, pdfs))
+    wall = time.perf_counter() - start
+    return {"latency_s": statistics.median(latencies), "jobs_per_min": len(pdfs) / wall * 60}
+
+
+def run_service(latency_pdfs: List[str], pdfs: List[str], workers: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix="service-bench-") as service_dir:
+        service = BrochureService(service_dir, workers=workers).start()
+        server = service.serve(port=0)
+        client = ServiceClient(f"http://127.0.0.1:{server.server_port}")
+        try:
+            # Wait for the workers to come up; a long-running service pays this once.
+            warm = client.submit(latency_pdfs[0], name="warmup")
+            client.wait(warm["id"])
+
+            latencies = []
+            for pdf in latency_pdfs[1:]:
+                start = time.perf_counter()
+                job = client.wait(client.submit(pdf)["id"])
+                latencies.append(time.perf_counter() - start)
+                assert job["status"] == "done", job
+
+            start = time.perf_counter()
+            jobs = [client.submit(pdf)["id"] for pdf in pdfs]
+            failed = [job for job in (client.wait(job_id) for job_id in jobs) if job["status"] != "done"]
+            wall = time.perf_counter() - start
+            assert not failed, failed
+        finally:
+            service.stop()
+    return {"latency_s": statistics.median(latencies), "jobs_per_min": len(pdfs) / wall * 60}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the brochure service against a script per brochure.")
+    parser.add_argument("--jobs", type=int, default=24, help="Brochures in the throughput run (default: 24)")
+    parser.add_argument("--workers", type=int, default=2, help="Parallel scripts or service workers (default: 2)")
+    parser.add_argument("--latency-runs", type=int, default=5)
+    parser.add_argument("--preset", default="small-raster")
+    parser.add_argument("--parse-delay", type=float, default=0.2, help="Simulated parser latency in seconds")
+    args = parser.parse_args(argv)
+
+    # Distinct brochures, so neither side is helped by the result cache or dedupe.
+    pdfs = make_corpus(CORPUS_DIR, [args.preset], copies=args.jobs + 2 * (args.latency_runs + 1))
+    os.environ["BROCHURE_BENCH_PARSE_DELAY"] = str(args.parse_delay)
+    os.environ["BROCHURE_BENCH_CORPUS"] = CORPUS_DIR
+    os.environ["PYTHONPATH"] = os.pathsep.join([STUB_DIR, SOURCE_DIR])
+    script_latency = pdfs[:args.latency_runs]
+    service_latency = pdfs[args.latency_runs:2 * args.latency_runs + 1]
+    throughput = pdfs[2 * args.latency_runs + 1:]
+    half = len(throughput) // 2 or 1
+
+    results = {
+        "script": run_scripts(script_latency, throughput[:half], args.workers),
+        "service": run_service(service_latency, throughput[half:], args.workers),
+    }
+    for name, result in results.items():
+        print(f"{name:<8} latency={result['latency_s']:.2f}s  throughput={result['jobs_per_min']:.1f} jobs/min")
+    print(f"service speedup: latency x{results['script']['latency_s'] / results['service']['latency_s']:.1f}, "
+          f"throughput x{results['service']['jobs_per_min'] / results['script']['jobs_per_min']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Offline stand-in for the agentic_doc package, for benchmarks only."""
@@ -0,0 +1,57 @@
+"""
+Drop-in stub for `agentic_doc.parse.parse`.
+
+Put `benchmarks/stubs` first on sys.path (or PYTHONPATH) and the pipeline's
+lazy `from agentic_doc.parse import parse` resolves here. Instead of calling
+LandingAI, `parse` sleeps for BROCHURE_BENCH_PARSE_DELAY seconds (default 0)
+and returns the `<name>.extraction.json` written next to each PDF by
+`benchmarks/synthetic.py`. PDFs passed as bytes are matched by content hash
+against the PDFs in BROCHURE_BENCH_CORPUS.
+"""
+import os
+import glob
+import json
+import time
+import hashlib
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
+
+SIDECAR_SUFFIX = ".extraction.json"
+
+_corpus_index: Optional[Dict[str, str]] = None
+
+
+def _sidecar_for_bytes(data: bytes) -> str:
+    global _corpus_index
+    if _corpus_index is None:
+        corpus = os.environ.get("BROCHURE_BENCH_CORPUS", "")
+        _corpus_index = {}
+        for path in glob.glob(os.path.join(corpus, "**", "*.pdf"), recursive=True):
+            with open(path, "rb") as f:
+                _corpus_index[hashlib.sha256(f.read()).hexdigest()] = os.path.splitext(path)[0] + SIDECAR_SUFFIX
+    sidecar = _corpus_index.get(hashlib.sha256(data).hexdigest())
+    if sidecar is None:
+        raise ValueError("PDF bytes do not match any brochure in BROCHURE_BENCH_CORPUS")
+    return sidecar
+
+
+def parse(documents: Any, extraction_schema: Any = None, result_save_dir: Optional[str] = None, **kwargs: Any) -> List[SimpleNamespace]:
+    results = []
+    for document in documents if isinstance(documents, list) else [documents]:
+        if isinstance(document, (bytes, bytearray)):
+            sidecar, stem = _sidecar_for_bytes(bytes(document)), "document"
+        else:
+            sidecar = os.path.splitext(str(document))[0] + SIDECAR_SUFFIX
+            stem = os.path.splitext(os.path.basename(str(document)))[0]
+        with open(sidecar, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        time.sleep(float(os.environ.get("BROCHURE_BENCH_PARSE_DELAY", "0")))
+
+        result_path = None
+        if result_save_dir:
+            os.makedirs(result_save_dir, exist_ok=True)
+            result_path = os.path.join(result_save_dir, f"{stem}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+            with open(result_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        results.append(SimpleNamespace(result_path=result_path, markdown=data["markdown"], extraction=data["extraction"]))
+    return results
@@ -0,0 +1,231 @@
+"""
+Synthetic brochure PDFs with matching extraction JSON.
+
+Every brochure is built with PyMuPDF from a seeded layout: a cover page with
+the builder logo and masterplan, floorplan and amenity pages, and a location
+map page. Assets are drawn as embedded raster images, vector drawings, or a
+mix of both. Next to each `<name>.pdf` the generator writes
+`<name>.extraction.json`: a parse result ({"markdown", "extraction"}) in the
+`schema.schema` shape whose bboxes point at the drawn assets. The stub
+parser in `benchmarks/stubs` serves those files in place of LandingAI.
+
+    python benchmarks/synthetic.py benchmarks/corpus --preset all
+"""
+import io
+import os
+import sys
+import json
+import random
+import argparse
+from typing import Dict, Any, List, Optional
+
+import fitz
+import numpy as np
+from PIL import Image
+
+CONTENT_TYPES = ("raster", "vector", "mixed")
+SIDECAR_SUFFIX = ".extraction.json"
+
+PAGE_SIZES = {
+    "a4": (595, 842),
+    "a3": (842, 1191),
+    "a0": (2384, 3370),
+    "landscape": (1191, 842),
+}
+
+# name -> keyword arguments for make_brochure
+PRESETS = {
+    "small-raster": {"pages": 4, "page_size": "a4", "image_px": 1200, "content": "raster"},
+    "vector": {"pages": 8, "page_size": "a4", "image_px": 0, "content": "vector"},
+    "poster": {"pages": 2, "page_size": "a0", "image_px": 4000, "content": "raster"},
+    "many-pages": {"pages": 40, "page_size": "a4", "image_px": 1000, "content": "mixed"},
+}
+
+BHK_TYPES = ("1 BHK", "2 BHK", "2.5 BHK", "3 BHK", "4 BHK")
+AMENITIES = ("Swimming Pool", "Gymnasium", "Clubhouse", "Jogging Track", "Kids Play Area", "Yoga Deck", "Library")
+
+
+def _raster(width: int, height: int, rng: np.random.Generator, fmt: str = "JPEG") -> bytes:
+    # Smooth gradients plus noise: realistic JPEG sizes, cheap to generate.
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = rng.uniform(0, 255, 3)
+    channels = [
+        (base[i] + 80 * np.sin(x / (width / rng.uniform(1, 6)) + i) + 60 * np.cos(y / (height / rng.uniform(1, 6))))
+        for i in range(3)
+    ]
+    pixels = np.stack(channels, axis=-1) + rng.normal(0, 12, (height, width, 3))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=85)
+    return buffer.getvalue()
+
+
+def _vector(page: fitz.Page, rect: fitz.Rect, rng: random.Random, label: str) -> None:
+    # A floorplan-like drawing: outer walls, partitions, doors and labels.
+    shape = page.new_shape()
+    shape.draw_rect(rect)
+    shape.finish(color=(0.1, 0.1, 0.1), width=max(1.0, rect.width / 150))
+    for _ in range(rng.randint(4, 9)):
+        if rng.random() < 0.5:
+            x = rng.uniform(rect.x0, rect.x1)
+            shape.draw_line((x, rect.y0), (x, rng.uniform(rect.y0, rect.y1)))
+        else:
+            y = rng.uniform(rect.y0, rect.y1)
+            shape.draw_line((rect.x0, y), (rng.uniform(rect.x0, rect.x1), y))
+    shape.finish(color=(0.2, 0.2, 0.2), width=max(0.5, rect.width / 300))
+    for _ in range(rng.randint(2, 5)):
+        centre = fitz.Point(rng.uniform(rect.x0, rect.x1), rng.uniform(rect.y0, rect.y1))
+        shape.draw_circle(centre, rect.width / 30)
+    shape.finish(color=(0.5, 0.1, 0.1), fill=(0.95, 0.9, 0.8), width=0.5)
+    shape.commit()
+    page.insert_text(rect.tl + (6, 14), label, fontsize=max(8, rect.width / 25))
+
+
+def _place(
+    page: fitz.Page,
+    rect: fitz.Rect,
+    content: str,
+    image_px: int,
+    rng: random.Random,
+    nrng: np.random.Generator,
+    label: str,
+) -> None:
+    kind = content if content != "mixed" else rng.choice(("raster", "vector"))
+    if kind == "vector" or image_px <= 0:
+        _vector(page, rect, rng, label)
+        return
+    scale = image_px / max(rect.width, rect.height)
+    width, height = max(8, round(rect.width * scale)), max(8, round(rect.height * scale))
+    page.insert_image(rect, stream=_raster(width, height, nrng), keep_proportion=False)
+
+
+def _bbox(page: fitz.Page, rect: fitz.Rect) -> str:
+    width, height = page.rect.width, page.rect.height
+    return f"{rect.x0 / width:.4f},{rect.y0 / height:.4f},{rect.x1 / width:.4f},{rect.y1 / height:.4f}"
+
+
+def make_brochure(
+    path: str,
+    pages: int = 4,
+    page_size: str = "a4",
+    image_px: int = 1200,
+    content: str = "raster",
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Write a synthetic brochure to `path` and its parse result next to it.
+
+    `pages` (at least 2) is the page count, `page_size` a key of PAGE_SIZES,
+    `image_px` the long edge of each embedded image and `content` one of
+    CONTENT_TYPES. Returns the parse result dict that was written.
+    """
+    if content not in CONTENT_TYPES:
+        raise ValueError(f"content must be one of {CONTENT_TYPES}, got '{content}'")
+    pages = max(2, pages)
+    page_w, page_h = PAGE_SIZES[page_size]
+    rng = random.Random(seed)
+    nrng = np.random.default_rng(seed)
+    name = os.path.splitext(os.path.basename(path))[0]
+    margin = page_w * 0.06
+
+    extraction: Dict[str, Any] = {
+        "projectName": f"Synthetic {name}",
+        "projectAddress": {"Address": f"{rng.randint(1, 300)} Test Road", "City": "Pune", "Locality": "Baner"},
+        "builder": {"name": "Synthetic Developers", "BuilderWebsite": "https://example.com", "Font": "Helvetica"},
+        "floorplanConfigs": [],
+        "amenities": [],
+        "masterplanImage": {},
+        "locationMapImage": {},
+        "interior_specification": ["Vitrified tiles", "Modular kitchen"],
+        "amenitiesImages": [],
+        "area": {"project_area": "5 acres", "open_area": "70%", "green_area": "2 acres"},
+        "tower_count": rng.randint(1, 6),
+        "tower_names": ["A", "B"],
+        "unit_count": str(rng.randint(100, 900)),
+        "rera": f"P5210000{rng.randint(1000, 9999)}",
+        "location_highlights": [{"category": "School", "location_name": "Test School", "distance": "1.2 km"}],
+    }
+    markdown: List[str] = [f"# {extraction['projectName']}"]
+
+    with fitz.open() as pdf:
+        # Cover: logo and masterplan.
+        page = pdf.new_page(width=page_w, height=page_h)
+        logo = fitz.Rect(margin, margin, margin + page_w * 0.2, margin + page_w * 0.08)
+        _place(page, logo, content, max(64, image_px // 6), rng, nrng, "LOGO")
+        extraction["builder"].update(boundingBoxLTRB=_bbox(page, logo), pageNumber=0)
+        masterplan = fitz.Rect(margin, page_h * 0.25, page_w - margin, page_h - margin)
+        _place(page, masterplan, content, image_px, rng, nrng, "MASTERPLAN")
+        extraction["masterplanImage"] = {"boundingBoxLTRB": _bbox(page, masterplan), "pageNumber": 0}
+        page.insert_text((margin, page_h * 0.2), extraction["projectName"], fontsize=page_w / 30)
+
+        # Inner pages alternate floorplans and amenities, two per page.
+        for page_num in range(1, pages - 1):
+            page = pdf.new_page(width=page_w, height=page_h)
+            for slot in range(2):
+                top = page_h * (0.08 + 0.46 * slot)
+                rect = fitz.Rect(margin, top, page_w - margin, top + page_h * 0.4)
+                if page_num % 2:
+                    bhk = BHK_TYPES[(page_num + slot) % len(BHK_TYPES)]
+                    area = f"{rng.randint(550, 2400)} sq.ft"
+                    _place(page, rect, content, image_px, rng, nrng, bhk)
+                    extraction["floorplanConfigs"].append(
+                        {"bhkType": bhk, "totalArea": area, "carpetArea": area, "boundingBoxLTRB": _bbox(page, rect), "pageNumber": page_num}
+                    )
+                    markdown.append(f"{bhk}: {area}")
+                else:
+                    label = AMENITIES[(page_num + slot) % len(AMENITIES)]
+                    # Amenity images are kept large enough for the HD filter.
+                    _place(page, rect, "raster" if image_px else content, max(image_px, 1400), rng, nrng, label)
+                    extraction["amenitiesImages"].append(
+                        {"amenityLabel": f"{label} {page_num}", "boundingBoxLTRB": _bbox(page, rect), "pageNumber": page_num}
+                    )
+                    if label not in extraction["amenities"]:
+                        extraction["amenities"].append(label)
+
+        # Last page: location map.
+        page = pdf.new_page(width=page_w, height=page_h)
+        location = fitz.Rect(margin, margin, page_w - margin, page_h * 0.6)
+        _place(page, location, content, image_px, rng, nrng, "LOCATION")
+        extraction["locationMapImage"] = {"boundingBoxLTRB": _bbox(page, location), "pageNumber": pages - 1}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        pdf.save(path, garbage=3, deflate=True)
+
+    result = {"markdown": "\n\n".join(markdown), "extraction": extraction}
+    with open(sidecar_path(path), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def sidecar_path(pdf_path: str) -> str:
+    return os.path.splitext(pdf_path)[0] + SIDECAR_SUFFIX
+
+
+def make_corpus(out_dir: str, presets: Optional[List[str]] = None, copies: int = 1) -> List[str]:
+    """Generate `copies` brochures per preset into `out_dir`; return their paths."""
+    paths = []
+    for name in presets or list(PRESETS):
+        for copy in range(copies):
+            path = os.path.join(out_dir, f"{name}-{copy}.pdf" if copies > 1 else f"{name}.pdf")
+            if not os.path.exists(path) or not os.path.exists(sidecar_path(path)):
+                make_brochure(path, seed=copy, **PRESETS[name])
+            paths.append(path)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic brochure PDFs with extraction JSON.")
+    parser.add_argument("out_dir", help="Output directory")
+    parser.add_argument("--preset", action="append", choices=sorted(PRESETS) + ["all"], default=None,
+                        help="Preset to generate (repeatable; default: all)")
+    parser.add_argument("--copies", type=int, default=1, help="Brochures per preset, each with its own seed")
+    args = parser.parse_args(argv)
+
+    presets = None if not args.preset or "all" in args.preset else args.preset
+    for path in make_corpus(args.out_dir, presets, args.copies):
+        print(f"{path}  {os.path.getsize(path) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
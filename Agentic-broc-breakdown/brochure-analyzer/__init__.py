@@ -1,6 +0,0 @@
-from .wrapper import process_brochure_pdf
-from . import schema
-from . import elements_breakdown
-from . import wrapper
-
-__all__=["process_brochure_pdf","elements_breakdown","wrapper","schema"]
\ No newline at end of file
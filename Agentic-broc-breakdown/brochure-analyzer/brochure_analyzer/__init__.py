@@ -0,0 +1,30 @@
+import importlib
+
+# Submodules and public functions are imported on first attribute access, so
+# importing the package (or one light submodule) does not load PyMuPDF,
+# agentic_doc or the whole pipeline up front.
+_LAZY_ATTRS = {
+    "process_brochure_pdf": "wrapper",
+    "process_brochure_bytes": "wrapper",
+    "process_brochure_batch": "batch",
+    "aprocess_brochure_pdf": "async_pipeline",
+    "aprocess_brochure_batch": "async_pipeline",
+}
+_SUBMODULES = ("schema","elements_breakdown","wrapper","batch","cache","async_pipeline","parse_dispatch","split_parse","page_filter","raster_cache","dedup_store","bbox_validation","metrics","retrieval","catalog","service","cli")
+
+__all__=["process_brochure_pdf","process_brochure_bytes","process_brochure_batch","aprocess_brochure_pdf","aprocess_brochure_batch","elements_breakdown","wrapper","schema","batch","cache","async_pipeline","parse_dispatch","split_parse","page_filter","raster_cache","dedup_store","bbox_validation","metrics","retrieval","catalog","service","cli"]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
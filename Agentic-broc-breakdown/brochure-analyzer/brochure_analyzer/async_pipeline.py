@@ -0,0 +1,139 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+from brochure_analyzer.cache import ResultCache
+from brochure_analyzer.metrics import merge_summaries
+from brochure_analyzer.wrapper import configure_logging, parse_stage, extract_stage
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+async def aprocess_brochure_pdf(
+    pdf_path: str,
+    cache: Optional[ResultCache] = None,
+    parse_fn: Optional[Callable[..., Any]] = None,
+    parse_executor: Optional[Executor] = None,
+    extract_executor: Optional[Executor] = None,
+) -> Dict[str, Any]:
+    """
+    Async counterpart of `process_brochure_pdf`.
+
+    The blocking remote parse runs on `parse_executor` (default: the loop's
+    thread pool) and the CPU-bound extraction on `extract_executor`, so the
+    event loop stays free while either is in progress.
+    """
+    loop = asyncio.get_running_loop()
+    cache = cache if cache is not None else ResultCache()
+    job = await loop.run_in_executor(parse_executor, parse_stage, pdf_path, cache, parse_fn)
+    if job.get("result"):
+        return job["result"]
+    return await loop.run_in_executor(extract_executor, extract_stage, job, cache)
+
+
+async def aprocess_brochure_batch(
+    pdf_paths: List[str],
+    parse_concurrency: int = 4,
+    extract_workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+    parse_fn: Optional[Callable[..., Any]] = None,
+    use_processes: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run a batch as a two-stage pipeline: remote parse -> local extraction.
+
+    Up to `parse_concurrency` parse requests are in flight at once while
+    `extract_workers` processes crop and encode brochures whose parse already
+    finished. The hand-off queue holds at most `queue_size` parsed jobs
+    (default: twice the extraction workers); when it is full, parsing pauses
+    until extraction catches up. Throughput approaches the slower stage
+    rather than the sum of both.
+
+    Returns the same summary shape as `batch.process_brochure_batch`.
+    """
+    extract_workers = extract_workers or os.cpu_count() or 1
+    queue_size = queue_size or 2 * extract_workers
+    cache = cache if cache is not None else ResultCache()
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+
+    pending: asyncio.Queue = asyncio.Queue()
+    for path in pdf_paths:
+        pending.put_nowait(path)
+    parsed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    results: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+
+    parse_pool = ThreadPoolExecutor(max_workers=parse_concurrency, thread_name_prefix="parse")
+    if use_processes:
+        # Parse threads are live while workers start, so never fork: a child
+        # forked mid-transaction can inherit a held SQLite cache lock.
+        extract_pool = ProcessPoolExecutor(
+            max_workers=extract_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_logging,
+            initargs=(logging.getLogger().getEffectiveLevel(),),
+        )
+    else:
+        extract_pool = ThreadPoolExecutor(max_workers=extract_workers)
+
+    async def parse_worker() -> None:
+        while True:
+            try:
+                pdf_path = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                job = await loop.run_in_executor(parse_pool, parse_stage, pdf_path, cache, parse_fn)
+            except Exception as e:
+                errors.append({"pdf_path": pdf_path, "error": f"{type(e).__name__}: {e}"})
+                logger.error(f"[PIPELINE] Parse failed {pdf_path}: {e}")
+                continue
+            if job.get("result"):
+                results.append(job["result"])
+                continue
+            await parsed.put(job)
+
+    async def extract_worker() -> None:
+        while True:
+            job = await parsed.get()
+            if job is _DONE:
+                return
+            try:
+                result = await loop.run_in_executor(extract_pool, extract_stage, job, cache)
+                results.append(result)
+                logger.info(f"[PIPELINE] Done {job['pdf_path']}")
+            except Exception as e:
+                errors.append({"pdf_path": job["pdf_path"], "error": f"{type(e).__name__}: {e}"})
+                logger.error(f"[PIPELINE] Extraction failed {job['pdf_path']}: {e}")
+
+    try:
+        extractors = [asyncio.create_task(extract_worker()) for _ in range(extract_workers)]
+        await asyncio.gather(*(parse_worker() for _ in range(parse_concurrency)))
+        for _ in extractors:
+            await parsed.put(_DONE)
+        await asyncio.gather(*extractors)
+    finally:
+        parse_pool.shutdown()
+        extract_pool.shutdown()
+
+    results.sort(key=lambda r: r["project_name"])
+    errors.sort(key=lambda e: e["pdf_path"])
+    return {
+        "status": 200,
+        "total": len(pdf_paths),
+        "succeeded": len(results),
+        "failed": len(errors),
+        "elapsed": time.perf_counter() - start,
+        "results": results,
+        "errors": errors,
+        "timings": merge_summaries(*(result.get("timings") for result in results)),
+    }
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+from brochure_analyzer.metrics import JsonlSink, Metrics, merge_summaries
+from brochure_analyzer.catalog import Catalog
+from brochure_analyzer.retrieval import RetrievalIndex
+from brochure_analyzer.wrapper import configure_logging, process_brochure_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def collect_pdf_paths(source: str) -> List[str]:
+    """
+    Resolve a batch source into a list of PDF paths.
+
+    `source` is either a directory (searched recursively for *.pdf) or a
+    manifest file listing one PDF path per line. Blank lines and lines
+    starting with '#' are ignored; relative paths are resolved against the
+    manifest's directory.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+        return sorted(paths)
+
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"Batch source not found: {source}")
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def _process_one(
+    pdf_path: str,
+    profile_dir: Optional[str] = None,
+    metrics_jsonl: Optional[str] = None,
+    index_dir: Optional[str] = None,
+    catalog_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    # Runs inside a worker process; never lets an exception escape so one
+    # bad brochure cannot take down the pool.
+    start = time.perf_counter()
+    sink = JsonlSink(metrics_jsonl) if metrics_jsonl else None
+    metrics = Metrics(sinks=[sink] if sink else None, run=os.path.splitext(os.path.basename(pdf_path))[0])
+    try:
+        index = RetrievalIndex(index_dir) if index_dir else None
+        catalog = Catalog(catalog_dir) if catalog_dir else None
+        result = process_brochure_pdf(pdf_path, metrics=metrics, profile_dir=profile_dir, index=index, catalog=catalog)
+        return {"pdf_path": pdf_path, "ok": True, "result": result, "elapsed": time.perf_counter() - start}
+    except Exception as e:
+        logger.exception(f"[ERROR] Failed to process {pdf_path}")
+        return {
+            "pdf_path": pdf_path,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+            "elapsed": time.perf_counter() - start,
+        }
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+def process_brochure_batch(
+    pdf_paths: List[str],
+    workers: Optional[int] = None,
+    profile_dir: Optional[str] = None,
+    metrics_jsonl: Optional[str] = None,
+    index_dir: Optional[str] = None,
+    catalog_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Process many brochure PDFs across a process pool.
+
+    Every brochure is attempted; failures are collected instead of aborting
+    the batch. Already-processed brochures are skipped by
+    `process_brochure_pdf` as usual. With `profile_dir`, each brochure is
+    profiled into `<profile_dir>/<project_name>.prof`; with `metrics_jsonl`,
+    every span, counter and histogram event is appended to that file (one
+    JSON object per line, from all workers). With `index_dir`, every
+    brochure is added to the retrieval index there as it completes, and with
+    `catalog_dir` its cleaned JSON is upserted into that catalog. The
+    summary's "timings" merge the per-brochure timing summaries.
+
+    Returns:
+        dict: {
+            "status": 200,
+            "total": int,
+            "succeeded": int,
+            "failed": int,
+            "elapsed": float,
+            "results": [result dict, ...],
+            "errors": [{"pdf_path": str, "error": str}, ...],
+            "timings": {"spans": {...}, "counters": {...}, "histograms": {...}}
+        }
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results, errors = [], []
+
+    if workers == 1:
+        outcomes = (_process_one(path, profile_dir, metrics_jsonl, index_dir, catalog_dir) for path in pdf_paths)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = [pool.submit(_process_one, path, profile_dir, metrics_jsonl, index_dir, catalog_dir) for path in pdf_paths]
+        outcomes = (future.result() for future in as_completed(futures))
+
+    try:
+        for outcome in outcomes:
+            if outcome["ok"]:
+                results.append(outcome["result"])
+                logger.info(f"[BATCH] Done {outcome['pdf_path']} ({outcome['elapsed']:.1f}s)")
+            else:
+                errors.append({"pdf_path": outcome["pdf_path"], "error": outcome["error"]})
+                logger.error(f"[BATCH] Failed {outcome['pdf_path']}: {outcome['error']}")
+    finally:
+        if workers != 1:
+            pool.shutdown()
+
+    # as_completed yields in finish order; keep the summary stable.
+    results.sort(key=lambda r: r["project_name"])
+    errors.sort(key=lambda e: e["pdf_path"])
+
+    return {
+        "status": 200,
+        "total": len(pdf_paths),
+        "succeeded": len(results),
+        "failed": len(errors),
+        "elapsed": time.perf_counter() - start,
+        "results": results,
+        "errors": errors,
+        "timings": merge_summaries(*(result.get("timings") for result in results)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Process a directory or manifest of brochure PDFs in parallel.")
+    parser.add_argument("source", help="Directory of PDFs or a manifest file with one PDF path per line")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-o", "--summary", default=None, help="Write the batch summary JSON to this path")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Overlap remote parsing with local extraction (asyncio pipeline)")
+    parser.add_argument("--parse-concurrency", type=int, default=4,
+                        help="Parse requests in flight with --pipeline (default: 4)")
+    parser.add_argument("--max-rps", type=float, default=None,
+                        help="With --pipeline, dispatch parses through a rate-limited, retrying controller")
+    parser.add_argument("--profile-dir", default=None,
+                        help="Profile each brochure with cProfile into <dir>/<project>.prof (not with --pipeline)")
+    parser.add_argument("--metrics-jsonl", default=None,
+                        help="Append every timing and counter event to this JSON-lines file (not with --pipeline)")
+    parser.add_argument("--index-dir", default=None,
+                        help="Add each brochure to the Q&A retrieval index in this directory (not with --pipeline)")
+    parser.add_argument("--catalog-dir", default=None,
+                        help="Upsert each cleaned extraction into the project catalog in this directory (not with --pipeline)")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    pdf_paths = collect_pdf_paths(args.source)
+    if not pdf_paths:
+        print(f"[ERROR] No PDFs found in {args.source}")
+        return 1
+
+    if args.pipeline:
+        from brochure_analyzer.async_pipeline import aprocess_brochure_batch
+        from brochure_analyzer.parse_dispatch import AIMDLimiter, ParseDispatcher
+        dispatcher = ParseDispatcher(
+            rate=args.max_rps, limiter=AIMDLimiter(initial=args.parse_concurrency, maximum=args.parse_concurrency)
+        )
+        summary = asyncio.run(aprocess_brochure_batch(
+            pdf_paths, parse_concurrency=args.parse_concurrency, extract_workers=args.workers, parse_fn=dispatcher
+        ))
+        summary["parse_dispatch"] = dispatcher.metrics()
+    else:
+        summary = process_brochure_batch(
+            pdf_paths, workers=args.workers, profile_dir=args.profile_dir, metrics_jsonl=args.metrics_jsonl,
+            index_dir=args.index_dir, catalog_dir=args.catalog_dir,
+        )
+    print(f"[DONE] {summary['succeeded']}/{summary['total']} brochures processed, "
+          f"{summary['failed']} failed in {summary['elapsed']:.1f}s")
+
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    return 0 if not summary["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import re
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NUMBER_PATTERN = re.compile(r"[-+]?\d*\.\d+|[-+]?\d+")
+
+# Resolutions a pixel-space bbox is most likely to have been measured at.
+COMMON_DPIS = (72, 96, 100, 144, 150, 200, 300, 400, 600)
+
+# Coordinates may overshoot their frame by this fraction before the box is
+# considered to be in a larger unit.
+TOLERANCE = 0.02
+
+# Anything with every coordinate within +-1.5 is a normalized box that
+# overshoots the page; in points or pixels it would be a speck.
+NORMALIZED_LIMIT = 1.5
+
+MIN_SIDE = 0.005       # of the page width/height
+MIN_AREA = 0.0002      # of the page area
+MAX_ASPECT = 25.0
+DUPLICATE_IOU = 0.9
+
+
+def parse_bbox_array(bboxes: Sequence[Any]) -> np.ndarray:
+    """Parse free-form bbox strings into an (N, 4) array; unparseable rows are NaN."""
+    boxes = np.full((len(bboxes), 4), np.nan)
+    for i, bbox in enumerate(bboxes):
+        if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
+            values = bbox
+        else:
+            values = NUMBER_PATTERN.findall(str(bbox or ""))
+        if len(values) == 4:
+            try:
+                boxes[i] = [float(v) for v in values]
+            except (TypeError, ValueError):
+                pass
+    return boxes
+
+
+def infer_scale(boxes: np.ndarray, page_wh: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Infer each box's unit from its page size.
+
+    Returns (units, scale): units is "normalized", "points", "pixels" or ""
+    (cannot tell), and scale is the DPI/72 factor for pixel boxes. Boxes whose
+    coordinates all lie within +-NORMALIZED_LIMIT are normalized. Boxes that
+    fit the page in points are points. Otherwise the smallest common DPI at
+    which they fit the page is assumed.
+    """
+    count = len(boxes)
+    units = np.full(count, "", dtype=object)
+    scale = np.ones(count)
+    finite = np.isfinite(boxes).all(axis=1)
+
+    normalized = finite & (np.nanmax(np.abs(boxes), axis=1, initial=0) <= NORMALIZED_LIMIT)
+    units[normalized] = "normalized"
+
+    known = finite & ~normalized & np.isfinite(page_wh).all(axis=1) & (page_wh > 0).all(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        needed = np.maximum(
+            np.maximum(boxes[:, 0], boxes[:, 2]) / page_wh[:, 0],
+            np.maximum(boxes[:, 1], boxes[:, 3]) / page_wh[:, 1],
+        ) / (1 + TOLERANCE)
+    points = known & (needed <= 1)
+    units[points] = "points"
+
+    factors = np.array(COMMON_DPIS, dtype=float) / 72
+    index = np.searchsorted(factors, np.where(known, needed, 0))
+    pixels = known & ~points & (index < len(factors))
+    units[pixels] = "pixels"
+    scale[pixels] = factors[np.minimum(index, len(factors) - 1)][pixels]
+    return units, scale
+
+
+def _iou(boxes: np.ndarray) -> np.ndarray:
+    left = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    top = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    right = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    bottom = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    inter = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = area[:, None] + area[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def needs_page_sizes(requests: List[Dict[str, Any]]) -> bool:
+    """True if any bbox is not already normalized, i.e. the page size matters."""
+    boxes = parse_bbox_array([r.get("bbox") for r in requests])
+    finite = np.isfinite(boxes).all(axis=1)
+    return bool((finite & (np.abs(np.where(finite[:, None], boxes, 0)).max(axis=1) > NORMALIZED_LIMIT)).any())
+
+
+def validate_requests(
+    requests: List[Dict[str, Any]],
+    page_sizes: Optional[Dict[int, Tuple[float, float]]] = None,
+    page_count: Optional[int] = None,
+    min_side: float = MIN_SIDE,
+    min_area: float = MIN_AREA,
+    max_aspect: float = MAX_ASPECT,
+    duplicate_iou: float = DUPLICATE_IOU,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Normalize and check every asset bbox in one pass, before any rendering.
+
+    `requests` are `BrochureProcessor` asset requests ({"category", "label",
+    "page", "bbox", "filename"}). Each bbox is parsed into one (N, 4) array,
+    converted from points or pixels to normalized LTRB using `page_sizes`
+    ({page index: (width, height)} in points), corner-sorted and clamped to
+    the page. Boxes that are missing, degenerate, implausibly thin, off the
+    page range or near-duplicates (IoU >= `duplicate_iou` with an earlier box
+    of the same category on the same page) are rejected.
+
+    Returns (kept, diagnostics): kept requests carry the normalized bbox as
+    "l,t,r,b"; diagnostics has one entry per input request, in order.
+    """
+    count = len(requests)
+    raw = parse_bbox_array([r.get("bbox") for r in requests])
+
+    pages = np.full(count, -1, dtype=np.int64)
+    for i, request in enumerate(requests):
+        try:
+            pages[i] = int(str(request.get("page")).strip())
+        except (TypeError, ValueError):
+            pass
+    page_wh = np.full((count, 2), np.nan)
+    for i, page in enumerate(pages):
+        if page_sizes and int(page) in page_sizes:
+            page_wh[i] = page_sizes[int(page)]
+
+    units, scale = infer_scale(raw, page_wh)
+    frame = np.where((units == "normalized")[:, None], 1.0, page_wh * scale[:, None])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        boxes = raw / np.concatenate([frame, frame], axis=1)
+
+    # Fix swapped corners, then clamp into the page.
+    ordered = np.stack([
+        np.fmin(boxes[:, 0], boxes[:, 2]), np.fmin(boxes[:, 1], boxes[:, 3]),
+        np.fmax(boxes[:, 0], boxes[:, 2]), np.fmax(boxes[:, 1], boxes[:, 3]),
+    ], axis=1)
+    inverted = (boxes[:, 0] > boxes[:, 2]) | (boxes[:, 1] > boxes[:, 3])
+    clamped_boxes = np.clip(ordered, 0.0, 1.0)
+    clamped = (np.abs(clamped_boxes - ordered) > 1e-6).any(axis=1)
+
+    width = clamped_boxes[:, 2] - clamped_boxes[:, 0]
+    height = clamped_boxes[:, 3] - clamped_boxes[:, 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        aspect_px = (width * page_wh[:, 0]) / (height * page_wh[:, 1])
+        aspect = np.where(np.isfinite(aspect_px), aspect_px, width / height)
+        aspect = np.maximum(aspect, 1 / aspect)
+
+    reasons = np.full(count, "", dtype=object)
+
+    def reject(mask: np.ndarray, reason: str) -> None:
+        reasons[mask & (reasons == "")] = reason
+
+    reject(~np.isfinite(raw).all(axis=1), "missing or unparseable bbox")
+    reject(pages < 0, "invalid page number")
+    if page_count is not None:
+        reject(pages >= page_count, "page out of range")
+    reject(units == "", "unknown bbox unit (coordinates do not fit the page)")
+    reject((width < min_side) | (height < min_side), "degenerate bbox")
+    reject(width * height < min_area, "bbox area too small")
+    reject(aspect > max_aspect, "implausible aspect ratio")
+
+    # Near-duplicates within a category and page: the first one wins.
+    merged_into = np.full(count, -1, dtype=np.int64)
+    valid = reasons == ""
+    groups: Dict[Tuple[str, int], List[int]] = {}
+    for i in np.flatnonzero(valid):
+        groups.setdefault((requests[i]["category"], int(pages[i])), []).append(int(i))
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        overlap = _iou(clamped_boxes[members])
+        for a in range(len(members)):
+            if merged_into[members[a]] >= 0:
+                continue
+            for b in range(a + 1, len(members)):
+                if merged_into[members[b]] < 0 and overlap[a, b] >= duplicate_iou:
+                    merged_into[members[b]] = members[a]
+                    reasons[members[b]] = "duplicate bbox"
+
+    kept: List[Dict[str, Any]] = []
+    diagnostics: List[Dict[str, Any]] = []
+    for i, request in enumerate(requests):
+        finite = bool(np.isfinite(clamped_boxes[i]).all())
+        flags = [name for name, hit in (("inverted", inverted[i]), ("clamped", clamped[i])) if hit and finite]
+        entry = {
+            "category": request["category"],
+            "label": request["label"],
+            "page": request.get("page"),
+            "input": request.get("bbox"),
+            "bbox": [round(float(v), 6) for v in clamped_boxes[i]] if finite else None,
+            "unit": units[i] or None,
+            "flags": flags,
+            "status": "ok" if not reasons[i] else "rejected",
+        }
+        if units[i] == "pixels":
+            entry["dpi"] = round(float(scale[i] * 72))
+        if reasons[i]:
+            entry["reason"] = reasons[i]
+        if merged_into[i] >= 0:
+            entry["merged_into"] = requests[merged_into[i]]["filename"]
+        diagnostics.append(entry)
+
+        if not reasons[i]:
+            kept.append(dict(request, page=int(pages[i]), bbox=",".join(repr(float(v)) for v in clamped_boxes[i])))
+    return kept, diagnostics
@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join("Cache")
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_schema(schema: Dict[str, Any]) -> str:
+    canonical = json.dumps(schema, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cache_key(pdf_hash: str, schema_hash: str, variant: Optional[str] = None) -> str:
+    # `variant` names a parse_fn that changes the result for the same PDF and
+    # schema (e.g. a page filter mode); it gets its own entries.
+    key = f"{pdf_hash[:32]}-{schema_hash[:16]}"
+    if variant:
+        key += "-" + hashlib.sha256(variant.encode("utf-8")).hexdigest()[:8]
+    return key
+
+
+def output_name(project_name: str, pdf_hash: str) -> str:
+    """Folder/file stem for a brochure's outputs: PDFs sharing a file stem get their own."""
+    return f"{project_name}-{pdf_hash[:8]}"
+
+
+def output_project(name: str) -> str:
+    """The project name an `output_name` was built from (legacy names pass through)."""
+    match = re.fullmatch(r"(.+)-[0-9a-f]{8}", name)
+    return match.group(1) if match else name
+
+
+def parse_variant(parse_fn: Any) -> Optional[str]:
+    """The `cache_variant` a parse callable declares, if any."""
+    return getattr(parse_fn, "cache_variant", None)
+
+
+class ResultCache:
+    """
+    Content-addressed cache of brochure parse results.
+
+    Entries are keyed by the SHA-256 of the PDF bytes and of the extraction
+    schema, so renamed re-uploads hit and schema edits miss. Each entry owns a
+    copy of the remote parse JSON under `<cache_dir>/objects/` and points at
+    the markdown and asset directory produced from it. The index is a single
+    SQLite file, which keeps lookups O(1) and safe across worker processes.
+
+    Eviction only removes the cached parse JSON and index row; markdown and
+    extracted assets are outputs and are left alone.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.sqlite")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    pdf_hash TEXT NOT NULL,
+                    schema_hash TEXT NOT NULL,
+                    project_name TEXT,
+                    json_file TEXT NOT NULL,
+                    response_path TEXT,
+                    project_data_dir TEXT,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A fresh connection per operation keeps the cache usable from
+        # forked batch workers without sharing sqlite handles.
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def key_for(self, pdf_path: str, schema: Dict[str, Any], variant: Optional[str] = None) -> str:
+        return cache_key(hash_file(pdf_path), hash_schema(schema), variant)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT project_name, json_file, response_path, project_data_dir FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            project_name, json_file, response_path, project_data_dir = row
+            if not os.path.exists(json_file):
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        return {
+            "key": key,
+            "project_name": project_name,
+            "json_file": json_file,
+            "response_path": response_path if response_path and os.path.exists(response_path) else None,
+            "project_data_dir": project_data_dir if project_data_dir and os.path.isdir(project_data_dir) else None,
+        }
+
+    def put(
+        self,
+        key: str,
+        source_json_file: str,
+        project_name: str,
+        response_path: Optional[str] = None,
+        project_data_dir: Optional[str] = None,
+    ) -> str:
+        """Store a copy of the parse JSON under `key` and return the cached path."""
+        json_file = os.path.join(self.objects_dir, f"{key}.json")
+        if os.path.abspath(source_json_file) != os.path.abspath(json_file):
+            shutil.copyfile(source_json_file, json_file)
+
+        pdf_hash, schema_hash = key.split("-")[:2]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (key, pdf_hash, schema_hash, project_name, json_file, response_path,
+                     project_data_dir, size_bytes, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, pdf_hash, schema_hash, project_name, json_file, response_path,
+                 project_data_dir, os.path.getsize(json_file), now, now),
+            )
+        # The caller is about to use json_file, so the new entry is never
+        # its own victim, even if it alone exceeds max_bytes.
+        self.evict(keep=key)
+        return json_file
+
+    def put_data(self, key: str, data: Dict[str, Any], project_name: str) -> str:
+        """Store a parse result held in memory under `key` and return the cached path."""
+        json_file = os.path.join(self.objects_dir, f"{key}.json")
+        tmp_path = f"{json_file}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, json_file)
+        return self.put(key, json_file, project_name)
+
+    def update_outputs(self, key: str, response_path: Optional[str], project_data_dir: Optional[str]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE entries SET response_path = ?, project_data_dir = ? WHERE key = ?",
+                (response_path, project_data_dir, key),
+            )
+
+    def _remove(self, conn: sqlite3.Connection, keys) -> int:
+        for key in keys:
+            try:
+                os.remove(os.path.join(self.objects_dir, f"{key}.json"))
+            except FileNotFoundError:
+                pass
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        return len(keys)
+
+    def purge_schema(self, current_schema_hash: str) -> int:
+        """Drop every entry produced under a schema other than the current one."""
+        with self._connect() as conn:
+            keys = [k for (k,) in conn.execute(
+                "SELECT key FROM entries WHERE schema_hash != ?", (current_schema_hash[:16],)
+            )]
+            return self._remove(conn, keys)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Apply age, entry-count and byte-size limits, oldest access first, sparing the `keep` key."""
+        removed = 0
+        with self._connect() as conn:
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                keys = [k for (k,) in conn.execute("SELECT key FROM entries WHERE created_at < ?", (cutoff,)) if k != keep]
+                removed += self._remove(conn, keys)
+
+            if self.max_entries is None and self.max_bytes is None:
+                return removed
+
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+            victims = []
+            for key, size in conn.execute("SELECT key, size_bytes FROM entries ORDER BY last_access ASC"):
+                over_count = self.max_entries is not None and count > self.max_entries
+                over_bytes = self.max_bytes is not None and total > self.max_bytes
+                if not (over_count or over_bytes):
+                    break
+                if key == keep:
+                    continue
+                victims.append(key)
+                count -= 1
+                total -= size
+            removed += self._remove(conn, victims)
+
+        if removed:
+            logger.info(f"[CACHE] Evicted {removed} entries")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total}
@@ -0,0 +1,653 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+from brochure_analyzer.cache import output_project
+
+logger = logging.getLogger(__name__)
+
+CATALOG_DIR = os.path.join("Catalog")
+
+TABLES = ("projects", "floorplans", "floorplan_areas", "amenities", "towers", "location_highlights")
+
+# floorplanConfigs key -> floorplan_areas.kind
+AREA_FIELDS = {
+    "carpetArea": "carpet",
+    "builtupArea": "builtup",
+    "superBuiltupArea": "super_builtup",
+    "saleableArea": "saleable",
+    "totalArea": "total",
+}
+
+SQFT_PER_UNIT = {
+    "sqft": 1.0,
+    "sqm": 10.7639104,
+    "sqyd": 9.0,
+    "acre": 43560.0,
+    "hectare": 107639.104,
+    "guntha": 1089.0,
+}
+
+_UNIT_PATTERNS = (
+    ("sqft", r"sq\.?\s*f(?:ee|oo)?t\.?|square\s*f(?:ee|oo)?t|sq\.?\s*ft|sft|ft2|ft²|s\.?f\.?t"),
+    ("sqm", r"sq\.?\s*m(?:trs?|tr|ts?|eters?|etres?)?\b\.?|square\s*met(?:er|re)s?|m2|m²"),
+    ("sqyd", r"sq\.?\s*y(?:ar)?ds?\.?|square\s*yards?|gaj"),
+    ("acre", r"acres?"),
+    ("hectare", r"hectares?|\bha\b"),
+    ("guntha", r"gunthas?"),
+)
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?|\.\d+)"
+_UNIT = "(" + "|".join(pattern for _, pattern in _UNIT_PATTERNS) + ")"
+_AREA = re.compile(_NUMBER + r"\s*" + _UNIT + r"?(?:\s*(?:-|–|—|~|to)\s*" + _NUMBER + r"\s*" + _UNIT + r"?)?", re.IGNORECASE)
+_UNIT_ONLY = re.compile(_UNIT, re.IGNORECASE)
+_PERCENT = re.compile(_NUMBER + r"\s*(?:%|percent)", re.IGNORECASE)
+
+_NUMBER_WORDS = {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7", "eight": "8"}
+_BHK = re.compile(r"(\d+(?:\.\d+)?)\s*(?:\+\s*\d+\s*)?(bhk|b\.h\.k\.?|bed(?:room)?s?|br\b|rk\b)", re.IGNORECASE)
+_UNIT_TYPES = (
+    ("penthouse", "penthouse"),
+    ("duplex", "duplex"),
+    ("triplex", "duplex"),
+    ("villa", "villa"),
+    ("row house", "villa"),
+    ("bungalow", "villa"),
+    ("plot", "plot"),
+    ("shop", "commercial"),
+    ("office", "commercial"),
+    ("retail", "commercial"),
+    ("studio", "studio"),
+)
+
+_DISTANCE = re.compile(_NUMBER + r"\s*(km|kms|kilomet(?:er|re)s?|m|mtrs?|met(?:er|re)s?|mins?|minutes?|hrs?|hours?)\b", re.IGNORECASE)
+
+_MISSING = {"", "not present", "not found", "n/a", "na", "none", "null", "-", "nil"}
+
+
+def _present(value: Any) -> Optional[str]:
+    # Schema fields say "Not Present" when the parser found nothing.
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    text = " ".join(str(value).split())
+    return None if text.lower() in _MISSING else text
+
+
+def normalize_key(value: Any) -> Optional[str]:
+    """Case- and whitespace-insensitive lookup key for city, locality, builder and amenity names."""
+    text = _present(value)
+    return text.casefold() if text else None
+
+
+def _unit_name(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    for name, pattern in _UNIT_PATTERNS:
+        if re.fullmatch(pattern, text.strip(), re.IGNORECASE):
+            return name
+    return None
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def parse_area(value: Any, default_unit: str = "sqft") -> Optional[Tuple[float, float]]:
+    """
+    Convert a free-text area to square feet as (low, high).
+
+    Handles thousands separators, sq.ft/sq.m/sq.yd/acre/hectare/guntha
+    spellings, ranges ("1100 - 1250 sq.ft") and several figures for the same
+    area ("1250 sq.ft (116.13 sq.m)": the first one with a unit wins). A
+    figure without any unit is taken to be in `default_unit`. Returns None
+    for "Not Present", percentages and text without a number.
+    """
+    text = _present(value)
+    if text is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        sqft = float(value) * SQFT_PER_UNIT[default_unit]
+        return (round(sqft, 2), round(sqft, 2))
+    matches = [match for match in _AREA.finditer(text) if not text[match.end():].lstrip().startswith("%")]
+    if not matches:
+        return None
+    match = next((m for m in matches if m.group(2) or m.group(4)), matches[0])
+    low, unit_low, high, unit_high = match.groups()
+    unit = _unit_name(unit_low) or _unit_name(unit_high)
+    if unit is None:
+        trailing = _UNIT_ONLY.search(text, match.end())
+        unit = _unit_name(trailing.group(1)) if trailing else None
+    factor = SQFT_PER_UNIT[unit or default_unit]
+    low_sqft = _number(low) * factor
+    # "1250 sq.ft - 116 sq.m" is one area in two units, not a range.
+    if high is None or (unit_high and _unit_name(unit_high) != (_unit_name(unit_low) or _unit_name(unit_high))):
+        high_sqft = low_sqft
+    else:
+        high_sqft = _number(high) * factor
+    if high_sqft < low_sqft:
+        low_sqft, high_sqft = high_sqft, low_sqft
+    return (round(low_sqft, 2), round(high_sqft, 2))
+
+
+def parse_percent(value: Any) -> Optional[float]:
+    """Percentage in a free-text area ("70%", "70 percent" -> 70.0), or None."""
+    text = _present(value)
+    match = _PERCENT.search(text) if text else None
+    return _number(match.group(1)) if match else None
+
+
+def normalize_bhk(value: Any) -> Dict[str, Any]:
+    """
+    Normalize a floorplan type such as "3BHK", "2.5 BHK + Study", "Three
+    Bedroom Duplex", "1 RK" or "Studio".
+
+    Returns {"bhk": float or None, "label": str or None, "unit_type": str}.
+    "bhk" counts bedrooms (0 for studios and RK units) and "label" is the
+    canonical "3 BHK" / "1 RK" / "Studio" form. "unit_type" is one of
+    apartment, studio, rk, penthouse, duplex, villa, plot, commercial or
+    unknown.
+    """
+    text = _present(value)
+    if text is None:
+        return {"bhk": None, "label": None, "unit_type": "unknown"}
+    lowered = text.lower()
+    for word, digit in _NUMBER_WORDS.items():
+        lowered = re.sub(rf"\b{word}\b", digit, lowered)
+    unit_type = next((kind for keyword, kind in _UNIT_TYPES if keyword in lowered), None)
+
+    match = _BHK.search(lowered)
+    if match and match.group(2).lower() == "rk":
+        return {"bhk": 0.0, "label": f"{match.group(1)} RK", "unit_type": "rk"}
+    if match:
+        bhk = float(match.group(1))
+        label = f"{bhk:g} BHK"
+        return {"bhk": bhk, "label": label, "unit_type": unit_type if unit_type not in (None, "studio") else "apartment"}
+    if unit_type == "studio":
+        return {"bhk": 0.0, "label": "Studio", "unit_type": "studio"}
+    return {"bhk": None, "label": None, "unit_type": unit_type or "unknown"}
+
+
+def parse_distance(value: Any) -> Dict[str, Optional[float]]:
+    """Distance and travel time in a highlight ("8 Km", "500 meter", "15 minutes") as {"km", "minutes"}."""
+    text = _present(value)
+    km: Optional[float] = None
+    minutes: Optional[float] = None
+    for number, unit in _DISTANCE.findall(text or ""):
+        amount, unit = _number(number), unit.lower()
+        if unit.startswith("k") and km is None:
+            km = amount
+        elif unit.startswith("m") and not unit.startswith("min") and km is None:
+            km = amount / 1000
+        elif unit.startswith("min") and minutes is None:
+            minutes = amount
+        elif unit.startswith("h") and minutes is None:
+            minutes = amount * 60
+    return {"km": round(km, 3) if km is not None else None, "minutes": minutes}
+
+
+def _as_list(value: Any) -> List[Any]:
+    # Array fields come back as "Not Present" when empty.
+    return value if isinstance(value, list) else []
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r"\d[\d,]*", _present(value) or "")
+    return int(match.group(0).replace(",", "")) if match else None
+
+
+def catalog_rows(project: str, extraction: Dict[str, Any]) -> Dict[str, List[Tuple[Any, ...]]]:
+    """Flatten one cleaned extraction into rows for each catalog table."""
+    address = extraction.get("projectAddress") if isinstance(extraction.get("projectAddress"), dict) else {}
+    builder = extraction.get("builder") if isinstance(extraction.get("builder"), dict) else {}
+    area = extraction.get("area") if isinstance(extraction.get("area"), dict) else {}
+    project_area = parse_area(area.get("project_area"))
+    open_area = parse_area(area.get("open_area"))
+    green_area = parse_area(area.get("green_area"))
+    tower_names = [_present(name) for name in _as_list(extraction.get("tower_names"))]
+    tower_names = [name for name in tower_names if name]
+    tower_count = _as_int(extraction.get("tower_count"))
+
+    # Copied onto every floorplan row so floorplan queries need no join.
+    place = (
+        _present(address.get("City")),
+        normalize_key(address.get("City")),
+        _present(address.get("Locality")),
+        normalize_key(address.get("Locality")),
+        _present(builder.get("name")),
+        normalize_key(builder.get("name")),
+    )
+
+    rows: Dict[str, List[Tuple[Any, ...]]] = {table: [] for table in TABLES}
+    rows["projects"].append((
+        project,
+        _present(extraction.get("projectName")),
+        *place[:4],
+        _present(address.get("Address")),
+        *place[4:],
+        _present(builder.get("BuilderWebsite")),
+        _present(extraction.get("rera")),
+        tower_count if tower_count is not None else (len(tower_names) or None),
+        _as_int(extraction.get("unit_count")),
+        project_area[0] if project_area else None,
+        open_area[0] if open_area else None,
+        parse_percent(area.get("open_area")),
+        green_area[0] if green_area else None,
+        parse_percent(area.get("green_area")),
+    ))
+
+    for position, config in enumerate(_as_list(extraction.get("floorplanConfigs"))):
+        if not isinstance(config, dict):
+            continue
+        bhk = normalize_bhk(config.get("bhkType"))
+        areas = {kind: parse_area(config.get(field)) for field, kind in AREA_FIELDS.items()}
+        # The smallest stated figure, usually carpet, for "under N sq ft" queries.
+        stated = [value for value in areas.values() if value]
+        rows["floorplans"].append((
+            project,
+            position,
+            _present(config.get("bhkType")),
+            bhk["bhk"],
+            bhk["label"],
+            bhk["unit_type"],
+            min(value[0] for value in stated) if stated else None,
+            max(value[1] for value in stated) if stated else None,
+            config.get("pageNumber") if isinstance(config.get("pageNumber"), int) else None,
+            *place,
+        ))
+        for field, kind in AREA_FIELDS.items():
+            if areas[kind]:
+                rows["floorplan_areas"].append((project, position, kind, _present(config.get(field)), *areas[kind]))
+
+    amenities = {}
+    for amenity in _as_list(extraction.get("amenities")):
+        key = normalize_key(amenity)
+        if key and key not in amenities:
+            amenities[key] = _present(amenity)
+    rows["amenities"] = [(project, name, key) for key, name in amenities.items()]
+    rows["towers"] = [(project, position, name) for position, name in enumerate(tower_names)]
+
+    for highlight in _as_list(extraction.get("location_highlights")):
+        if not isinstance(highlight, dict):
+            continue
+        distance = parse_distance(highlight.get("distance"))
+        rows["location_highlights"].append((
+            project,
+            _present(highlight.get("category")),
+            normalize_key(highlight.get("category")),
+            _present(highlight.get("location_name")),
+            _present(highlight.get("distance")),
+            distance["km"],
+            distance["minutes"],
+        ))
+    return rows
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS projects (
+        project TEXT PRIMARY KEY,
+        name TEXT,
+        city TEXT,
+        city_key TEXT,
+        locality TEXT,
+        locality_key TEXT,
+        address TEXT,
+        builder TEXT,
+        builder_key TEXT,
+        builder_website TEXT,
+        rera TEXT,
+        tower_count INTEGER,
+        unit_count INTEGER,
+        project_area_sqft REAL,
+        open_area_sqft REAL,
+        open_area_percent REAL,
+        green_area_sqft REAL,
+        green_area_percent REAL,
+        content_hash TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS floorplans (
+        project TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        bhk_type TEXT,
+        bhk REAL,
+        bhk_label TEXT,
+        unit_type TEXT NOT NULL,
+        min_sqft REAL,
+        max_sqft REAL,
+        page INTEGER,
+        city TEXT,
+        city_key TEXT,
+        locality TEXT,
+        locality_key TEXT,
+        builder TEXT,
+        builder_key TEXT,
+        PRIMARY KEY (project, position)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS floorplan_areas (
+        project TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        raw TEXT,
+        sqft_min REAL NOT NULL,
+        sqft_max REAL NOT NULL,
+        PRIMARY KEY (project, position, kind)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS amenities (
+        project TEXT NOT NULL,
+        amenity TEXT NOT NULL,
+        amenity_key TEXT NOT NULL,
+        PRIMARY KEY (project, amenity_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS towers (
+        project TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (project, position)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS location_highlights (
+        project TEXT NOT NULL,
+        category TEXT,
+        category_key TEXT,
+        location_name TEXT,
+        distance TEXT,
+        distance_km REAL,
+        travel_minutes REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS projects_city ON projects (city_key, locality_key)",
+    "CREATE INDEX IF NOT EXISTS projects_locality ON projects (locality_key)",
+    "CREATE INDEX IF NOT EXISTS projects_builder ON projects (builder_key)",
+    "CREATE INDEX IF NOT EXISTS floorplans_bhk ON floorplans (bhk, min_sqft)",
+    "CREATE INDEX IF NOT EXISTS floorplans_city ON floorplans (city_key, bhk, min_sqft)",
+    "CREATE INDEX IF NOT EXISTS floorplans_locality ON floorplans (locality_key, bhk)",
+    "CREATE INDEX IF NOT EXISTS floorplans_builder ON floorplans (builder_key, bhk)",
+    "CREATE INDEX IF NOT EXISTS floorplan_areas_kind ON floorplan_areas (kind, sqft_min)",
+    "CREATE INDEX IF NOT EXISTS amenities_key ON amenities (amenity_key)",
+    "CREATE INDEX IF NOT EXISTS location_highlights_project ON location_highlights (project)",
+    "CREATE INDEX IF NOT EXISTS location_highlights_category ON location_highlights (category_key, distance_km)",
+)
+
+
+_FLOORPLAN_COLUMNS = (
+    "project", "position", "bhk_type", "bhk", "bhk_label", "unit_type", "min_sqft", "max_sqft", "page",
+    "city", "locality", "builder",
+)
+
+
+def content_hash(extraction: Dict[str, Any]) -> str:
+    canonical = json.dumps(extraction, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Catalog:
+    """
+    Queryable catalog of cleaned brochure extractions.
+
+    One SQLite file (`<catalog_dir>/catalog.sqlite`) holds a `projects` table
+    (city, locality, builder, RERA, tower/unit counts, project areas) and
+    exploded `floorplans`, `floorplan_areas`, `amenities`, `towers` and
+    `location_highlights` tables. Free-text areas are normalized to square
+    feet and BHK types to a bedroom count and a canonical label. City,
+    locality, builder and amenity names are matched case-insensitively
+    through indexed `*_key` columns.
+
+    `upsert_project` replaces one project's rows in a single transaction and
+    skips extractions whose content has not changed, so re-ingesting a batch
+    only writes new or re-parsed brochures.
+    """
+
+    def __init__(self, catalog_dir: str = CATALOG_DIR) -> None:
+        self.catalog_dir = catalog_dir
+        self.db_path = os.path.join(catalog_dir, "catalog.sqlite")
+        self._local = threading.local()
+        os.makedirs(catalog_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A fresh connection per operation keeps the catalog usable from
+        # batch worker processes without sharing sqlite handles.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        # Queries reuse one connection per thread: a fresh connection starts
+        # with a cold page cache, which costs more than the query itself.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA cache_size=-65536")
+        return conn
+
+    def upsert_project(self, project: str, extraction: Dict[str, Any]) -> bool:
+        """Insert or replace one project's rows; returns False if it was already up to date."""
+        return self.upsert_projects([(project, extraction)]) == 1
+
+    def upsert_projects(self, items: Sequence[Tuple[str, Dict[str, Any]]]) -> int:
+        """Upsert several (project, extraction) pairs in one transaction; returns how many changed."""
+        changed = 0
+        with self._connect() as conn:
+            # The catalog can be rebuilt from Data/, so commits skip the
+            # fsync a FULL sync would add to every brochure.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("BEGIN IMMEDIATE")
+            for project, extraction in items:
+                digest = content_hash(extraction)
+                current = conn.execute("SELECT content_hash FROM projects WHERE project = ?", (project,)).fetchone()
+                if current is not None and current[0] == digest:
+                    continue
+                rows = catalog_rows(project, extraction)
+                for table in TABLES:
+                    conn.execute(f"DELETE FROM {table} WHERE project = ?", (project,))
+                conn.execute(
+                    f"INSERT INTO projects VALUES ({', '.join('?' * 20)})",
+                    rows["projects"][0] + (digest, time.time()),
+                )
+                for table in TABLES[1:]:
+                    if rows[table]:
+                        placeholders = ", ".join("?" * len(rows[table][0]))
+                        conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows[table])
+                logger.debug(f"[CATALOG] {project}: {len(rows['floorplans'])} floorplans, {len(rows['amenities'])} amenities")
+                changed += 1
+        return changed
+
+    def delete_project(self, project: str) -> bool:
+        with self._connect() as conn:
+            for table in TABLES[1:]:
+                conn.execute(f"DELETE FROM {table} WHERE project = ?", (project,))
+            return conn.execute("DELETE FROM projects WHERE project = ?", (project,)).rowcount > 0
+
+    def has_project(self, project: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM projects WHERE project = ?", (project,)).fetchone() is not None
+
+    def projects(self) -> List[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT project FROM projects ORDER BY project")]
+
+    def get_project(self, project: str) -> Optional[Dict[str, Any]]:
+        """The project row plus its floorplans (with areas), amenities, towers and location highlights."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM projects WHERE project = ?", (project,)).fetchone()
+            if row is None:
+                return None
+            result = dict(row)
+            floorplans = [dict(r) for r in conn.execute(
+                "SELECT * FROM floorplans WHERE project = ? ORDER BY position", (project,))]
+            for floorplan in floorplans:
+                floorplan["areas"] = {r["kind"]: [r["sqft_min"], r["sqft_max"]] for r in conn.execute(
+                    "SELECT kind, sqft_min, sqft_max FROM floorplan_areas WHERE project = ? AND position = ?",
+                    (project, floorplan["position"]))}
+            result["floorplans"] = floorplans
+            result["amenities"] = [r[0] for r in conn.execute(
+                "SELECT amenity FROM amenities WHERE project = ? ORDER BY amenity_key", (project,))]
+            result["towers"] = [r[0] for r in conn.execute(
+                "SELECT name FROM towers WHERE project = ? ORDER BY position", (project,))]
+            result["location_highlights"] = [dict(r) for r in conn.execute(
+                "SELECT category, location_name, distance, distance_km, travel_minutes "
+                "FROM location_highlights WHERE project = ? ORDER BY rowid", (project,))]
+        return result
+
+    def find_floorplans(
+        self,
+        city: Optional[str] = None,
+        locality: Optional[str] = None,
+        builder: Optional[str] = None,
+        bhk: Optional[float] = None,
+        min_sqft: Optional[float] = None,
+        max_sqft: Optional[float] = None,
+        area: Optional[str] = None,
+        amenities: Sequence[str] = (),
+        unit_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Floorplans across the catalog matching every given filter.
+
+        City, locality, builder and amenity names match case-insensitively.
+        `min_sqft`/`max_sqft` compare against one area `kind` ("carpet",
+        "builtup", "super_builtup", "saleable" or "total") when `area` is
+        given, otherwise against the smallest area stated for the floorplan;
+        a range matches if any part of it falls inside the bounds. Each hit
+        carries the project's city, locality and builder.
+        """
+        joins: List[str] = []
+        where: List[str] = []
+        params: List[Any] = []
+        for column, value in (("city_key", city), ("locality_key", locality), ("builder_key", builder)):
+            if value is not None:
+                where.append(f"f.{column} = ?")
+                params.append(normalize_key(value))
+        if bhk is not None:
+            where.append("f.bhk = ?")
+            params.append(float(bhk))
+        if unit_type is not None:
+            where.append("f.unit_type = ?")
+            params.append(unit_type)
+        if area is not None:
+            if area not in AREA_FIELDS.values():
+                raise ValueError(f"Unknown area kind {area!r}; expected one of {sorted(AREA_FIELDS.values())}")
+            joins.append("JOIN floorplan_areas a ON a.project = f.project AND a.position = f.position AND a.kind = ?")
+            params[:0] = [area]
+            # Unary + keeps the planner on the floorplans indexes when
+            # city, builder or BHK narrow the search.
+            low, high = "+a.sqft_min", "+a.sqft_max"
+        else:
+            low, high = "f.min_sqft", "f.max_sqft"
+        if max_sqft is not None:
+            where.append(f"{low} <= ?")
+            params.append(max_sqft)
+        if min_sqft is not None:
+            where.append(f"{high} >= ?")
+            params.append(min_sqft)
+        for amenity in amenities:
+            where.append("EXISTS (SELECT 1 FROM amenities m WHERE m.project = f.project AND m.amenity_key = ?)")
+            params.append(normalize_key(amenity))
+
+        columns = ", ".join(f"f.{column}" for column in _FLOORPLAN_COLUMNS)
+        if area is not None:
+            columns += ", a.sqft_min AS area_sqft_min, a.sqft_max AS area_sqft_max"
+        sql = " ".join([f"SELECT {columns} FROM floorplans f", *joins])
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY f.project, f.position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self.query(sql, params)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Run a read-only SQL query against the catalog and return dict rows."""
+        cursor = self._reader().execute(sql, tuple(params))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+
+    def to_dataframe(self, table: str) -> Any:
+        """Load one catalog table as a pandas DataFrame."""
+        import pandas as pd
+
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table!r}; expected one of {list(TABLES)}")
+        with self._connect() as conn:
+            return pd.read_sql_query(f"SELECT * FROM {table}", conn)
+
+    def export_parquet(self, out_dir: Optional[str] = None) -> List[str]:
+        """
+        Write every table to `<out_dir>/<table>.parquet` (default: the
+        catalog directory). Needs pandas with pyarrow or fastparquet.
+        """
+        out_dir = out_dir or self.catalog_dir
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for table in TABLES:
+            path = os.path.join(out_dir, f"{table}.parquet")
+            self.to_dataframe(table).to_parquet(path, index=False)
+            paths.append(path)
+        logger.info(f"[CATALOG] Exported {len(paths)} tables to {out_dir}")
+        return paths
+
+
+def catalog_result(catalog: Catalog, result: Dict[str, Any]) -> bool:
+    """Upsert a `process_brochure_pdf` result from the cleaned JSON it saved."""
+    json_path = os.path.join(result.get("project_data_dir") or "", "extracted_data.json")
+    if not os.path.exists(json_path):
+        logger.warning(f"[CATALOG] No cleaned JSON for {result['project_name']} at {json_path}")
+        return False
+    with open(json_path, "r", encoding="utf-8") as f:
+        extraction = json.load(f)
+    if not catalog.upsert_project(result["project_name"], extraction):
+        return False
+    logger.info(f"[CATALOG] Updated {result['project_name']}")
+    return True
+
+
+def catalog_outputs(catalog: Catalog, data_dir: str = "Data", batch_size: int = 256) -> int:
+    """Upsert every brochure already processed into `data_dir`; returns the number of projects changed."""
+    changed = 0
+    started = time.perf_counter()
+    pending: List[Tuple[str, Dict[str, Any]]] = []
+    for name in sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []:
+        json_path = os.path.join(data_dir, name, "extracted_data.json")
+        if not os.path.isfile(json_path):
+            continue
+        with open(json_path, "r", encoding="utf-8") as f:
+            pending.append((output_project(name), json.load(f)))
+        if len(pending) >= batch_size:
+            changed += catalog.upsert_projects(pending)
+            pending = []
+    if pending:
+        changed += catalog.upsert_projects(pending)
+    logger.info(f"[CATALOG] Updated {changed} projects in {time.perf_counter() - started:.1f}s")
+    return changed
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import argparse
+from typing import Dict, Any, List, Optional
+
+# Only the standard library is imported here. Each subcommand imports what it
+# needs when it runs, so `extract` never loads agentic_doc or pydantic and
+# `--help` starts instantly.
+
+
+def _load_extraction(json_path: str) -> Dict[str, Any]:
+    # Accept a saved parse result ({"markdown", "extraction", ...}) or a bare
+    # extraction object.
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object in {json_path}")
+    extraction = data.get("extraction", data)
+    if not isinstance(extraction, dict) or not extraction:
+        raise ValueError(f"No extraction data found in {json_path}")
+    return extraction
+
+
+def run_parse(args: argparse.Namespace) -> int:
+    from brochure_analyzer.metrics import configure_logging
+    from brochure_analyzer.wrapper import parse_stage
+
+    configure_logging()
+    job = parse_stage(args.pdf)
+    print(json.dumps(job.get("result") or job, indent=2, ensure_ascii=False))
+    return 0
+
+
+def run_extract(args: argparse.Namespace) -> int:
+    from brochure_analyzer.elements_breakdown import BrochureProcessor
+    from brochure_analyzer.metrics import JsonlSink, Metrics, configure_logging, profiled
+    from brochure_analyzer.raster_cache import RasterCache
+    from brochure_analyzer.dedup_store import DedupStore
+
+    configure_logging()
+    if not os.path.exists(args.pdf):
+        print(f"[ERROR] PDF not found: {args.pdf}")
+        return 1
+    try:
+        extraction = _load_extraction(args.json)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    output_dir = args.output_dir or os.path.join("Data", os.path.splitext(os.path.basename(args.pdf))[0])
+    output = {"format": args.format, "quality": args.quality, "progressive": args.progressive,
+              "max_dim": args.max_dim, "thumbnail": args.thumbnail}
+    sink = JsonlSink(args.metrics_jsonl) if args.metrics_jsonl else None
+    metrics = Metrics(sinks=[sink] if sink else None, run=os.path.splitext(os.path.basename(args.pdf))[0])
+    processor = BrochureProcessor(
+        source_pdf_path=args.pdf,
+        extracted_json_data=extraction,
+        output_dir=output_dir,
+        render_mode=args.render_mode,
+        dpi=args.dpi,
+        max_asset_bytes=args.max_asset_bytes,
+        prefer_native=args.prefer_native,
+        workers=args.workers,
+        raster_cache=RasterCache(args.raster_cache) if args.raster_cache else None,
+        incremental=args.incremental,
+        dedup_store=DedupStore(args.dedup_store) if args.dedup_store else None,
+        output_settings={"default": output},
+        archive=args.archive,
+        metrics=metrics,
+    )
+    try:
+        with profiled(args.profile):
+            report = processor.process_all()
+    finally:
+        if sink is not None:
+            sink.close()
+    report["timings"] = metrics.summary()
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"[DONE] {len(report['saved'])} saved, {len(report['skipped'])} skipped, "
+          f"{len(report['errors'])} errors in {output_dir}")
+    return 0 if not report["errors"] else 2
+
+
+def run_index(args: argparse.Namespace) -> int:
+    from brochure_analyzer.metrics import configure_logging
+    from brochure_analyzer.retrieval import RetrievalIndex, index_outputs
+
+    configure_logging()
+    index = RetrievalIndex(args.index_dir)
+    projects = index_outputs(index, data_dir=args.data_dir, responses_dir=args.responses_dir)
+    print(f"[DONE] {projects} projects, {index.stats()['chunks']} chunks in {args.index_dir}")
+    return 0
+
+
+def run_search(args: argparse.Namespace) -> int:
+    from brochure_analyzer.retrieval import RetrievalIndex
+
+    if not os.path.isdir(args.index_dir):
+        print(f"[ERROR] Index not found: {args.index_dir}")
+        return 1
+    hits = RetrievalIndex(args.index_dir).search(args.query, k=args.k, projects=args.project, sources=args.source)
+    print(json.dumps(hits, indent=2, ensure_ascii=False))
+    return 0
+
+
+def run_catalog(args: argparse.Namespace) -> int:
+    from brochure_analyzer.catalog import Catalog, catalog_outputs
+    from brochure_analyzer.metrics import configure_logging
+
+    configure_logging()
+    catalog = Catalog(args.catalog_dir)
+    changed = catalog_outputs(catalog, data_dir=args.data_dir)
+    stats = catalog.stats()
+    print(f"[DONE] {changed} projects updated; {stats['projects']} projects, "
+          f"{stats['floorplans']} floorplans in {args.catalog_dir}")
+    if args.export_parquet:
+        for path in catalog.export_parquet(args.export_parquet):
+            print(path)
+    return 0
+
+
+def run_find(args: argparse.Namespace) -> int:
+    from brochure_analyzer.catalog import Catalog
+
+    if not os.path.isdir(args.catalog_dir):
+        print(f"[ERROR] Catalog not found: {args.catalog_dir}")
+        return 1
+    rows = Catalog(args.catalog_dir).find_floorplans(
+        city=args.city, locality=args.locality, builder=args.builder, bhk=args.bhk,
+        min_sqft=args.min_sqft, max_sqft=args.max_sqft, area=args.area, amenities=args.amenity or (),
+        unit_type=args.unit_type, limit=args.limit,
+    )
+    print(json.dumps(rows, indent=2, ensure_ascii=False))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="brochure-analyzer", description="Brochure parsing and asset extraction.")
+    subparsers = parser.add_subparsers(dest="command", metavar="{parse,extract,batch,index,search,catalog,find,serve}")
+    subparsers.required = True
+
+    parse_parser = subparsers.add_parser("parse", help="Send one brochure to the remote parser and cache the JSON")
+    parse_parser.add_argument("pdf", help="Brochure PDF")
+    parse_parser.set_defaults(handler=run_parse)
+
+    extract_parser = subparsers.add_parser(
+        "extract", help="Crop assets from a brochure using an existing parse JSON (no remote calls)"
+    )
+    extract_parser.add_argument("pdf", help="Brochure PDF")
+    extract_parser.add_argument("json", help="Parse result JSON (with an 'extraction' key) or a bare extraction")
+    extract_parser.add_argument("-o", "--output-dir", default=None, help="Output directory (default: Data/<project>)")
+    extract_parser.add_argument("--render-mode", choices=("page", "clip"), default="page")
+    extract_parser.add_argument("--dpi", type=int, default=300)
+    extract_parser.add_argument("--workers", type=int, default=1, help="Render threads (default: 1)")
+    extract_parser.add_argument("--max-asset-bytes", type=int, default=None,
+                                help="Render larger crops in tiles under this many raster bytes")
+    extract_parser.add_argument("--prefer-native", action="store_true",
+                                help="Save embedded images directly when one covers the bbox")
+    extract_parser.add_argument("--format", choices=("jpeg", "webp", "png"), default="jpeg")
+    extract_parser.add_argument("--quality", type=int, default=None)
+    extract_parser.add_argument("--progressive", action="store_true")
+    extract_parser.add_argument("--max-dim", type=int, default=None, help="Downscale assets to this long edge")
+    extract_parser.add_argument("--thumbnail", type=int, default=None, help="Also write thumbnails of this long edge")
+    extract_parser.add_argument("--archive", choices=("zip", "tar"), default=None,
+                                help="Write all assets into one archive instead of a directory tree")
+    extract_parser.add_argument("--incremental", action="store_true",
+                                help="Only re-extract assets whose inputs changed since the last run")
+    extract_parser.add_argument("--raster-cache", default=None, help="Page raster cache directory")
+    extract_parser.add_argument("--dedup-store", default=None, help="Shared asset store directory")
+    extract_parser.add_argument("--report", default=None, help="Write the extraction report JSON (with timings) to this path")
+    extract_parser.add_argument("--metrics-jsonl", default=None,
+                                help="Append every timing and counter event to this JSON-lines file")
+    extract_parser.add_argument("--profile", default=None, help="Write cProfile stats for the run to this path")
+    extract_parser.set_defaults(handler=run_extract)
+
+    index_parser = subparsers.add_parser("index", help="Build or refresh the Q&A retrieval index from Data/ and Responses/")
+    index_parser.add_argument("--index-dir", default="Index", help="Index directory (default: Index)")
+    index_parser.add_argument("--data-dir", default="Data")
+    index_parser.add_argument("--responses-dir", default="Responses")
+    index_parser.set_defaults(handler=run_index)
+
+    search_parser = subparsers.add_parser("search", help="Find the brochure chunks most relevant to a question")
+    search_parser.add_argument("query", help="Question or keywords")
+    search_parser.add_argument("--index-dir", default="Index", help="Index directory (default: Index)")
+    search_parser.add_argument("-k", type=int, default=5, help="Chunks to return (default: 5)")
+    search_parser.add_argument("--project", action="append", default=None, help="Only search this project (repeatable)")
+    search_parser.add_argument("--source", action="append", choices=("markdown", "extraction"), default=None)
+    search_parser.set_defaults(handler=run_search)
+
+    catalog_parser = subparsers.add_parser("catalog", help="Build or refresh the project catalog from Data/*/extracted_data.json")
+    catalog_parser.add_argument("--catalog-dir", default="Catalog", help="Catalog directory (default: Catalog)")
+    catalog_parser.add_argument("--data-dir", default="Data")
+    catalog_parser.add_argument("--export-parquet", default=None, metavar="DIR",
+                                help="Also write every catalog table to DIR/<table>.parquet (needs pyarrow)")
+    catalog_parser.set_defaults(handler=run_catalog)
+
+    find_parser = subparsers.add_parser("find", help="Query floorplans across the catalog")
+    find_parser.add_argument("--catalog-dir", default="Catalog", help="Catalog directory (default: Catalog)")
+    find_parser.add_argument("--city", default=None)
+    find_parser.add_argument("--locality", default=None)
+    find_parser.add_argument("--builder", default=None)
+    find_parser.add_argument("--bhk", type=float, default=None, help="Bedrooms, e.g. 3 or 2.5 (0 for studio/RK)")
+    find_parser.add_argument("--min-sqft", type=float, default=None)
+    find_parser.add_argument("--max-sqft", type=float, default=None)
+    find_parser.add_argument("--area", choices=("carpet", "builtup", "super_builtup", "saleable", "total"), default=None,
+                             help="Area the sq ft bounds apply to (default: smallest stated area)")
+    find_parser.add_argument("--amenity", action="append", default=None, help="Required amenity (repeatable)")
+    find_parser.add_argument("--unit-type", default=None, help="apartment, studio, rk, penthouse, duplex, villa, ...")
+    find_parser.add_argument("--limit", type=int, default=None)
+    find_parser.set_defaults(handler=run_find)
+
+    # Listed for --help only; main() hands everything after "batch" to batch.main.
+    subparsers.add_parser("batch", help="Process a directory or manifest of brochures (see 'batch --help')")
+    # Likewise for "serve" and service.main.
+    subparsers.add_parser("serve", help="Run the brochure job service with warm workers (see 'serve --help')")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "batch":
+        from brochure_analyzer.batch import main as batch_main
+        return batch_main(argv[1:])
+    if argv and argv[0] == "serve":
+        from brochure_analyzer.service import main as service_main
+        return service_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
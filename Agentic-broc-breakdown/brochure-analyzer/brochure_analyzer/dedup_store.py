@@ -0,0 +1,307 @@
+import io
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.path.join("AssetStore")
+LINK_MODES = ("hardlink", "symlink", "copy")
+
+HASH_BITS = 64
+MIN_HASH_BITS = 8
+
+# Per-category override of max_distance. Floorplans of different units are
+# often drawn from one layout template, so a near match could swap in another
+# unit's plan; they only reuse blobs with identical pixels.
+CATEGORY_MAX_DISTANCE = {"floorplan": 0}
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """64-bit difference hash: robust to rescaling and re-encoding."""
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def pixel_hash(image: Image.Image) -> str:
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    # Hash in row bands: a crop spilled to disk is never copied whole.
+    rows = max(1, (1 << 22) // max(1, image.width * len(image.getbands())))
+    for top in range(0, image.height, rows):
+        digest.update(image.crop((0, top, image.width, min(top + rows, image.height))).tobytes())
+    return digest.hexdigest()
+
+
+def _bands(value: int, count: int) -> List[int]:
+    # Split the hash into `count` contiguous bit ranges. Two hashes within
+    # Hamming distance count-1 agree exactly on at least one band.
+    bands = []
+    start = 0
+    for i in range(count):
+        width = HASH_BITS // count + (1 if i < HASH_BITS % count else 0)
+        bands.append((value >> (HASH_BITS - start - width)) & ((1 << width) - 1))
+        start += width
+    return bands
+
+
+class DedupStore:
+    """
+    Shared, content-addressed store for extracted images.
+
+    Every crop gets an exact hash (over its pixels, or over the original
+    bytes for passthrough JPEGs) and a 64-bit perceptual hash. Crops whose
+    exact hash is known, or whose perceptual hash is within `max_distance`
+    bits of a stored blob at least as large, reuse that blob (per-category
+    limits in `category_max_distance`, by default exact matches only for
+    floorplans): nothing is
+    encoded and the per-project file is a hard link (or symlink/copy) to it.
+    New crops are encoded once into `<store_dir>/blobs/`.
+
+    Near-duplicate lookups use a multi-index over the hash split into
+    `max_distance + 1` bands stored in SQLite. Only blobs sharing a band are
+    compared, so queries stay fast with hundreds of thousands of images.
+    """
+
+    def __init__(
+        self,
+        store_dir: str = STORE_DIR,
+        max_distance: int = 4,
+        link: str = "hardlink",
+        category_max_distance: Optional[Dict[str, int]] = None,
+    ) -> None:
+        if link not in LINK_MODES:
+            raise ValueError(f"link must be one of {LINK_MODES}, got '{link}'")
+        self.store_dir = store_dir
+        self.blob_dir = os.path.join(store_dir, "blobs")
+        self.index_path = os.path.join(store_dir, "index.sqlite")
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.category_max_distance = dict(CATEGORY_MAX_DISTANCE if category_max_distance is None else category_max_distance)
+        self.link = link
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "bytes_saved": 0}
+
+        os.makedirs(self.blob_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    id INTEGER PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    ext TEXT NOT NULL,
+                    phash TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (sha256, ext)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    value INTEGER NOT NULL,
+                    blob_id INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bands ON bands(band, value)")
+            conn.execute("CREATE TABLE IF NOT EXISTS refs (path TEXT PRIMARY KEY, blob_id INTEGER NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_refs_blob ON refs(blob_id)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def find(
+        self,
+        exact: str,
+        phash: int,
+        ext: str,
+        size: Tuple[int, int],
+        max_distance: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the stored blob for an exact or near duplicate, or None."""
+        # The bands only cover self.max_distance, so a caller may narrow it but not widen it.
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        columns = "id, sha256, phash, path, width, height, size_bytes"
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {columns} FROM blobs WHERE sha256 = ? AND ext = ?", (exact, ext)).fetchone()
+            if row is not None and os.path.exists(row[3]):
+                return self._blob(row, distance=0, exact=True)
+
+            # Flat or near-flat crops hash to (almost) all zeros or ones, so
+            # unrelated solid-colour images would look alike: exact match only.
+            if limit <= 0 or not MIN_HASH_BITS <= bin(phash).count("1") <= HASH_BITS - MIN_HASH_BITS:
+                return None
+            clauses = " OR ".join("(band = ? AND value = ?)" for _ in range(self.band_count))
+            params: List[int] = []
+            for band, value in enumerate(_bands(phash, self.band_count)):
+                params.extend((band, value))
+            rows = conn.execute(
+                f"SELECT {columns} FROM blobs WHERE ext = ? AND id IN "
+                f"(SELECT blob_id FROM bands WHERE {clauses})",
+                [ext] + params,
+            ).fetchall()
+
+        best = None
+        for row in rows:
+            distance = hamming(phash, int(row[2], 16))
+            # Never swap in a smaller blob for a larger crop.
+            if distance > limit or row[4] < size[0] or row[5] < size[1]:
+                continue
+            if (best is None or distance < best[0]) and os.path.exists(row[3]):
+                best = (distance, row)
+        return self._blob(best[1], distance=best[0], exact=False) if best else None
+
+    def _blob(self, row: Tuple[Any, ...], distance: int, exact: bool) -> Dict[str, Any]:
+        blob_id, sha256, phash, path, width, height, size_bytes = row
+        return {
+            "id": blob_id, "sha256": sha256, "phash": phash, "path": path,
+            "width": width, "height": height, "bytes": size_bytes,
+            "distance": distance, "exact": exact,
+        }
+
+    def _add(self, exact: str, phash: int, ext: str, size: Tuple[int, int], write: Callable[[str], None]) -> Dict[str, Any]:
+        path = os.path.join(self.blob_dir, exact[:2], f"{exact}.{ext}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            try:
+                write(tmp_path)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        size_bytes = os.path.getsize(path)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, ext, phash, path, width, height, size_bytes, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (exact, ext, f"{phash:016x}", path, size[0], size[1], size_bytes, time.time()),
+            )
+            if cursor.rowcount:
+                conn.executemany(
+                    "INSERT INTO bands (band, value, blob_id) VALUES (?, ?, ?)",
+                    [(band, value, cursor.lastrowid) for band, value in enumerate(_bands(phash, self.band_count))],
+                )
+            row = conn.execute(
+                "SELECT id, sha256, phash, path, width, height, size_bytes FROM blobs WHERE sha256 = ? AND ext = ?",
+                (exact, ext),
+            ).fetchone()
+        return self._blob(row, distance=0, exact=True)
+
+    def _place(self, blob: Dict[str, Any], dest_path: str) -> None:
+        tmp_path = f"{dest_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        if self.link == "hardlink":
+            try:
+                os.link(blob["path"], tmp_path)
+            except OSError:
+                shutil.copyfile(blob["path"], tmp_path)  # different filesystem
+        elif self.link == "symlink":
+            os.symlink(os.path.abspath(blob["path"]), tmp_path)
+        else:
+            shutil.copyfile(blob["path"], tmp_path)
+        os.replace(tmp_path, dest_path)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO refs (path, blob_id) VALUES (?, ?)", (os.path.abspath(dest_path), blob["id"]))
+
+    def save(
+        self,
+        image: Union[Image.Image, Dict[str, Any]],
+        dest_path: str,
+        write: Callable[[str], None],
+        category: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Place `image` at `dest_path` through the store.
+
+        `write(path)` encodes the image to `path`; it is only called when no
+        duplicate is stored. `image` is a PIL image or a passthrough dict
+        holding the original JPEG bytes ({"data", "size"}). `category`
+        selects the near-duplicate limit from `category_max_distance`.
+        """
+        ext = os.path.splitext(dest_path)[1].lstrip(".").lower() or "bin"
+        if isinstance(image, dict):
+            exact = hashlib.sha256(image["data"]).hexdigest()
+            with Image.open(io.BytesIO(image["data"])) as decoded:
+                phash = dhash(decoded)
+            size = tuple(image["size"])
+        else:
+            exact = pixel_hash(image)
+            phash = dhash(image)
+            size = image.size
+
+        blob = self.find(exact, phash, ext, size, self.category_max_distance.get(category, self.max_distance))
+        if blob is None:
+            blob = self._add(exact, phash, ext, size, write)
+            self._count(misses=1)
+        else:
+            self._count(exact_hits=int(blob["exact"]), near_hits=int(not blob["exact"]), bytes_saved=blob["bytes"])
+        self._place(blob, dest_path)
+        return blob
+
+    def prune(self) -> int:
+        """Drop blobs that no project file references any more; return how many."""
+        with self._connect() as conn:
+            refs = conn.execute("SELECT path FROM refs").fetchall()
+            stale = []
+            for (ref_path,) in refs:
+                if not os.path.exists(ref_path):
+                    stale.append((ref_path,))
+            conn.executemany("DELETE FROM refs WHERE path = ?", stale)
+            orphans = conn.execute(
+                "SELECT id, path FROM blobs WHERE id NOT IN (SELECT DISTINCT blob_id FROM refs)"
+            ).fetchall()
+            for blob_id, path in orphans:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM bands WHERE blob_id = ?", (blob_id,))
+                conn.execute("DELETE FROM blobs WHERE id = ?", (blob_id,))
+        if orphans:
+            logger.info(f"[DEDUP] Pruned {len(orphans)} unreferenced blobs")
+        return len(orphans)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        with self._connect() as conn:
+            blobs, size_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM blobs").fetchone()
+        stats.update(blobs=blobs, blob_bytes=size_bytes)
+        return stats
@@ -0,0 +1,1267 @@
+import io
+import os
+import copy
+import json
+import mmap
+import time
+import hashlib
+import logging
+import tarfile
+import zipfile
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Any, AsyncIterator, BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+from PIL import Image, ImageChops
+import re
+import fitz
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from brochure_analyzer.cache import hash_file
+from brochure_analyzer.raster_cache import RasterCache
+from brochure_analyzer.dedup_store import DedupStore
+from brochure_analyzer.bbox_validation import needs_page_sizes, validate_requests
+from brochure_analyzer.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Cleaning bounding box responses for mapping
+def parse_bbox(bbox_str: str):
+    nums = re.findall(r"[-+]?\d*\.\d+|\d+", bbox_str)
+    if len(nums) != 4:
+        raise ValueError(f"Invalid bbox format: {bbox_str}")
+    return tuple(map(float, nums))
+
+
+def sanitize_filename(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+
+RENDER_MODES = ("page", "clip")
+
+# Minimum (width, height) per asset category; smaller assets are skipped.
+DEFAULT_MIN_RESOLUTION = {"amenities": (1280, 720)}
+
+MANIFEST_FILENAME = "asset_manifest.json"
+
+# format name -> (PIL format, file extension)
+OUTPUT_FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp"), "png": ("PNG", ".png")}
+ARCHIVE_FORMATS = ("zip", "tar")
+
+# Rows rendered by both neighbouring tiles when an asset is rendered tiled.
+TILE_OVERLAP = 32
+
+# Pixels rendered beyond a clip on every side: MuPDF anti-aliases at the
+# clip edge, so the outermost row and column would differ from a page render.
+CLIP_MARGIN = 1
+
+# Per-category output settings; None leaves the encoder default. `max_dim`
+# and `thumbnail` are long-edge pixel sizes.
+DEFAULT_OUTPUT_SETTINGS = {"format": "jpeg", "quality": None, "progressive": False, "max_dim": None, "thumbnail": None}
+
+# Streaming order: cheap, high-value assets first.
+CATEGORY_PRIORITY = {"builder": 0, "masterplan": 1, "location": 2, "floorplan": 3, "amenities": 4}
+
+CATEGORY_TITLES = {
+    "floorplan": "Floorplan",
+    "amenities": "Amenity",
+    "masterplan": "Masterplan image",
+    "location": "Location map image",
+    "builder": "Builder logo image",
+}
+
+
+class BrochureProcessor:
+    """
+    Crops brochure assets (floorplans, amenities, masterplan, location map,
+    builder logo) out of the source PDF using the extracted bounding boxes.
+
+    render_mode="page" rasterizes each referenced page at `dpi` and crops the
+    result. render_mode="clip" renders each asset's region on the page's
+    pixel grid; with the same `dpi` its crops are identical to page mode.
+    MuPDF resamples images and re-flattens paths that a clip cuts through,
+    so the clip grows to cover every image and vector path the box touches:
+    over a full-page background it costs as much as a page render. Setting
+    `target_size` (long edge in pixels) picks the DPI per asset instead,
+    capped at `max_dpi`.
+
+    process_all() works one page at a time: it groups asset requests by page,
+    renders that page once, crops everything on it and releases it before
+    moving on, so peak memory follows the largest page rather than the page
+    count. Pages whose raster would exceed `max_page_bytes` fall back to
+    per-region clip rendering.
+
+    `max_asset_bytes` caps the raster memory spent on any single asset
+    (poster-size masterplans and maps). Pages over the cap are never rendered
+    whole, and a region whose one-shot render would exceed it is rendered in
+    overlapping horizontal tiles on the page's pixel grid and stitched into
+    the crop without seams. Tiles do not grow to cover what they cut, so
+    where a tile edge crosses an image or a stroked or filled path, pixels
+    can differ from a page render (text and axis-aligned shapes match). A
+    crop that would not fit in three quarters of the cap is written tile by
+    tile to a memory-mapped temporary file (under TMPDIR) and encoded from
+    there at full DPI; only the WebP encoder copies it back into memory.
+
+    With prefer_native=True an asset whose box lies (mostly) within a single
+    embedded raster image is taken from that image's own pixels. If the box
+    covers the whole image and it is a JPEG, the original stream is written
+    unchanged. Regions with text on top, masked images or rotated placements
+    fall back to rendering.
+
+    `min_resolution` maps a category to the minimum (width, height) kept for
+    it. The size is predicted from the box, page size and DPI (or the native
+    image size) before anything is rendered, so undersized candidates are
+    never rasterized. process_all() returns what was saved, skipped and failed.
+
+    With workers > 1, JPEG encoding and file writes run on a thread pool while
+    the next crops are rendered (Pillow releases the GIL while encoding).
+    Output file names are fixed before any work starts, so results do not
+    depend on thread timing.
+
+    An optional `raster_cache` (page render mode only) stores each rendered
+    page; later runs on the same PDF bytes read the raster back through a
+    memory map and skip MuPDF for those pages.
+
+    Every run writes `asset_manifest.json` next to the cleaned JSON, recording
+    each asset's category, label, page, normalized bbox, render settings,
+    output path and content hash. With incremental=True a run diffs its
+    requests against that manifest: only new or changed assets are rendered
+    and written, assets that are no longer requested are deleted, and
+    unchanged files are left untouched (their mtimes stay stable).
+
+    With a `dedup_store`, every crop is looked up by exact and perceptual
+    hash first; repeats across brochures (logos, stock photos) are linked to
+    the shared blob instead of being encoded and written again.
+
+    `output_settings` maps a category (or "default") to its encoder settings:
+    format (jpeg/webp/png), quality, progressive, max_dim (downscale the long
+    edge) and thumbnail (also write `<name>_thumb` at that long edge, made
+    from the same decoded crop). With archive="zip" or "tar" all assets and
+    the cleaned JSON are streamed into a single `assets.zip`/`assets.tar` in
+    `output_dir` instead of one file per asset.
+
+    Before anything is rendered, all bboxes are validated in one batch (see
+    `bbox_validation`): point or pixel coordinates are converted to
+    normalized ones, swapped corners fixed, boxes clamped to the page, and
+    missing, degenerate or duplicate boxes are skipped. Per-asset
+    diagnostics are returned under report["bbox"].
+
+    The source can be a path, the PDF bytes or a binary file object (read
+    once and opened with `fitz.open(stream=...)`). With output_dir=None
+    nothing is written to disk: the encoded assets are collected in
+    `self.assets` as dicts holding the bytes and their metadata, and the
+    cleaned JSON and manifest are kept in `self.cleaned_data` and
+    `self.manifest`. collect_assets=True collects them in disk mode too.
+
+    iter_assets() (and aiter_assets() for asyncio callers) yields each asset
+    as soon as it is written, visiting pages so that the builder logo and
+    masterplan come first; process_all() simply drains it.
+
+    Every stage is timed through `metrics` (see `metrics.Metrics`): spans
+    for bbox validation, page and clip renders, crops, encodes and the JSON
+    writes, counters for pages, pixels, bytes, saved/skipped assets and
+    errors, and an `asset_seconds` histogram per category. Without a shared
+    `metrics` the processor keeps its own and adds its summary to
+    report["timings"].
+    """
+
+    def __init__(
+        self,
+        source_pdf_path: Union[str, bytes, BinaryIO],
+        extracted_json_data: Dict[str, Any],
+        output_dir: Optional[str] = "output",
+        render_mode: str = "page",
+        dpi: int = 300,
+        target_size: Optional[int] = None,
+        max_dpi: int = 600,
+        max_page_bytes: Optional[int] = None,
+        max_asset_bytes: Optional[int] = None,
+        prefer_native: bool = False,
+        native_overlap: float = 0.9,
+        min_resolution: Optional[Dict[str, Tuple[int, int]]] = None,
+        workers: int = 1,
+        raster_cache: Optional[RasterCache] = None,
+        incremental: bool = False,
+        dedup_store: Optional[DedupStore] = None,
+        output_settings: Optional[Dict[str, Dict[str, Any]]] = None,
+        archive: Optional[str] = None,
+        validate_bboxes: bool = True,
+        source_name: Optional[str] = None,
+        collect_assets: bool = False,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"render_mode must be one of {RENDER_MODES}, got '{render_mode}'")
+        if archive is not None and archive not in ARCHIVE_FORMATS:
+            raise ValueError(f"archive must be one of {ARCHIVE_FORMATS}, got '{archive}'")
+        if archive is not None and (incremental or dedup_store is not None):
+            raise ValueError("archive output cannot be combined with incremental or dedup_store")
+        if output_dir is None and (archive is not None or incremental or dedup_store is not None):
+            raise ValueError("in-memory output cannot be combined with archive, incremental or dedup_store")
+        if isinstance(source_pdf_path, (str, os.PathLike)):
+            self.source_pdf_path: Optional[str] = source_pdf_path
+            self._pdf_bytes: Optional[bytes] = None
+        else:
+            data = source_pdf_path.read() if hasattr(source_pdf_path, "read") else source_pdf_path
+            self.source_pdf_path = None
+            self._pdf_bytes = bytes(data)
+        self.source_name = source_name or (os.path.basename(self.source_pdf_path) if self.source_pdf_path else "<memory>")
+        self.data = extracted_json_data
+        self.output_dir = output_dir
+        self.render_mode = render_mode
+        self.dpi = dpi
+        self.target_size = target_size
+        self.max_dpi = max_dpi
+        self.max_page_bytes = max_page_bytes
+        self.max_asset_bytes = max_asset_bytes
+        self.prefer_native = prefer_native
+        self.native_overlap = native_overlap
+        self.min_resolution = dict(DEFAULT_MIN_RESOLUTION if min_resolution is None else min_resolution)
+        self.report: Dict[str, List[Dict[str, Any]]] = {"saved": [], "skipped": [], "errors": []}
+        self.workers = max(1, workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self.raster_cache = raster_cache
+        self._source_hash: Optional[str] = None
+        self.incremental = incremental
+        self._manifest_assets: Dict[str, Dict[str, Any]] = {}
+        self.dedup_store = dedup_store
+        self.output_settings: Dict[str, Dict[str, Any]] = {}
+        for category in CATEGORY_TITLES:
+            settings = dict(DEFAULT_OUTPUT_SETTINGS)
+            settings.update((output_settings or {}).get("default", {}))
+            settings.update((output_settings or {}).get(category, {}))
+            if settings["format"] not in OUTPUT_FORMATS:
+                raise ValueError(f"format must be one of {tuple(OUTPUT_FORMATS)}, got '{settings['format']}'")
+            self.output_settings[category] = settings
+        self.archive = archive
+        self.validate_bboxes = validate_bboxes
+        self._archive_writer: Optional[Union[zipfile.ZipFile, tarfile.TarFile]] = None
+        self._archive_lock = threading.Lock()
+        self.collect_assets = collect_assets or output_dir is None
+        self.assets: List[Dict[str, Any]] = []
+        self._ready: deque = deque()
+        self.cleaned_data: Optional[Dict[str, Any]] = None
+        self.manifest: Optional[Dict[str, Any]] = None
+        self._owns_metrics = metrics is None
+        self.metrics = Metrics(run=self.source_name) if metrics is None else metrics
+        self.image_dir = os.path.join(self.output_dir or "", "images")
+
+        self.subdirs = {
+            "floorplan": os.path.join(self.image_dir, "floorplan"),
+            "amenities": os.path.join(self.image_dir, "amenities"),
+            "masterplan": os.path.join(self.image_dir, "masterplan"),
+            "location": os.path.join(self.image_dir, "location"),
+            "builder": os.path.join(self.image_dir, "builder"),
+        }
+
+        if self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            if archive is None:
+                os.makedirs(self.image_dir, exist_ok=True)
+
+    def _open_pdf(self) -> fitz.Document:
+        if self._pdf_bytes is not None:
+            return fitz.open(stream=self._pdf_bytes, filetype="pdf")
+        return fitz.open(self.source_pdf_path)
+
+    def _ensure_dir(self, key: str) -> None:
+        os.makedirs(self.subdirs[key], exist_ok=True)
+
+    def _crop_bbox(self, image: Image.Image, bbox_str: str) -> Image.Image:
+        try:
+            width, height = image.size
+            left, top, right, bottom = parse_bbox(bbox_str)
+            return image.crop((left * width, top * height, right * width, bottom * height))
+        except Exception as e:
+            raise ValueError(f"Invalid bounding box format: '{bbox_str}' - {e}")
+
+    def _asset_dpi(self, clip: fitz.Rect) -> float:
+        if not self.target_size:
+            return self.dpi
+        long_edge_inches = max(clip.width, clip.height) / 72
+        if long_edge_inches <= 0:
+            return self.dpi
+        return min(self.target_size / long_edge_inches, self.max_dpi)
+
+    def _page_region(self, page: fitz.Page, box: Tuple[float, float, float, float]) -> fitz.Rect:
+        left, top, right, bottom = box
+        page_rect = page.rect
+        return fitz.Rect(
+            page_rect.x0 + left * page_rect.width,
+            page_rect.y0 + top * page_rect.height,
+            page_rect.x0 + right * page_rect.width,
+            page_rect.y0 + bottom * page_rect.height,
+        )
+
+    def _pixel_box(self, page: fitz.Page, box: Tuple[float, float, float, float], dpi: float) -> Tuple[int, int, int, int]:
+        # Snap to the pixel grid of a full-page render at this DPI, rounding
+        # the same way PIL's crop does, so both modes crop the same box.
+        left, top, right, bottom = box
+        zoom = dpi / 72
+        full = (page.rect * fitz.Matrix(zoom, zoom)).irect
+        return (
+            full.x0 + round(left * full.width),
+            full.y0 + round(top * full.height),
+            full.x0 + round(right * full.width),
+            full.y0 + round(bottom * full.height),
+        )
+
+    def _clip_dpi(self, page: fitz.Page, box: Tuple[float, float, float, float]) -> float:
+        return self._asset_dpi(self._page_region(page, box))
+
+    def _clip_area(self, page: fitz.Page, matrix: fitz.Matrix, pixel_box: Tuple[int, int, int, int]) -> fitz.IRect:
+        # MuPDF decodes and scales only the part of an image inside the clip,
+        # starting from the clip origin, and splits paths at the clip edge
+        # before flattening them, so anything cut by the clip comes out a
+        # sub-pixel off a page render. Rendering every image and path the box
+        # touches in full, plus a margin for edge anti-aliasing, makes the
+        # crop identical to page mode. Glyphs are rendered whole regardless.
+        margin = (-CLIP_MARGIN, -CLIP_MARGIN, CLIP_MARGIN, CLIP_MARGIN)
+        area = fitz.IRect(pixel_box) + margin
+        region = fitz.Rect(pixel_box) * ~matrix
+        for kind, bbox in page.get_bboxlog():
+            bbox = fitz.Rect(bbox)
+            if not kind.endswith("-text") and bbox.intersects(region):
+                area |= (bbox * matrix).irect + margin
+        return area & (page.rect * matrix).irect
+
+    def _crop_buffer(self, size: int) -> Tuple[Union[bytearray, mmap.mmap], bool]:
+        # Crops that fit in three quarters of the cap stay in memory; larger
+        # ones go to an unlinked temporary file, mapped so the encoder reads
+        # the rows back from the page cache instead of the heap.
+        if size <= 0.75 * self.max_asset_bytes:
+            return bytearray(size), False
+        with tempfile.TemporaryFile(prefix="brochure_crop_") as f:
+            f.truncate(size)
+            return mmap.mmap(f.fileno(), size), True
+
+    def _render_tiled(self, page: fitz.Page, matrix: fitz.Matrix, pixel_box: Tuple[int, int, int, int]) -> Image.Image:
+        x0, y0, x1, y1 = pixel_box
+        width, height = x1 - x0, y1 - y0
+        row_bytes = width * 3
+        buffer, spilled = self._crop_buffer(row_bytes * height)
+        # A tile costs its pixmap plus up to twice that in MuPDF scratch space.
+        budget = self.max_asset_bytes - (0 if spilled else len(buffer))
+        rows = max(1, budget // (3 * width * 3 + 1) - TILE_OVERLAP - 2)
+        if spilled:
+            self.metrics.count("clip_spills")
+
+        for top in range(y0, y1, rows):
+            bottom = min(top + rows + TILE_OVERLAP, y1)
+            tile_box = fitz.Rect(x0 - CLIP_MARGIN, top - CLIP_MARGIN, x1 + CLIP_MARGIN, bottom + CLIP_MARGIN)
+            pix = page.get_pixmap(matrix=matrix, clip=tile_box * ~matrix)
+            samples = pix.samples_mv if hasattr(pix, "samples_mv") else memoryview(pix.samples)
+            splice = 0
+            if top > y0:
+                # MuPDF steps scaled images from the clip origin, so a tile
+                # starting inside an image can be a sub-pixel out of phase
+                # with the tile above. Both render the overlap rows; switch
+                # to the new tile on the row where the two agree best.
+                overlap = min(TILE_OVERLAP, bottom - top)
+                start = (top - y0) * row_bytes
+                previous = Image.frombuffer("RGB", (width, overlap), bytes(buffer[start:start + overlap * row_bytes]), "raw", "RGB", 0, 1)
+                tile = Image.frombuffer("RGB", (pix.width, pix.height), samples, "raw", "RGB", pix.stride, 1)
+                current = tile.crop((x0 - pix.x, top - pix.y, x1 - pix.x, top - pix.y + overlap))
+                per_row = ImageChops.difference(previous, current).convert("L")
+                per_row = per_row.resize((1, overlap), Image.Resampling.BOX).tobytes()
+                splice = min(range(overlap), key=lambda row: (per_row[row], row))
+                del previous, current, tile
+            # Rows above the splice stay as the previous tile wrote them.
+            column = (x0 - pix.x) * 3
+            for y in range(top + splice, bottom):
+                source = (y - pix.y) * pix.stride + column
+                target = (y - y0) * row_bytes
+                buffer[target:target + row_bytes] = samples[source:source + row_bytes]
+            del samples, pix
+        return Image.frombuffer("RGB", (width, height), buffer, "raw", "RGB", 0, 1)
+
+    def _render_clip(self, page: fitz.Page, bbox_str: str) -> Image.Image:
+        try:
+            box = parse_bbox(bbox_str)
+            zoom = self._clip_dpi(page, box) / 72
+            matrix = fitz.Matrix(zoom, zoom)
+            x0, y0, x1, y1 = self._pixel_box(page, box, zoom * 72)
+            if x1 <= x0 or y1 <= y0:
+                raise ValueError("empty region")
+
+            # A one-shot render holds the pixmap, its PIL copy and the crop.
+            area = self._clip_area(page, matrix, (x0, y0, x1, y1))
+            if self.max_asset_bytes and (2 * area.width * area.height + (x1 - x0) * (y1 - y0)) * 3 > self.max_asset_bytes:
+                return self._render_tiled(page, matrix, (x0, y0, x1, y1))
+
+            pix = page.get_pixmap(matrix=matrix, clip=fitz.Rect(area) * ~matrix)
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            return img.crop((x0 - pix.x, y0 - pix.y, x1 - pix.x, y1 - pix.y))
+        except Exception as e:
+            raise ValueError(f"Invalid bounding box format: '{bbox_str}' - {e}")
+
+    def _native_candidate(self, page: fitz.Page, region: fitz.Rect) -> Optional[Tuple[Dict[str, Any], fitz.Rect]]:
+        region_area = region.get_area()
+        if region_area <= 0:
+            return None
+
+        candidates = []
+        for info in page.get_image_info(xrefs=True):
+            if not info.get("xref"):
+                continue
+            image_rect = fitz.Rect(info["bbox"])
+            overlap = (region & image_rect).get_area()
+            if overlap >= self.native_overlap * region_area:
+                candidates.append((info, image_rect))
+
+        # Exactly one image must carry the region, with nothing drawn over it.
+        if len(candidates) != 1 or page.get_text("words", clip=region):
+            return None
+
+        info, image_rect = candidates[0]
+        a, b, c, d = info["transform"][:4]
+        if abs(b) > 1e-6 or abs(c) > 1e-6 or a <= 0 or d <= 0:
+            return None
+        return info, image_rect
+
+    def _predicted_size(self, page: fitz.Page, bbox_str: str, use_clip: bool) -> Tuple[int, int]:
+        """Output size an asset would have, computed without rasterizing anything."""
+        box = parse_bbox(bbox_str)
+        region = self._page_region(page, box)
+        dpi = self._clip_dpi(page, box) if use_clip else self.dpi
+        x0, y0, x1, y1 = self._pixel_box(page, box, dpi)
+        width, height = max(x1 - x0, 0), max(y1 - y0, 0)
+
+        if self.prefer_native:
+            candidate = self._native_candidate(page, region)
+            if candidate is not None:
+                # Be generous: the asset may come from either path.
+                info, image_rect = candidate
+                inter = region & image_rect
+                if inter.get_area() >= self.native_overlap * image_rect.get_area():
+                    native = (info["width"], info["height"])
+                else:
+                    native = (
+                        round(info["width"] * inter.width / image_rect.width),
+                        round(info["height"] * inter.height / image_rect.height),
+                    )
+                width, height = max(width, native[0]), max(height, native[1])
+        return width, height
+
+    def _native_asset(self, page: fitz.Page, bbox_str: str) -> Optional[Union[Image.Image, Dict[str, Any]]]:
+        """
+        Take the asset from an embedded image when the box sits on one.
+
+        Returns a PIL image cropped from the native pixels, a dict holding the
+        untouched JPEG stream ({"data", "size"}), or None to fall back to
+        rendering.
+        """
+        region = self._page_region(page, parse_bbox(bbox_str))
+        candidate = self._native_candidate(page, region)
+        if candidate is None:
+            return None
+
+        info, image_rect = candidate
+        pdf = page.parent
+        extracted = pdf.extract_image(info["xref"])
+        if not extracted or extracted.get("smask"):
+            return None
+        width, height = extracted["width"], extracted["height"]
+
+        covered = (region & image_rect).get_area() >= self.native_overlap * image_rect.get_area()
+        if covered and extracted["ext"] in ("jpeg", "jpg") and extracted.get("colorspace") in (1, 3):
+            return {"data": extracted["image"], "size": (width, height)}
+
+        pix = fitz.Pixmap(pdf, info["xref"])
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n != 3:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        if covered:
+            return image
+
+        inter = region & image_rect
+        scale_x = pix.width / image_rect.width
+        scale_y = pix.height / image_rect.height
+        return image.crop((
+            (inter.x0 - image_rect.x0) * scale_x,
+            (inter.y0 - image_rect.y0) * scale_y,
+            (inter.x1 - image_rect.x0) * scale_x,
+            (inter.y1 - image_rect.y0) * scale_y,
+        ))
+
+    def _crop(self, pages: Dict[int, Union[Image.Image, fitz.Page]], page_idx: Any, bbox_str: str) -> Image.Image:
+        source = pages[int(page_idx)]
+        if isinstance(source, Image.Image):
+            return self._crop_bbox(source, bbox_str)
+        with self.metrics.span("render_clip"):
+            image = self._render_clip(source, bbox_str)
+        self.metrics.count("clip_renders")
+        self.metrics.count("pixels_rendered", image.width * image.height)
+        return image
+
+    def _is_hd(self, image: Union[Image.Image, Dict[str, Any]], min_width: int = 1280, min_height: int = 720) -> bool:
+        width, height = image["size"] if isinstance(image, dict) else image.size
+        return width >= min_width and height >= min_height
+
+    def save_cleaned_json(self, filename: str = "extracted_data.json") -> None:
+        # Deep copy: the caller's extraction keeps its bboxes for later runs.
+        cleaned_data = copy.deepcopy(self.data)
+        cleaned_data.pop("amenitiesImages", None)
+        cleaned_data.pop("masterplanImage", None)
+        cleaned_data.pop("locationMapImage", None)
+
+        for config in cleaned_data.get("floorplanConfigs", []):
+            for key in ("imageId", "boundingBoxLTRB", "pageNumber"):
+                config.pop(key, None)
+
+        for key in ("imageId", "boundingBoxLTRB", "pageNumber"):
+            cleaned_data.get("builder", {}).pop(key, None)
+
+        self.cleaned_data = cleaned_data
+        if self.output_dir is None:
+            return
+        with self.metrics.span("write_json"):
+            if self._archive_writer is not None:
+                self._archive_add(filename, json.dumps(cleaned_data, indent=2, ensure_ascii=False).encode("utf-8"), compress=True)
+                logger.info(f"[INFO] Cleaned JSON saved to: {self._archive_path()}:{filename}")
+                return
+
+            json_path = os.path.join(self.output_dir, filename)
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+        logger.info(f"[INFO] Cleaned JSON saved to: {json_path}")
+
+    def _valid_request(self, bbox: Any, page_idx: Any) -> bool:
+        return bool(bbox) and page_idx is not None and str(page_idx).strip() != ""
+
+    def _unique_filename(self, stem: str, seen: Dict[str, int]) -> str:
+        # Repeated names get _1, _2, ... suffixes in declaration order,
+        # decided while building requests so that concurrent writers never
+        # race on a path and every run names the same asset the same way.
+        filename = sanitize_filename(f"{stem}.jpg")
+        count = seen.get(filename, 0)
+        seen[filename] = count + 1
+        while count:
+            candidate = sanitize_filename(f"{stem}_{count}.jpg")
+            if candidate not in seen:
+                seen[candidate] = 1
+                return candidate
+            count += 1
+        return filename
+
+    def _floorplan_requests(self) -> List[Dict[str, Any]]:
+        requests = []
+        seen: Dict[str, int] = {}
+        for config in self.data.get("floorplanConfigs", []):
+            bbox = config.get("boundingBoxLTRB")
+            page_idx = config.get("pageNumber")
+
+            if not self._valid_request(bbox, page_idx):
+                logger.warning(f"[WARNING] Skipping floorplan due to invalid bbox/page: bbox='{bbox}' page_idx='{page_idx}'")
+                continue
+
+            bhk = config.get("bhkType", "Unit").replace(" ", "").replace("+", "_")
+            filename = self._unique_filename(bhk, seen)
+            requests.append({
+                "category": "floorplan",
+                "label": config.get("bhkType", "Unit"),
+                "page": page_idx,
+                "bbox": bbox,
+                "filename": filename,
+            })
+        return requests
+
+    def _amenity_requests(self) -> List[Dict[str, Any]]:
+        requests = []
+        seen: Dict[str, int] = {}
+        for amenity in self.data.get("amenitiesImages", []):
+            bbox = amenity.get("boundingBoxLTRB")
+            page_idx = amenity.get("pageNumber")
+            label = amenity.get("amenityLabel", "Amenity")
+
+            if not self._valid_request(bbox, page_idx):
+                logger.warning(f"[WARNING] Skipping amenity due to invalid bbox/page: {label}")
+                continue
+
+            requests.append({
+                "category": "amenities",
+                "label": label,
+                "page": page_idx,
+                "bbox": bbox,
+                "filename": self._unique_filename(label.replace("&", "and"), seen),
+            })
+        return requests
+
+    def _single_request(self, section: str, category: str, label: str, stem: str) -> List[Dict[str, Any]]:
+        value = self.data.get(section)
+        if not isinstance(value, dict) or not value:
+            return []
+
+        bbox = value.get("boundingBoxLTRB")
+        page_idx = value.get("pageNumber")
+        if not self._valid_request(bbox, page_idx):
+            logger.warning(f"[WARNING] Skipping {label} due to invalid bbox/page")
+            return []
+        return [{"category": category, "label": label, "page": page_idx, "bbox": bbox, "filename": f"{stem}.jpg"}]
+
+    def _masterplan_requests(self) -> List[Dict[str, Any]]:
+        return self._single_request("masterplanImage", "masterplan", "masterplan", "masterplan")
+
+    def _location_requests(self) -> List[Dict[str, Any]]:
+        return self._single_request("locationMapImage", "location", "location map", "location_map")
+
+    def _builder_requests(self) -> List[Dict[str, Any]]:
+        return self._single_request("builder", "builder", "builder logo", "logo")
+
+    def _asset_requests(self) -> List[Dict[str, Any]]:
+        requests = (
+            self._floorplan_requests()
+            + self._amenity_requests()
+            + self._masterplan_requests()
+            + self._location_requests()
+            + self._builder_requests()
+        )
+        for request in requests:
+            extension = OUTPUT_FORMATS[self.output_settings[request["category"]]["format"]][1]
+            request["filename"] = os.path.splitext(request["filename"])[0] + extension
+        return requests
+
+    def _save_asset(self, request: Dict[str, Any], cropped: Union[Image.Image, Dict[str, Any]]) -> None:
+        threshold = self.min_resolution.get(request["category"])
+        if threshold and not self._is_hd(cropped, *threshold):
+            size = cropped["size"] if isinstance(cropped, dict) else cropped.size
+            self._skip(request, "below minimum resolution", size)
+            return
+
+        if self._pool is None:
+            self._write_asset(request, cropped)
+            return
+
+        # Bound the crops waiting in memory for an encoder thread.
+        if len(self._pending) >= 2 * self.workers:
+            done, not_done = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._pending = list(not_done)
+        self._pending.append(self._pool.submit(self._write_asset, request, cropped))
+
+    def _encode(self, image: Union[Image.Image, Dict[str, Any]], settings: Dict[str, Any]) -> bytes:
+        """Encode `image` in memory and return the bytes."""
+        if isinstance(image, dict):
+            # Untouched JPEG stream: no decode, no re-encode.
+            return image["data"]
+
+        pil_format = OUTPUT_FORMATS[settings["format"]][0]
+        params: Dict[str, Any] = {"format": pil_format}
+        if settings.get("quality") is not None and pil_format in ("JPEG", "WEBP"):
+            params["quality"] = settings["quality"]
+        if settings.get("progressive") and pil_format == "JPEG":
+            params.update(progressive=True, optimize=True)
+        buffer = io.BytesIO()
+        image.save(buffer, **params)
+        return buffer.getvalue()
+
+    def _prepare_image(self, cropped: Union[Image.Image, Dict[str, Any]], settings: Dict[str, Any]) -> Union[Image.Image, Dict[str, Any]]:
+        # A native JPEG passes through unless it has to be transcoded,
+        # resized or thumbnailed.
+        if isinstance(cropped, dict):
+            passthrough = (
+                settings["format"] == "jpeg" and settings.get("quality") is None and not settings.get("progressive")
+                and not settings.get("max_dim") and not settings.get("thumbnail")
+            )
+            if passthrough:
+                return cropped
+            decoded = Image.open(io.BytesIO(cropped["data"]))
+            decoded.load()
+            cropped = decoded if decoded.mode in ("RGB", "L") else decoded.convert("RGB")
+
+        max_dim = settings.get("max_dim")
+        if max_dim and max(cropped.size) > max_dim:
+            cropped = self._downscale(cropped, max_dim)
+        return cropped
+
+    def _downscale(self, image: Image.Image, long_edge: int) -> Image.Image:
+        scale = long_edge / max(image.size)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+    def _archive_path(self) -> str:
+        return os.path.join(self.output_dir, f"assets.{self.archive}")
+
+    def _archive_add(self, name: str, data: bytes, compress: bool = False) -> None:
+        with self._archive_lock:
+            if isinstance(self._archive_writer, zipfile.ZipFile):
+                # Encoded images do not deflate; only the JSON is compressed.
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+                self._archive_writer.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                self._archive_writer.addfile(info, io.BytesIO(data))
+
+    def _write_output(
+        self,
+        image: Union[Image.Image, Dict[str, Any]],
+        category: str,
+        filename: str,
+        settings: Dict[str, Any],
+        use_store: bool = True,
+    ) -> Tuple[Optional[str], bytes]:
+        """Write one encoded image; return (path, encoded bytes). The path is None in memory mode."""
+        if self.output_dir is None or self._archive_writer is not None:
+            data = self._encode(image, settings)
+            if self.output_dir is None:
+                return None, data
+            name = f"images/{category}/{filename}"
+            self._archive_add(name, data)
+            return f"{self._archive_path()}:{name}", data
+
+        self._ensure_dir(category)
+        save_path = os.path.join(self.subdirs[category], filename)
+        # Encoded once in memory: the bytes are written, hashed and returned
+        # without reading the file back.
+        encoded: List[bytes] = []
+
+        def write(path: str) -> None:
+            encoded.append(self._encode(image, settings))
+            with open(path, "wb") as f:
+                f.write(encoded[0])
+
+        if use_store and self.dedup_store is not None:
+            blob = self.dedup_store.save(image, save_path, write, category=category)
+            if not encoded:
+                # A stored duplicate was linked in without encoding; its bytes are the asset's.
+                with open(blob["path"], "rb") as f:
+                    encoded.append(f.read())
+            return save_path, encoded[0]
+
+        # save_path may be a hard link into a dedup store from an earlier
+        # run; writing through it would change the shared blob and every
+        # project linked to it. Replace the link instead.
+        tmp_path = f"{save_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, save_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return save_path, encoded[0]
+
+    def _asset_record(
+        self,
+        request: Dict[str, Any],
+        image: Union[Image.Image, Dict[str, Any]],
+        path: Optional[str],
+        data: bytes,
+        content_hash: str,
+        thumb: Optional[Tuple[Image.Image, Optional[str], bytes]],
+    ) -> Dict[str, Any]:
+        category, filename = request["category"], request["filename"]
+        width, height = image["size"] if isinstance(image, dict) else image.size
+        asset = {
+            "category": category,
+            "label": request["label"],
+            "page": request["page"],
+            "bbox": (request.get("spec") or {}).get("bbox"),
+            "filename": filename,
+            "name": f"images/{category}/{filename}",
+            "path": path,
+            "format": self.output_settings[category]["format"],
+            "width": width,
+            "height": height,
+            "bytes": len(data),
+            "sha256": content_hash,
+            "data": data,
+            "thumbnail": None,
+        }
+        if thumb is not None:
+            thumb_image, thumb_path, thumb_data = thumb
+            stem, extension = os.path.splitext(filename)
+            asset["thumbnail"] = {
+                "name": f"images/{category}/{stem}_thumb{extension}",
+                "path": thumb_path,
+                "width": thumb_image.width,
+                "height": thumb_image.height,
+                "bytes": len(thumb_data),
+                "data": thumb_data,
+            }
+        return asset
+
+    def _write_asset(self, request: Dict[str, Any], cropped: Union[Image.Image, Dict[str, Any]]) -> None:
+        category = request["category"]
+        filename = request["filename"]
+        settings = self.output_settings[category]
+        try:
+            with self.metrics.span("encode", category=category):
+                image = self._prepare_image(cropped, settings)
+                save_path, data = self._write_output(image, category, filename, settings)
+                content_hash = hashlib.sha256(data).hexdigest()
+                thumb = thumb_path = None
+                if settings.get("thumbnail"):
+                    stem, extension = os.path.splitext(filename)
+                    thumb_image = image if max(image.size) <= settings["thumbnail"] else self._downscale(image, settings["thumbnail"])
+                    thumb_path, thumb_data = self._write_output(thumb_image, category, f"{stem}_thumb{extension}", settings, use_store=False)
+                    thumb = (thumb_image, thumb_path, thumb_data)
+            asset = self._asset_record(request, image, save_path, data, content_hash, thumb)
+        except Exception as e:
+            self._report_failure(request, e)
+            return
+        key = save_path or self._asset_path(request)
+        self._manifest_assets[key] = dict(
+            request.get("spec") or {}, path=save_path, sha256=content_hash, bytes=len(data), thumbnail=thumb_path
+        )
+        entry = {"category": category, "label": request["label"], "path": save_path}
+        if save_path is None:
+            entry["name"] = f"images/{category}/{filename}"
+        if thumb_path:
+            entry["thumbnail"] = thumb_path
+        self.report["saved"].append(entry)
+        if self.collect_assets:
+            self.assets.append(asset)
+        self._ready.append(asset)
+        self.metrics.count("assets_saved", category=category)
+        self.metrics.count("bytes_written", len(data) + (len(thumb[2]) if thumb else 0), category=category)
+        if "started" in request:
+            self.metrics.observe("asset_seconds", time.perf_counter() - request["started"], category=category)
+        logger.info(f"[INFO] {CATEGORY_TITLES[category]} saved: {filename}")
+
+    def _skip(self, request: Dict[str, Any], reason: str, size: Optional[Tuple[int, int]] = None) -> None:
+        size = list(size) if size is not None else None
+        self._manifest_assets[self._asset_path(request)] = dict(request.get("spec") or {}, path=None, skipped=reason, size=size)
+        self.report["skipped"].append({
+            "category": request["category"],
+            "label": request["label"],
+            "page": request["page"],
+            "reason": reason,
+            "size": size,
+        })
+        self.metrics.count("assets_skipped", category=request["category"], reason=reason.split(":")[0])
+        detail = f" ({size[0]}x{size[1]})" if size else ""
+        logger.info(f"[INFO] Skipped {CATEGORY_TITLES[request['category']].lower()} '{request['label']}': {reason}{detail}")
+
+    def _report_failure(self, request: Dict[str, Any], error: Any) -> None:
+        self.report["errors"].append({"category": request["category"], "label": request["label"], "error": str(error)})
+        self.metrics.count("errors", category=request["category"])
+        logger.error(f"[ERROR] Failed to extract {CATEGORY_TITLES[request['category']].lower()} '{request['label']}': {error}")
+
+    def _drain(self) -> Iterator[Dict[str, Any]]:
+        # Encoder threads append finished assets; hand them out in order.
+        while self._ready:
+            yield self._ready.popleft()
+
+    def _iter_requests(self, pages: Dict[int, Union[Image.Image, fitz.Page]], requests: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for request in requests:
+            request["started"] = time.perf_counter()
+            try:
+                with self.metrics.span("crop", category=request["category"]):
+                    cropped = self._crop(pages, request["page"], request["bbox"])
+                self.metrics.count("crops", category=request["category"])
+                self._save_asset(request, cropped)
+            except Exception as e:
+                self._report_failure(request, e)
+            yield from self._drain()
+
+    def _run_requests(self, pages: Dict[int, Union[Image.Image, fitz.Page]], requests: List[Dict[str, Any]]) -> None:
+        for _ in self._iter_requests(pages, requests):
+            pass
+
+    def _extract_floorplans(self, pages: Dict[int, Image.Image]) -> None:
+        self._run_requests(pages, self._floorplan_requests())
+
+    def _extract_amenities(self, pages: Dict[int, Image.Image]) -> None:
+        self._run_requests(pages, self._amenity_requests())
+
+    def _extract_masterplan(self, pages: Dict[int, Image.Image]) -> None:
+        self._run_requests(pages, self._masterplan_requests())
+
+    def _extract_location_map(self, pages: Dict[int, Image.Image]) -> None:
+        self._run_requests(pages, self._location_requests())
+
+    def extract_builder_logo(self, pages: Dict[int, Image.Image]) -> None:
+        self._run_requests(pages, self._builder_requests())
+
+    def _load_pages_with_fitz(self, required_pages):
+        page_images = {}
+        with self._open_pdf() as pdf:
+            for page_num in required_pages:
+                page = pdf[page_num]
+                pix = page.get_pixmap(dpi=self.dpi)
+                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                page_images[page_num] = img
+        return page_images
+
+    def extract_images(self, pages: Dict[int, Image.Image]) -> None:
+        self._extract_floorplans(pages)
+        self._extract_amenities(pages)
+        self._extract_masterplan(pages)
+        self._extract_location_map(pages)
+
+    def _page_raster_bytes(self, page: fitz.Page) -> int:
+        zoom = self.dpi / 72
+        full = (page.rect * fitz.Matrix(zoom, zoom)).irect
+        return full.width * full.height * 3
+
+    def _gate(self, requests: List[Dict[str, Any]], size_fn: Callable[[Dict[str, Any]], Tuple[int, int]]) -> List[Dict[str, Any]]:
+        gated = []
+        for request in requests:
+            threshold = self.min_resolution.get(request["category"])
+            if threshold:
+                try:
+                    size = size_fn(request)
+                except Exception:
+                    size = None  # a bad bbox is reported by the extraction path
+                if size is not None and (size[0] < threshold[0] or size[1] < threshold[1]):
+                    self._skip(request, "below minimum resolution", size)
+                    continue
+            gated.append(request)
+        return gated
+
+    def _uses_raster_cache(self) -> bool:
+        return self.raster_cache is not None and self.render_mode == "page" and not self.prefer_native
+
+    def _pdf_hash(self) -> str:
+        if self._source_hash is None:
+            if self._pdf_bytes is not None:
+                self._source_hash = hashlib.sha256(self._pdf_bytes).hexdigest()
+            else:
+                self._source_hash = hash_file(self.source_pdf_path)
+        return self._source_hash
+
+    def _extract_cached_page(self, page_num: int, page_image: Image.Image, requests: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        width, height = page_image.size
+
+        def crop_size(request: Dict[str, Any]) -> Tuple[int, int]:
+            left, top, right, bottom = parse_bbox(request["bbox"])
+            return (
+                max(round(right * width) - round(left * width), 0),
+                max(round(bottom * height) - round(top * height), 0),
+            )
+
+        requests = self._gate(requests, crop_size)
+        if requests:
+            yield from self._iter_requests({page_num: page_image}, requests)
+
+    def _extract_page(self, page: fitz.Page, page_num: int, requests: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        use_clip = self.render_mode == "clip" or (
+            self.max_page_bytes is not None and self._page_raster_bytes(page) > self.max_page_bytes
+        ) or (self.max_asset_bytes is not None and self._page_raster_bytes(page) > self.max_asset_bytes)
+
+        requests = self._gate(requests, lambda request: self._predicted_size(page, request["bbox"], use_clip))
+        if not requests:
+            return
+
+        if self.prefer_native:
+            pending = []
+            for request in requests:
+                request["started"] = time.perf_counter()
+                try:
+                    with self.metrics.span("native_extract", category=request["category"]):
+                        native = self._native_asset(page, request["bbox"])
+                except Exception:
+                    native = None
+                if native is None:
+                    pending.append(request)
+                    continue
+                self.metrics.count("native_assets", category=request["category"])
+                try:
+                    self._save_asset(request, native)
+                except Exception as e:
+                    self._report_failure(request, e)
+                yield from self._drain()
+            requests = pending
+            if not requests:
+                return
+
+        # Pages whose full raster would exceed the memory ceiling are cropped
+        # region by region instead, so peak memory stays bounded.
+        if use_clip:
+            yield from self._iter_requests({page_num: page}, requests)
+            return
+
+        with self.metrics.span("render_page"):
+            pix = page.get_pixmap(dpi=self.dpi)
+        self.metrics.count("pages_rendered")
+        self.metrics.count("pixels_rendered", pix.width * pix.height)
+        # Wrap the pixmap's buffer directly; every crop copies its region out,
+        # so the page raster exists exactly once and is freed with `pix`.
+        samples = pix.samples_mv if hasattr(pix, "samples_mv") else pix.samples
+        if self._uses_raster_cache():
+            with self.metrics.span("raster_cache_put"):
+                self.raster_cache.put(self._pdf_hash(), page_num, self.dpi, samples, pix.width, pix.height, pix.stride)
+        page_image = Image.frombuffer("RGB", (pix.width, pix.height), samples, "raw", "RGB", pix.stride, 1)
+        try:
+            yield from self._iter_requests({page_num: page_image}, requests)
+        finally:
+            del page_image, samples, pix
+
+    def _validated_requests(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        page_sizes = page_count = None
+        with self.metrics.span("validate_bboxes"):
+            # Page geometry is only needed for non-normalized boxes and the page
+            # range check; with a warm raster cache, MuPDF stays closed.
+            if not self._uses_raster_cache() or needs_page_sizes(requests):
+                with self._open_pdf() as pdf:
+                    page_count = pdf.page_count
+                    page_sizes = {i: (page.rect.width, page.rect.height) for i, page in enumerate(pdf)}
+            kept, diagnostics = validate_requests(requests, page_sizes, page_count)
+        self.report["bbox"] = diagnostics
+        for request, diagnostic in zip(requests, diagnostics):
+            if diagnostic["status"] == "rejected":
+                request["spec"] = self._asset_spec(request, self._render_settings())
+                self._skip(request, f"bbox rejected: {diagnostic['reason']}")
+            elif diagnostic["flags"] or diagnostic["unit"] != "normalized":
+                logger.info(f"[INFO] Adjusted bbox for {CATEGORY_TITLES[request['category']].lower()} '{request['label']}': "
+                            f"{diagnostic['input']} -> {diagnostic['bbox']} ({diagnostic['unit']}, {', '.join(diagnostic['flags']) or 'converted'})")
+        return kept
+
+    def _asset_path(self, request: Dict[str, Any]) -> str:
+        return os.path.join(self.subdirs[request["category"]], request["filename"])
+
+    def _render_settings(self) -> Dict[str, Any]:
+        return {
+            "source_sha256": self._pdf_hash(),
+            "render_mode": self.render_mode,
+            "dpi": self.dpi,
+            "target_size": self.target_size,
+            "max_dpi": self.max_dpi,
+            "prefer_native": self.prefer_native,
+            "native_overlap": self.native_overlap,
+        }
+
+    def _asset_spec(self, request: Dict[str, Any], settings: Dict[str, Any]) -> Dict[str, Any]:
+        # Everything that determines the output bytes; equal specs mean the
+        # existing file can be kept as it is.
+        try:
+            bbox: Any = [round(v, 6) for v in parse_bbox(request["bbox"])]
+        except Exception:
+            bbox = request["bbox"]
+        threshold = self.min_resolution.get(request["category"])
+        return {
+            "category": request["category"],
+            "label": request["label"],
+            "filename": request["filename"],
+            "page": request["page"],
+            "bbox": bbox,
+            "render": dict(settings, min_resolution=list(threshold) if threshold else None),
+            "output": self.output_settings[request["category"]],
+        }
+
+    def load_manifest(self) -> Dict[str, Any]:
+        if self.output_dir is None:
+            return {"assets": []}
+        manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"assets": []}
+
+    def _unchanged(self, request: Dict[str, Any], previous: Dict[str, Dict[str, Any]]) -> bool:
+        entry = previous.get(self._asset_path(request))
+        if entry is None or {k: entry.get(k) for k in request["spec"]} != request["spec"]:
+            return False
+        if entry.get("path") is None:
+            return True  # skipped last time for the same reason it would be now
+        try:
+            if entry.get("thumbnail") and not os.path.exists(entry["thumbnail"]):
+                return False
+            return os.path.getsize(entry["path"]) == entry.get("bytes")
+        except OSError:
+            return False
+
+    def _save_manifest(self, previous: Dict[str, Dict[str, Any]]) -> None:
+        if self.incremental:
+            for path, entry in previous.items():
+                current = self._manifest_assets.get(path)
+                if entry.get("path") is None or (current is not None and current.get("path") is not None):
+                    continue
+                try:
+                    for stale_path in filter(None, (path, entry.get("thumbnail"))):
+                        if os.path.exists(stale_path):
+                            os.remove(stale_path)
+                except OSError as e:
+                    logger.warning(f"[WARNING] Could not remove stale asset {path}: {e}")
+                    continue
+                self.report["removed"].append({"category": entry.get("category"), "label": entry.get("label"), "path": path})
+                logger.info(f"[INFO] Removed stale asset: {path}")
+
+        manifest = {
+            "source_pdf": self.source_name,
+            "assets": [dict(self._manifest_assets[path], key=path) for path in sorted(self._manifest_assets)],
+        }
+        self.manifest = manifest
+        if self.output_dir is None:
+            return
+        with self.metrics.span("write_manifest"):
+            if self._archive_writer is not None:
+                self._archive_add(MANIFEST_FILENAME, json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"), compress=True)
+                return
+            manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+            tmp_path = manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, manifest_path)
+
+    def _page_order(self, requests_by_page: Dict[int, List[Dict[str, Any]]]) -> List[int]:
+        for requests in requests_by_page.values():
+            requests.sort(key=lambda request: CATEGORY_PRIORITY[request["category"]])
+        return sorted(
+            requests_by_page,
+            key=lambda page_num: (CATEGORY_PRIORITY[requests_by_page[page_num][0]["category"]], page_num),
+        )
+
+    def _abort_archive(self) -> None:
+        if self._archive_writer is not None:
+            self._archive_writer.close()
+            self._archive_writer = None
+            os.remove(self._archive_path() + ".tmp")
+
+    def iter_assets(self) -> Iterator[Dict[str, Any]]:
+        """
+        Extract every asset, yielding each one as soon as it is written.
+
+        Pages are visited in CATEGORY_PRIORITY order of the best asset on them,
+        and assets within a page likewise, so the builder logo and masterplan
+        arrive before the bulk of floorplans and amenities. Each asset is a
+        dict: {"category", "label", "page", "bbox", "filename", "name",
+        "path", "format", "width", "height", "bytes", "sha256", "data",
+        "thumbnail"}; `data` holds the encoded image and `path` is None in
+        memory mode. The manifest and cleaned JSON are saved once the stream
+        is exhausted, and the report is left in `self.report`. Closing the
+        stream early discards a half-written archive.
+        """
+        if self._owns_metrics:
+            self.metrics = Metrics(run=self.source_name)
+        with self.metrics.span("extract_assets"):
+            yield from self._stream_assets()
+        if self._owns_metrics:
+            self.report["timings"] = self.metrics.summary()
+
+    def _stream_assets(self) -> Iterator[Dict[str, Any]]:
+        logger.info(f"[START] Processing brochure: {self.source_name}")
+        self.report = {"saved": [], "skipped": [], "errors": [], "unchanged": [], "removed": []}
+        self._manifest_assets = {}
+        self.assets = []
+        self._ready = deque()
+        try:
+            previous = {entry.get("key"): entry for entry in self.load_manifest().get("assets", [])}
+            settings = self._render_settings()
+            requests = self._asset_requests()
+            if self.validate_bboxes:
+                requests = self._validated_requests(requests)
+            requests_by_page: Dict[int, List[Dict[str, Any]]] = {}
+            for request in requests:
+                request["spec"] = self._asset_spec(request, settings)
+                if self.incremental and self._unchanged(request, previous):
+                    entry = previous[self._asset_path(request)]
+                    self._manifest_assets[self._asset_path(request)] = entry
+                    if entry.get("path") is not None:
+                        self.report["unchanged"].append({"category": request["category"], "label": request["label"], "path": entry["path"]})
+                    continue
+                try:
+                    page_num = int(request["page"])
+                except (TypeError, ValueError):
+                    self._report_failure(request, f"invalid page number '{request['page']}'")
+                    continue
+                requests_by_page.setdefault(page_num, []).append(request)
+
+            if self.archive is not None:
+                # The archive is assembled under a temporary name and only
+                # appears complete; one open file for the whole brochure.
+                archive_tmp = self._archive_path() + ".tmp"
+                if self.archive == "zip":
+                    self._archive_writer = zipfile.ZipFile(archive_tmp, "w")
+                else:
+                    self._archive_writer = tarfile.open(archive_tmp, "w")
+
+            # Render one page at a time, do every crop on it, then release it.
+            if self.workers > 1:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="encode")
+            pdf = None
+            try:
+                for page_num in self._page_order(requests_by_page):
+                    if self._uses_raster_cache():
+                        cached = self.raster_cache.get(self._pdf_hash(), page_num, self.dpi)
+                        if cached is not None:
+                            self.metrics.count("raster_cache_hits")
+                            yield from self._extract_cached_page(page_num, cached, requests_by_page[page_num])
+                            del cached
+                            continue
+
+                    # MuPDF is only opened once some page actually needs rendering.
+                    if pdf is None:
+                        pdf = self._open_pdf()
+                    try:
+                        page = pdf[page_num]
+                    except Exception as e:
+                        for request in requests_by_page[page_num]:
+                            self._report_failure(request, e)
+                        continue
+                    yield from self._extract_page(page, page_num, requests_by_page[page_num])
+            finally:
+                if pdf is not None:
+                    pdf.close()
+                if self._pool is not None:
+                    self._pool.shutdown(wait=True)
+                    self._pool, self._pending = None, []
+            yield from self._drain()
+            self.report["saved"].sort(key=lambda entry: entry["path"] or entry["name"])
+            self.assets.sort(key=lambda asset: asset["name"])
+            if self.raster_cache is not None:
+                self.report["raster_cache"] = self.raster_cache.stats()
+            if self.dedup_store is not None:
+                self.report["dedup"] = self.dedup_store.stats()
+
+            self._save_manifest(previous)
+            self.save_cleaned_json()
+            if self._archive_writer is not None:
+                self._archive_writer.close()
+                self._archive_writer = None
+                os.replace(archive_tmp, self._archive_path())
+                logger.info(f"[INFO] Archive saved to: {self._archive_path()}")
+
+            logger.info(f"[DONE] Completed processing: {self.source_name}")
+        except GeneratorExit:
+            self._abort_archive()
+            raise
+        except Exception as e:
+            logger.error(f"[FATAL] Brochure processing failed: {e}")
+            self._abort_archive()
+            self.report["errors"].append({"category": None, "label": None, "error": f"Brochure processing failed: {e}"})
+
+    async def aiter_assets(self) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of iter_assets(): rendering runs on a worker thread, off the event loop."""
+        import asyncio  # only async callers pay for it
+
+        loop = asyncio.get_running_loop()
+        iterator = self.iter_assets()
+        done = object()
+        # A single thread drives the generator, so the close() queued after a
+        # cancellation waits for the step still in flight.
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        try:
+            while True:
+                asset = await loop.run_in_executor(executor, next, iterator, done)
+                if asset is done:
+                    return
+                yield asset
+        finally:
+            executor.submit(iterator.close)
+            executor.shutdown(wait=False)
+
+    def process_all(self) -> Dict[str, Any]:
+        """
+        Extract every asset and save the cleaned JSON (drains iter_assets()).
+
+        Returns:
+            dict: {
+                "saved": [{"category", "label", "path"}, ...],
+                "skipped": [{"category", "label", "page", "reason", "size"}, ...],
+                "errors": [{"category", "label", "error"}, ...],
+                "unchanged": [{"category", "label", "path"}, ...],
+                "removed": [{"category", "label", "path"}, ...],
+                "bbox": [{"category", "label", "page", "input", "bbox", "unit", "flags", "status", ...}, ...],
+                "timings": {"spans", "counters", "histograms"}  # only without a shared `metrics`
+            }
+        """
+        for _ in self.iter_assets():
+            pass
+        return self.report
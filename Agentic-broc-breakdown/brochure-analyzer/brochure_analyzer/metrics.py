@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import bisect
+import cProfile
+import logging
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_PREFIX = "brochure_"
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+_default_sinks: List[Any] = []
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Configure root logging for command-line entry points and worker processes."""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+def set_default_sinks(sinks: List[Any]) -> None:
+    """Sinks attached to every `Metrics` created without explicit sinks."""
+    _default_sinks[:] = list(sinks)
+
+
+def metrics_enabled() -> bool:
+    return os.environ.get("BROCHURE_METRICS", "1") != "0"
+
+
+class MemorySink:
+    """In-process collector: keeps every event in `self.events`."""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSink:
+    """
+    Appends one JSON object per event to `path`.
+
+    Each line is a single O_APPEND write, so batch worker processes can
+    share one file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        os.write(self._fd, (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class PrometheusSink:
+    """
+    Aggregates events into Prometheus counters and histograms.
+
+    `render()` returns the text exposition format; `serve(port)` exposes it
+    at http://<host>:<port>/metrics from a daemon thread. The per-run
+    "run" field is dropped to keep label cardinality bounded.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional["ThreadingHTTPServer"] = None
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        labels = tuple(sorted((k, str(v)) for k, v in (event.get("labels") or {}).items()))
+        with self._lock:
+            if event["type"] == "counter":
+                key = (event["name"], labels)
+                self._counters[key] = self._counters.get(key, 0) + event["value"]
+                return
+            if event["type"] == "span":
+                key = ("span_seconds", labels + (("span", event["name"]),))
+            else:
+                key = (event["name"], labels)
+            # Per-bucket counts, then sum and count.
+            state = self._histograms.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            index = bisect.bisect_left(self.buckets, event["value"])
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += event["value"]
+            state[-1] += 1
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name}_total counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{PROMETHEUS_PREFIX}{name}_total{_label_text(labels)} {value:g}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} histogram")
+                for (metric, labels), state in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0.0
+                    for bound, count in zip(self.buckets, state):
+                        cumulative += count
+                        le = 'le="%g"' % bound
+                        lines.append(f"{PROMETHEUS_PREFIX}{name}_bucket{_label_text(labels, le)} {cumulative:g}")
+                    le = 'le="+Inf"'
+                    lines.append(f"{PROMETHEUS_PREFIX}{name}_bucket{_label_text(labels, le)} {state[-1]:g}")
+                    lines.append(f"{PROMETHEUS_PREFIX}{name}_sum{_label_text(labels)} {state[-2]:g}")
+                    lines.append(f"{PROMETHEUS_PREFIX}{name}_count{_label_text(labels)} {state[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = sink.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="prometheus", daemon=True).start()
+        logger.info(f"[METRICS] Serving Prometheus metrics on http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Dict[str, Any]) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        duration = time.perf_counter() - self.start
+        labels = dict(self.labels, error=exc_type.__name__) if exc_type is not None else self.labels
+        self.metrics._record("span", self.name, duration, labels)
+
+
+class Metrics:
+    """
+    Named spans, counters and histograms for one brochure run.
+
+    `span(name, **labels)` times a block; `count` and `observe` record a
+    counter increment or a histogram sample. Every record is aggregated for
+    `summary()` and sent as an event to each sink (`MemorySink`,
+    `JsonlSink`, `PrometheusSink` or anything with `emit(event)`). `run`
+    names the run in emitted events. With enabled=False (or
+    BROCHURE_METRICS=0 for the defaults) every call returns immediately and
+    spans are a shared no-op context manager.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None, enabled: Optional[bool] = None, run: Optional[str] = None) -> None:
+        self.enabled = metrics_enabled() if enabled is None else enabled
+        self.sinks = list(_default_sinks if sinks is None else sinks)
+        self.run = run
+        self._lock = threading.Lock()
+        self._spans: Dict[str, List[float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, List[float]] = {}
+
+    def span(self, name: str, **labels: Any) -> Any:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def count(self, name: str, value: float = 1, **labels: Any) -> None:
+        if self.enabled:
+            self._record("counter", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        if self.enabled:
+            self._record("histogram", name, value, labels)
+
+    def _record(self, kind: str, name: str, value: float, labels: Dict[str, Any]) -> None:
+        with self._lock:
+            if kind == "counter":
+                self._counters[name] = self._counters.get(name, 0) + value
+            else:
+                (self._spans if kind == "span" else self._histograms).setdefault(name, []).append(value)
+        if self.sinks:
+            event = {"type": kind, "name": name, "value": value, "labels": labels, "ts": time.time()}
+            if self.run is not None:
+                event["run"] = self.run
+            for sink in self.sinks:
+                try:
+                    sink.emit(event)
+                except Exception as e:
+                    logger.warning(f"[METRICS] Sink {type(sink).__name__} failed: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Per-run totals: {"spans": {name: {"count", "seconds", "max"}},
+        "counters": {name: total}, "histograms": {name: {"count", "sum",
+        "p50", "p95", "max"}}}. Labels are summed over.
+        """
+        with self._lock:
+            spans = {name: list(values) for name, values in self._spans.items()}
+            counters = dict(self._counters)
+            histograms = {name: list(values) for name, values in self._histograms.items()}
+        return {
+            "spans": {
+                name: {"count": len(values), "seconds": round(sum(values), 6), "max": round(max(values), 6)}
+                for name, values in sorted(spans.items())
+            },
+            "counters": dict(sorted(counters.items())),
+            "histograms": {name: _distribution(values) for name, values in sorted(histograms.items())},
+        }
+
+
+def _distribution(values: List[float]) -> Dict[str, Any]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "sum": round(sum(ordered), 6),
+        "p50": round(ordered[(len(ordered) - 1) // 2], 6),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 6),
+        "max": round(ordered[-1], 6),
+    }
+
+
+def merge_summaries(*summaries: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine `Metrics.summary()` dicts from stages that ran in different processes."""
+    merged: Dict[str, Any] = {"spans": {}, "counters": {}, "histograms": {}}
+    for summary in filter(None, summaries):
+        for name, span in summary.get("spans", {}).items():
+            total = merged["spans"].setdefault(name, {"count": 0, "seconds": 0.0, "max": 0.0})
+            total["count"] += span["count"]
+            total["seconds"] = round(total["seconds"] + span["seconds"], 6)
+            total["max"] = max(total["max"], span["max"])
+        for name, value in summary.get("counters", {}).items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + value
+        for name, histogram in summary.get("histograms", {}).items():
+            if name not in merged["histograms"]:
+                merged["histograms"][name] = dict(histogram)
+                continue
+            # Percentiles cannot be combined exactly; keep the worse one.
+            total = merged["histograms"][name]
+            total.update(
+                count=total["count"] + histogram["count"],
+                sum=round(total["sum"] + histogram["sum"], 6),
+                p50=max(total["p50"], histogram["p50"]),
+                p95=max(total["p95"], histogram["p95"]),
+                max=max(total["max"], histogram["max"]),
+            )
+    return merged
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """
+    Run the block under cProfile and dump the stats to `path` (no-op when
+    `path` is None). Only the calling thread is profiled.
+    """
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profiler.dump_stats(path)
+        logger.info(f"[PROFILE] Saved {path}")
@@ -0,0 +1,226 @@
+import os
+import re
+import shutil
+import logging
+import tempfile
+import threading
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, List, Optional, Union
+
+import fitz
+
+from brochure_analyzer.schema import schema as default_schema
+from brochure_analyzer.split_parse import load_parse_result, open_pdf, remap_page_numbers, write_parse_result
+
+logger = logging.getLogger(__name__)
+
+FILTER_MODES = ("conservative", "aggressive")
+
+FLOORPLAN_TERMS = (
+    "bhk", "floor plan", "floorplan", "bedroom", "master bed", "kitchen", "toilet",
+    "balcony", "living", "dining", "utility", "unit plan", "typical floor",
+)
+AREA_PATTERN = re.compile(
+    r"\b\d[\d,.]*\s*(sq\.?\s*(ft|m|mt|yd|yds)|sqft|sqm|square\s+(feet|metres?|meters?|yards?)|acres?|hectares?)\b"
+)
+AREA_TERMS = ("carpet area", "super built", "built-up", "builtup", "saleable", "rera carpet")
+RERA_PATTERN = re.compile(r"\brera\b|\b[pP][A-Z]?\d{8,}\b|\bprm/[a-z]+/rera/")
+DISTANCE_PATTERN = re.compile(r"\b\d+(\.\d+)?\s*(km|kms|mins?|minutes|meters?|mtrs?|m)\b")
+SPEC_TERMS = (
+    "specification", "flooring", "vitrified", "marble", "granite", "fittings", "sanitary",
+    "doors", "windows", "upvc", "modular kitchen", "electrical", "plumbing", "structure",
+)
+PROJECT_TERMS = ("masterplan", "master plan", "site plan", "location map", "tower", "wing", "developer", "builder")
+
+
+def _reference_terms(schema: Dict[str, Any]) -> List[str]:
+    # The amenity reference list and location categories live in the schema
+    # descriptions; score pages against exactly what we ask the parser for.
+    props = schema.get("properties", {})
+    terms = []
+    amenities = props.get("amenities", {}).get("description", "")
+    if "Reference List includes:" in amenities:
+        terms.extend(amenities.split("Reference List includes:", 1)[1].rstrip(".").split(","))
+    category = (
+        props.get("location_highlights", {}).get("items", {}).get("properties", {})
+        .get("category", {}).get("description", "")
+    )
+    if ":" in category:
+        terms.extend(category.split(":", 1)[1].split(","))
+    return sorted({t.strip().lower() for t in terms if len(t.strip()) > 3})
+
+
+def score_page(page: fitz.Page, reference_terms: List[str]) -> Dict[str, Any]:
+    """Cheap relevance signals for one page from its text layer and image placements."""
+    text = page.get_text("text").lower()
+    page_area = abs(page.rect) or 1.0
+
+    large_images = 0
+    image_coverage = 0.0
+    for info in page.get_image_info():
+        coverage = abs(fitz.Rect(info["bbox"]) & page.rect) / page_area
+        image_coverage += coverage
+        if coverage >= 0.2:
+            large_images += 1
+
+    signals = {
+        "floorplan": sum(text.count(t) for t in FLOORPLAN_TERMS),
+        "area": len(AREA_PATTERN.findall(text)) + sum(text.count(t) for t in AREA_TERMS),
+        "rera": len(RERA_PATTERN.findall(text)),
+        "reference": sum(1 for t in reference_terms if t in text),
+        "distance": len(DISTANCE_PATTERN.findall(text)),
+        "spec": sum(text.count(t) for t in SPEC_TERMS),
+        "project": sum(text.count(t) for t in PROJECT_TERMS),
+    }
+    weights = {"floorplan": 3, "area": 3, "rera": 5, "reference": 1, "distance": 1, "spec": 1, "project": 2}
+    text_score = sum(min(count, 10) * weights[name] for name, count in signals.items())
+
+    return {
+        "page": page.number,
+        "text_chars": len(text.strip()),
+        "text_score": text_score,
+        "large_images": large_images,
+        "image_coverage": round(min(image_coverage, 1.0), 3),
+        "signals": signals,
+    }
+
+
+def select_pages(scores: List[Dict[str, Any]], mode: str = "conservative", min_score: int = 3) -> List[int]:
+    """
+    Pick the pages worth sending to the parser.
+
+    conservative: keep any page with a text signal, a large image, or more
+    than a caption's worth of text; always keep the first and last page
+    (cover logo, contact/RERA block). Only pages that are effectively empty are
+    dropped.
+    aggressive: keep pages whose text score reaches `min_score`, plus
+    image-heavy pages that have at least some text (labelled amenity photos,
+    masterplans); always keep the first page.
+    """
+    if mode not in FILTER_MODES:
+        raise ValueError(f"mode must be one of {FILTER_MODES}, got '{mode}'")
+    if not scores:
+        return []
+
+    last = scores[-1]["page"]
+    keep = []
+    for s in scores:
+        if mode == "conservative":
+            relevant = (
+                s["text_score"] > 0 or s["large_images"] > 0 or s["text_chars"] > 200
+                or s["page"] in (0, last)
+            )
+        else:
+            relevant = (
+                s["text_score"] >= min_score
+                or (s["large_images"] > 0 and s["text_chars"] > 0 and s["text_score"] > 0)
+                or s["page"] == 0
+            )
+        if relevant:
+            keep.append(s["page"])
+    return keep
+
+
+class FilteredParser:
+    """
+    Parse callable that drops irrelevant pages before the remote parse.
+
+    Pages are scored locally from their text and image statistics (see
+    `score_page`), the relevant subset is written to a reduced PDF and parsed,
+    and every returned pageNumber is mapped back to the original page so
+    `BrochureProcessor` still crops the right pages. The filter report
+    (pages dropped, bytes saved) is stored in the result JSON under
+    "page_filter"; `last_report` holds the report of the calling thread's
+    last call, so threads sharing one parser do not see each other's.
+    The mode is part of `cache_variant`, so result cache entries from
+    different modes never mix.
+
+    The document is a path or the PDF bytes (as `process_brochure_bytes`
+    and the service pass it); filtered results of bytes input are only
+    written to disk when `result_save_dir` is given.
+    """
+
+    def __init__(
+        self,
+        parse_fn: Optional[Callable[..., Any]] = None,
+        mode: str = "conservative",
+        min_score: int = 3,
+    ) -> None:
+        if mode not in FILTER_MODES:
+            raise ValueError(f"mode must be one of {FILTER_MODES}, got '{mode}'")
+        if parse_fn is None:
+            from agentic_doc.parse import parse as parse_fn
+        self.parse_fn = parse_fn
+        self.mode = mode
+        self.min_score = min_score
+        inner = getattr(parse_fn, "cache_variant", None)
+        self.cache_variant = f"page_filter:{mode}:{min_score}" + (f"+{inner}" if inner else "")
+        self._local = threading.local()
+
+    @property
+    def last_report(self) -> Optional[Dict[str, Any]]:
+        return getattr(self._local, "report", None)
+
+    def plan(self, pdf: Union[str, bytes], extraction_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        terms = _reference_terms(extraction_schema or default_schema)
+        with open_pdf(pdf) as doc:
+            scores = [score_page(page, terms) for page in doc]
+        kept = select_pages(scores, self.mode, self.min_score)
+        return {
+            "mode": self.mode,
+            "total_pages": len(scores),
+            "kept_pages": kept,
+            "dropped_pages": [s["page"] for s in scores if s["page"] not in set(kept)],
+            "scores": scores,
+        }
+
+    def __call__(
+        self,
+        pdf: Union[str, bytes],
+        extraction_schema: Any = None,
+        result_save_dir: Optional[str] = None,
+        **kwargs: Any,
+    ):
+        in_memory = not isinstance(pdf, str)
+        report = self.plan(pdf, extraction_schema)
+        report["original_bytes"] = len(pdf) if in_memory else os.path.getsize(pdf)
+        kept = report["kept_pages"]
+
+        if not report["dropped_pages"] or not kept:
+            report.update(reduced_bytes=report["original_bytes"], bytes_saved=0)
+            self._local.report = report
+            if result_save_dir is not None:
+                kwargs["result_save_dir"] = result_save_dir
+            return self.parse_fn(pdf, extraction_schema=extraction_schema, **kwargs)
+
+        stem = "brochure" if in_memory else os.path.splitext(os.path.basename(pdf))[0]
+        work_dir = tempfile.mkdtemp(prefix=f"{stem}_filtered_")
+        try:
+            with open_pdf(pdf) as doc:
+                doc.select(kept)
+                if in_memory:
+                    reduced = doc.tobytes(garbage=3, deflate=True)
+                else:
+                    # Keep the original stem so parse outputs are named as usual.
+                    reduced = os.path.join(work_dir, f"{stem}.pdf")
+                    doc.save(reduced, garbage=3, deflate=True)
+            report["reduced_bytes"] = len(reduced) if in_memory else os.path.getsize(reduced)
+            report["bytes_saved"] = max(report["original_bytes"] - report["reduced_bytes"], 0)
+            logger.info(
+                f"[FILTER] {stem}: sending {len(kept)}/{report['total_pages']} pages "
+                f"({report['bytes_saved']} bytes saved, mode={self.mode})"
+            )
+
+            save_dir = os.path.join(work_dir, "result")
+            os.makedirs(save_dir)
+            result = self.parse_fn(reduced, extraction_schema=extraction_schema, result_save_dir=save_dir, **kwargs)
+            data = load_parse_result(result, save_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        data["extraction"] = remap_page_numbers(data.get("extraction") or {}, dict(enumerate(kept)))
+        data["page_filter"] = {k: v for k, v in report.items() if k != "scores"}
+        self._local.report = report
+        if in_memory and result_save_dir is None:
+            return [SimpleNamespace(result_path=None, markdown=data.get("markdown", ""), extraction=data["extraction"])]
+        return write_parse_result(data, stem, result_save_dir or ".")
@@ -0,0 +1,269 @@
+import time
+import random
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker is open and calls are being shed."""
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    if is_throttle_error(error):
+        return True
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int) and 500 <= status < 600:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in ("timed out", "timeout", "temporarily", "502", "503", "504"))
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and sheds calls for
+    `reset_timeout` seconds, then lets a single probe through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Parse circuit breaker is open")
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:
+                    raise CircuitOpenError("Parse circuit breaker is half-open; probe in flight")
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_neutral(self) -> None:
+        # A call that failed on its own input (malformed or encrypted PDF)
+        # says nothing about the service; just free the half-open probe.
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"[DISPATCH] Circuit opened after {self._failures} failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit. Each success adds `increase / limit` (about +1
+    per window of successful calls); each throttle multiplies the limit by
+    `decrease`, at most once per round trip: throttles from calls issued
+    before the last decrease are ignored. The limit settles near the highest
+    sustainable concurrency.
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 64,
+                 increase: float = 1.0, decrease: float = 0.5) -> None:
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        start = time.monotonic()
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        return time.monotonic() - start
+
+    def release(self, throttled: bool = False, issued_at: Optional[float] = None) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                if issued_at is None or issued_at >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+            else:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+
+class ParseDispatcher:
+    """
+    Wraps any parse callable (default: `agentic_doc.parse.parse`) with rate
+    limiting, adaptive concurrency, retries and a circuit breaker.
+
+    An instance is itself a parse callable with the same signature, so it can
+    be passed as `parse_fn` to `process_brochure_pdf` or the async pipeline
+    and shared by all their threads.
+
+    Retries use exponential backoff with full jitter. Throttles (HTTP 429)
+    also shrink the concurrency limit. Counters are available from `metrics()`.
+    """
+
+    def __init__(
+        self,
+        parse_fn: Optional[Callable[..., Any]] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        limiter: Optional[AIMDLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        if parse_fn is None:
+            from agentic_doc.parse import parse as parse_fn
+        self.parse_fn = parse_fn
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limiter = limiter if limiter is not None else AIMDLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "throttles": 0,
+            "circuit_rejections": 0,
+            "queue_seconds": 0.0,
+            "backoff_seconds": 0.0,
+            "parse_seconds": 0.0,
+        }
+
+    def _count(self, **deltas: float) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["concurrency_limit"] = self.limiter.limit
+        counters["in_flight"] = self.limiter.in_flight
+        counters["circuit_state"] = self.breaker.state
+        return counters
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.base_delay, self.max_delay)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self._count(calls=1)
+        attempt = 0
+        while True:
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                self._count(circuit_rejections=1)
+                raise
+
+            queued = self.limiter.acquire()
+            if self.bucket is not None:
+                queued += self.bucket.acquire()
+            self._count(attempts=1, queue_seconds=queued)
+
+            throttled = False
+            start = time.monotonic()
+            try:
+                result = self.parse_fn(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttle_error(e)
+                retryable = is_retryable_error(e)
+                if throttled:
+                    # The server answered; throttling is the limiter's job.
+                    self.breaker.record_success()
+                elif retryable:
+                    self.breaker.record_failure()
+                else:
+                    # Client and document errors must not open the circuit
+                    # for every other brochure.
+                    self.breaker.record_neutral()
+                self._count(throttles=int(throttled), parse_seconds=time.monotonic() - start)
+                if attempt >= self.max_retries or not retryable:
+                    self._count(failures=1)
+                    raise
+                error = e
+            else:
+                self.breaker.record_success()
+                self._count(successes=1, parse_seconds=time.monotonic() - start)
+                return result
+            finally:
+                self.limiter.release(throttled=throttled, issued_at=start)
+
+            delay = self._backoff(attempt)
+            attempt += 1
+            self._count(retries=1, backoff_seconds=delay)
+            logger.warning(f"[DISPATCH] Attempt {attempt} failed ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
@@ -0,0 +1,133 @@
+import os
+import mmap
+import struct
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+RASTER_CACHE_DIR = os.path.join("RasterCache")
+
+# magic, width, height, stride, channels, padding to 24 bytes
+_HEADER = struct.Struct("<4sIIIB7x")
+_MAGIC = b"BRC1"
+_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
+
+class RasterCache:
+    """
+    On-disk cache of rendered page rasters.
+
+    Each entry is one file: a small header followed by the raw pixel rows as
+    MuPDF produced them. Hits are memory-mapped and wrapped by PIL without
+    copying, so a re-crop of a known brochure never touches MuPDF. Entries are
+    keyed by PDF content hash, page index, DPI and colorspace. The least
+    recently used entries are evicted once the cache exceeds `max_bytes`
+    (file mtime is the recency clock).
+    """
+
+    def __init__(self, cache_dir: str = RASTER_CACHE_DIR, max_bytes: int = 4 << 30) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total = sum(e.stat().st_size for e in os.scandir(cache_dir) if e.name.endswith(".raw"))
+
+    def _path(self, pdf_hash: str, page: int, dpi: float, colorspace: str) -> str:
+        return os.path.join(self.cache_dir, f"{pdf_hash[:32]}_p{page}_d{dpi:g}_{colorspace}.raw")
+
+    def get(self, pdf_hash: str, page: int, dpi: float, colorspace: str = "rgb") -> Optional[Image.Image]:
+        path = self._path(pdf_hash, page, dpi, colorspace)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if len(mapped) < _HEADER.size:
+            magic, width, height, stride, channels = b"", 0, 0, 0, 0
+        else:
+            magic, width, height, stride, channels = _HEADER.unpack_from(mapped, 0)
+        if magic != _MAGIC or channels not in _MODES or len(mapped) < _HEADER.size + stride * height:
+            mapped.close()
+            self._discard(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        mode = _MODES[channels]
+        # The image keeps the mapping alive through its buffer reference.
+        return Image.frombuffer(mode, (width, height), memoryview(mapped)[_HEADER.size:], "raw", mode, stride, 1)
+
+    def put(self, pdf_hash: str, page: int, dpi: float, samples: Any, width: int, height: int,
+            stride: int, channels: int = 3, colorspace: str = "rgb") -> None:
+        path = self._path(pdf_hash, page, dpi, colorspace)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, width, height, stride, channels))
+                f.write(samples)
+            size = os.path.getsize(tmp_path)
+            if os.path.exists(path):
+                size -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._discard(tmp_path)
+            raise
+
+        with self._lock:
+            self._total += size
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def _discard(self, path: str) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return 0
+
+    def evict(self) -> int:
+        entries = sorted(
+            (e for e in os.scandir(self.cache_dir) if e.name.endswith(".raw")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        total = sum(e.stat().st_size for e in entries)
+        removed = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            freed = self._discard(entry.path)
+            total -= freed
+            removed += 1 if freed else 0
+        with self._lock:
+            self._total = total
+        if removed:
+            logger.info(f"[RASTER-CACHE] Evicted {removed} pages")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes": self._total,
+            }
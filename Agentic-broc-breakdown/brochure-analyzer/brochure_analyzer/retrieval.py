@@ -0,0 +1,630 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from brochure_analyzer.cache import output_project
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = os.path.join("Index")
+
+# Extraction keys that locate an asset rather than describe the project.
+_SKIP_FIELDS = {"boundingBoxLTRB", "pageNumber", "imageId"}
+# agentic_doc annotates every markdown chunk with its source page.
+_PAGE_COMMENT = re.compile(r"<!--.*?\bpage\s+(\d+).*?-->", re.DOTALL)
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+INITIAL_CAPACITY = 4096
+# Vectors are stored as int8 (value * VECTOR_SCALE): a quarter of float32 on
+# disk, and converting int8 rows for the dot product is several times
+# cheaper than converting float16.
+VECTOR_DTYPE = np.int8
+VECTOR_SCALE = 127
+SOURCES = ("markdown", "extraction")
+
+_CHUNKS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        row INTEGER PRIMARY KEY,
+        project TEXT NOT NULL,
+        source TEXT NOT NULL,
+        field TEXT,
+        page INTEGER,
+        text TEXT NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+
+def chunk_markdown(markdown: str, max_chars: int = 1000, overlap: int = 150) -> List[Dict[str, Any]]:
+    """
+    Split markdown into retrieval chunks of at most `max_chars`.
+
+    Paragraphs are packed together until the limit; longer paragraphs are
+    cut into windows overlapping by `overlap` characters. Source-page
+    comments (`<!-- ... page N ... -->`) are dropped from the text and
+    recorded as each chunk's "page".
+    """
+    chunks: List[Dict[str, Any]] = []
+    page: Optional[int] = None
+    buffer: List[str] = []
+    buffer_page: Optional[int] = None
+
+    def flush() -> None:
+        if buffer:
+            chunks.append({"text": "\n\n".join(buffer), "page": buffer_page})
+            buffer.clear()
+
+    for block in re.split(r"\n\s*\n", markdown or ""):
+        match = _PAGE_COMMENT.search(block)
+        if match:
+            page = int(match.group(1))
+        text = _COMMENT.sub("", block).strip()
+        if not text:
+            continue
+        if len(text) > max_chars:
+            flush()
+            step = max(1, max_chars - overlap)
+            for start in range(0, len(text), step):
+                chunks.append({"text": text[start:start + max_chars], "page": page})
+                if start + max_chars >= len(text):
+                    break
+            continue
+        if buffer and (sum(len(part) + 2 for part in buffer) + len(text) > max_chars or page != buffer_page):
+            flush()
+        if not buffer:
+            buffer_page = page
+        buffer.append(text)
+    flush()
+    return chunks
+
+
+def _describe(value: Any) -> str:
+    if isinstance(value, dict):
+        return "; ".join(
+            f"{key}: {_describe(item)}" for key, item in value.items()
+            if key not in _SKIP_FIELDS and item not in (None, "", [], {})
+        )
+    if isinstance(value, list):
+        return ", ".join(_describe(item) for item in value if item not in (None, "", [], {}))
+    return str(value)
+
+
+def flatten_extraction(extraction: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn an extraction into one chunk per field: scalars and lists of
+    scalars as "field: value", lists of objects as one chunk per item
+    ("floorplanConfigs[2]: bhkType: 3 BHK; totalArea: ..."). Bounding boxes
+    and page numbers are left out.
+    """
+    chunks = []
+    for field, value in (extraction or {}).items():
+        if field in _SKIP_FIELDS or value in (None, "", [], {}):
+            continue
+        if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+            items = [(f"{field}[{i}]", item) for i, item in enumerate(value)]
+        else:
+            items = [(field, value)]
+        for name, item in items:
+            text = _describe(item)
+            if text:
+                chunks.append({"field": name, "text": f"{name}: {text}"})
+    return chunks
+
+
+def make_chunks(markdown: Optional[str], extraction: Optional[Dict[str, Any]], max_chars: int = 1000) -> List[Dict[str, Any]]:
+    """Chunks for one brochure: {"source", "field", "page", "text"} per chunk."""
+    project = (extraction or {}).get("projectName")
+    chunks = [
+        {"source": "markdown", "field": None, "page": chunk["page"], "text": chunk["text"]}
+        for chunk in chunk_markdown(markdown or "", max_chars=max_chars)
+    ]
+    for chunk in flatten_extraction(extraction or {}):
+        # The project name keeps extraction chunks findable across projects.
+        text = f"{project} - {chunk['text']}" if project and chunk["field"] != "projectName" else chunk["text"]
+        chunks.append({"source": "extraction", "field": chunk["field"], "page": None, "text": text})
+    return chunks
+
+
+def tokenize(text: str) -> List[str]:
+    words = [word for word in _TOKEN.findall(text.lower()) if word not in _STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashedTfidfEmbedder:
+    """
+    Offline TF-IDF over hashed unigrams and bigrams.
+
+    Terms are hashed (CRC32, stable across processes) into `dim` signed
+    buckets with sublinear term frequency, and document vectors are
+    L2-normalized. IDF is not baked into stored vectors, since it changes
+    as brochures are added; `query_weights` applies it to the query
+    instead, which scores documents by sum(tf_d * tf_q * idf^2).
+    """
+
+    name = "hashed-tfidf"
+    sparse = True
+
+    def __init__(self, dim: int = 1024, cache_size: int = 1 << 20) -> None:
+        self.dim = dim
+        self.cache_size = cache_size
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, token: str) -> Tuple[int, float]:
+        found = self._buckets.get(token)
+        if found is None:
+            h = zlib.crc32(token.encode("utf-8"))
+            found = (h % self.dim, 1.0 if h & 0x80000000 else -1.0)
+            if len(self._buckets) >= self.cache_size:
+                self._buckets.clear()
+            self._buckets[token] = found
+        return found
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for token in tokenize(text):
+                bucket, sign = self._bucket(token)
+                counts[bucket] = counts.get(bucket, 0.0) + sign
+            if not counts:
+                continue
+            buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            # Sublinear tf; buckets where colliding terms cancel stay zero.
+            values = np.sign(values) * (1 + np.log(np.maximum(np.abs(values), 1)))
+            vectors[row, buckets] = values
+            norm = np.linalg.norm(vectors[row])
+            if norm:
+                vectors[row] /= norm
+        return vectors
+
+    def query_weights(self, vector: np.ndarray, df: np.ndarray, count: int) -> np.ndarray:
+        idf = np.log((1 + count) / (1 + df)) + 1
+        return vector * (idf * idf).astype(np.float32)
+
+
+class RetrievalIndex:
+    """
+    Persistent vector index over brochure chunks for project Q&A.
+
+    Vectors live in a memory-mapped int8 matrix stored column-major
+    (`dim` rows x capacity columns), so a sparse query reads only the rows
+    of its own buckets. Chunk metadata and the row -> chunk ID map are kept
+    in SQLite next to it, together with the document frequencies the query
+    side needs for IDF. Writers serialize on a SQLite write transaction, so
+    batch workers can add brochures to one index concurrently; readers pick
+    up changes on their next search.
+
+    `add_project` replaces a project's chunks (re-processing deletes the old
+    ones); deleted rows are masked at search time and reclaimed by
+    `compact()`, which runs automatically once more than half the rows are
+    dead. `embedder` is any object with `name`, `dim` and `embed(texts)`
+    returning L2-normalized float32 rows; sparse embedders also set
+    `sparse = True` and may provide `query_weights(vector, df, count)`.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR, embedder: Optional[Any] = None) -> None:
+        self.index_dir = index_dir
+        self.embedder = embedder if embedder is not None else HashedTfidfEmbedder()
+        self.db_path = os.path.join(index_dir, "chunks.sqlite")
+        self._lock = threading.RLock()
+        self._generation = -1
+        self._epoch = -1
+        self._vectors: Optional[np.memmap] = None
+        self._vectors_file: Optional[str] = None
+        self._rows = 0
+        self._row_project = np.zeros(0, dtype=np.int32)
+        self._row_source = np.zeros(0, dtype=np.int8)
+        self._alive = np.zeros(0, dtype=bool)
+        self._project_ids: Dict[str, int] = {}
+        self._df = np.zeros(self.embedder.dim, dtype=np.int64)
+        self._count = 0
+        self._obsolete: List[str] = []
+        self._local = threading.local()
+
+        os.makedirs(index_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_CHUNKS_TABLE.format(name="chunks"))
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_project ON chunks(project, deleted)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            conn.execute("CREATE TABLE IF NOT EXISTS deletions (generation INTEGER NOT NULL, project TEXT NOT NULL)")
+            meta = self._meta(conn)
+            if not meta:
+                self._set_meta(
+                    conn,
+                    embedder=self.embedder.name,
+                    dim=self.embedder.dim,
+                    rows=0,
+                    capacity=0,
+                    vectors=None,
+                    generation=0,
+                    epoch=0,
+                    df=self._df.tobytes(),
+                )
+            elif (meta["embedder"], meta["dim"]) != (self.embedder.name, self.embedder.dim):
+                raise ValueError(
+                    f"Index in {index_dir} was built with {meta['embedder']} (dim {meta['dim']}), "
+                    f"not {self.embedder.name} (dim {self.embedder.dim})"
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        # Searches reuse one autocommit connection per thread: opening and
+        # closing a connection costs more than the search itself.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the database write lock up front; it also
+        # guards the vector file, so writers in other processes wait here.
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    # The index can be rebuilt from Data/ and Responses/, so commits
+                    # skip the fsync a FULL sync would add to every brochure.
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._refresh(conn)
+                    yield conn
+                    self._generation += 1
+                    self._set_meta(conn, generation=self._generation, rows=self._rows, df=self._df.tobytes())
+            except BaseException:
+                # The in-memory map may be ahead of the rolled-back database.
+                self._generation = -1
+                self._obsolete = []
+                raise
+            # Replaced vector files go only once the new one is committed.
+            for filename in self._obsolete:
+                try:
+                    os.remove(os.path.join(self.index_dir, filename))
+                except OSError as e:
+                    logger.warning(f"[INDEX] Could not remove {filename}: {e}")
+            self._obsolete = []
+
+    def _meta(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def _set_meta(self, conn: sqlite3.Connection, **values: Any) -> None:
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(values.items()))
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        # Catch up with other writers' commits. Rows are only ever appended
+        # and deleted projects are logged per generation, so only the new
+        # rows are read; a compaction renumbers every row and bumps the
+        # epoch, which reloads the whole map.
+        row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        if row is None or row[0] == self._generation:
+            return
+        meta = self._meta(conn)
+        if meta["vectors"] != self._vectors_file:
+            self._vectors = self._open_vectors(meta["vectors"], meta["capacity"])
+            self._vectors_file = meta["vectors"]
+        epoch = meta.get("epoch", 0)
+        if self._generation < 0 or epoch != self._epoch:
+            self._rows = 0
+            self._row_project = np.zeros(0, dtype=np.int32)
+            self._row_source = np.zeros(0, dtype=np.int8)
+            self._alive = np.zeros(0, dtype=bool)
+            self._project_ids = {}
+        else:
+            deleted = conn.execute(
+                "SELECT DISTINCT project FROM deletions WHERE generation > ?", (self._generation,)
+            ).fetchall()
+            codes = [self._project_ids[project] for (project,) in deleted if project in self._project_ids]
+            if codes:
+                self._alive[np.isin(self._row_project, codes)] = False
+
+        start = self._rows
+        added = meta["rows"] - start
+        if added > 0:
+            rows = conn.execute("SELECT row, project, source, deleted FROM chunks WHERE row >= ? ORDER BY row", (start,)).fetchall()
+            row_project = np.full(added, -1, dtype=np.int32)
+            row_source = np.zeros(added, dtype=np.int8)
+            alive = np.zeros(added, dtype=bool)
+            for row_id, project, source, deleted in rows:
+                row_project[row_id - start] = self._project_ids.setdefault(project, len(self._project_ids))
+                row_source[row_id - start] = SOURCES.index(source)
+                alive[row_id - start] = not deleted
+            self._row_project = np.concatenate([self._row_project, row_project])
+            self._row_source = np.concatenate([self._row_source, row_source])
+            self._alive = np.concatenate([self._alive, alive])
+        self._rows = meta["rows"]
+        self._df = np.frombuffer(meta["df"], dtype=np.int64).copy()
+        self._count = int(self._alive.sum())
+        self._generation = meta["generation"]
+        self._epoch = epoch
+
+    def _open_vectors(self, filename: Optional[str], capacity: int) -> Optional[np.memmap]:
+        if not filename:
+            return None
+        path = os.path.join(self.index_dir, filename)
+        return np.memmap(path, dtype=VECTOR_DTYPE, mode="r+", shape=(self.embedder.dim, capacity))
+
+    def _ensure_capacity(self, conn: sqlite3.Connection, needed: int) -> None:
+        capacity = 0 if self._vectors is None else self._vectors.shape[1]
+        if needed <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, 2 * capacity, needed)
+        self._replace_vectors(conn, new_capacity, np.arange(self._rows))
+
+    def _replace_vectors(self, conn: sqlite3.Connection, capacity: int, keep: np.ndarray) -> None:
+        # A new file per capacity: readers still mapping the old one keep
+        # working until their next refresh.
+        filename = f"vectors-{self._generation + 1}-{capacity}.i8"
+        vectors = np.memmap(
+            os.path.join(self.index_dir, filename), dtype=VECTOR_DTYPE, mode="w+", shape=(self.embedder.dim, capacity)
+        )
+        for start in range(0, len(keep), 65536):
+            block = keep[start:start + 65536]
+            vectors[:, start:start + len(block)] = self._vectors[:, block]
+        vectors.flush()
+        if self._vectors_file:
+            self._obsolete.append(self._vectors_file)
+        self._vectors, self._vectors_file = vectors, filename
+        self._set_meta(conn, vectors=filename, capacity=capacity)
+
+    def _delete_rows(self, conn: sqlite3.Connection, project: str) -> int:
+        code = self._project_ids.get(project)
+        if code is None:
+            return 0
+        rows = np.flatnonzero((self._row_project == code) & self._alive)
+        if not len(rows):
+            return 0
+        self._df -= np.count_nonzero(self._vectors[:, rows], axis=1)
+        self._alive[rows] = False
+        self._count -= len(rows)
+        conn.execute("UPDATE chunks SET deleted = 1 WHERE project = ? AND deleted = 0", (project,))
+        conn.execute("INSERT INTO deletions (generation, project) VALUES (?, ?)", (self._generation + 1, project))
+        return len(rows)
+
+    def add_project(self, project: str, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Index `chunks` (from `make_chunks`) for `project`, replacing whatever
+        was indexed for it before. Returns the number of chunks added.
+        """
+        chunks = [dict(chunk, source=chunk.get("source", "markdown")) for chunk in chunks if chunk.get("text", "").strip()]
+        for chunk in chunks:
+            if chunk["source"] not in SOURCES:
+                raise ValueError(f"source must be one of {SOURCES}, got '{chunk['source']}'")
+        embedded = None
+        if chunks:
+            embedded = self.embedder.embed([chunk["text"] for chunk in chunks])
+            embedded = np.clip(np.rint(embedded * VECTOR_SCALE), -VECTOR_SCALE, VECTOR_SCALE).astype(VECTOR_DTYPE)
+        with self._write() as conn:
+            removed = self._delete_rows(conn, project)
+            if chunks:
+                start = self._rows
+                self._ensure_capacity(conn, start + len(chunks))
+                # No msync per add: the columns reach the shared page cache
+                # immediately, and syncing the whole map costs far more than
+                # the write. Only replaced vector files are flushed.
+                self._vectors[:, start:start + len(chunks)] = embedded.T
+                conn.executemany(
+                    "INSERT INTO chunks (row, project, source, field, page, text) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (start + i, project, chunk["source"], chunk.get("field"), chunk.get("page"), chunk["text"])
+                        for i, chunk in enumerate(chunks)
+                    ],
+                )
+                code = self._project_ids.setdefault(project, len(self._project_ids))
+                self._rows = start + len(chunks)
+                self._row_project = np.concatenate([self._row_project, np.full(len(chunks), code, dtype=np.int32)])
+                self._row_source = np.concatenate([
+                    self._row_source, np.array([SOURCES.index(chunk["source"]) for chunk in chunks], dtype=np.int8)
+                ])
+                self._alive = np.concatenate([self._alive, np.ones(len(chunks), dtype=bool)])
+                self._df += np.count_nonzero(embedded, axis=0)
+                self._count += len(chunks)
+            if self._rows > INITIAL_CAPACITY and self._rows - self._count > self._count:
+                self._compact(conn)
+        logger.info(f"[INDEX] {project}: {len(chunks)} chunks indexed" + (f", {removed} replaced" if removed else ""))
+        return len(chunks)
+
+    def delete_project(self, project: str) -> int:
+        """Remove a project's chunks; returns how many were removed."""
+        with self._write() as conn:
+            return self._delete_rows(conn, project)
+
+    def compact(self) -> None:
+        """Rewrite the vectors and ID map without deleted rows."""
+        with self._write() as conn:
+            self._compact(conn)
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        keep = np.flatnonzero(self._alive)
+        self._replace_vectors(conn, max(INITIAL_CAPACITY, 2 * len(keep)), keep)
+        # Renumber the live rows 0..n-1 in their current order.
+        conn.execute("DROP TABLE IF EXISTS chunks_compact")
+        conn.execute(_CHUNKS_TABLE.format(name="chunks_compact"))
+        conn.execute(
+            "INSERT INTO chunks_compact (row, project, source, field, page, text) "
+            "SELECT ROW_NUMBER() OVER (ORDER BY row) - 1, project, source, field, page, text FROM chunks WHERE deleted = 0"
+        )
+        conn.execute("DROP TABLE chunks")
+        conn.execute("ALTER TABLE chunks_compact RENAME TO chunks")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_project ON chunks(project, deleted)")
+        # Every reader reloads the renumbered map, so the log starts over.
+        conn.execute("DELETE FROM deletions")
+        self._epoch += 1
+        self._set_meta(conn, epoch=self._epoch)
+        self._row_project = self._row_project[keep]
+        self._row_source = self._row_source[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._rows = len(keep)
+        logger.info(f"[INDEX] Compacted to {len(keep)} rows")
+
+    def projects(self) -> List[str]:
+        with self._lock:
+            self._refresh(self._reader())
+            live = set(np.unique(self._row_project[self._alive]).tolist())
+            return sorted(project for project, code in self._project_ids.items() if code in live)
+
+    def has_project(self, project: str) -> bool:
+        row = self._reader().execute("SELECT 1 FROM chunks WHERE project = ? AND deleted = 0 LIMIT 1", (project,)).fetchone()
+        return row is not None
+
+    def _candidates(self, projects: Optional[Sequence[str]]) -> Union[slice, np.ndarray]:
+        if projects is None:
+            return slice(0, self._rows)
+        codes = [self._project_ids[p] for p in projects if p in self._project_ids]
+        rows = np.flatnonzero(np.isin(self._row_project, codes) & self._alive)
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            return slice(int(rows[0]), int(rows[-1]) + 1)  # contiguous: read a slice, not a gather
+        return rows
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        projects: Optional[Union[str, Sequence[str]]] = None,
+        sources: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-`k` chunks for `query`, optionally restricted to `projects` and
+        to chunk `sources` ("markdown", "extraction").
+
+        Returns:
+            list: [{"project", "source", "field", "page", "text", "score", "row"}, ...]
+        """
+        if isinstance(projects, str):
+            projects = [projects]
+        vector = self.embedder.embed([query])[0]
+        with self._lock:
+            self._refresh(self._reader())
+            if self._vectors is None or not self._count:
+                return []
+            if hasattr(self.embedder, "query_weights"):
+                vector = self.embedder.query_weights(vector, self._df, self._count)
+            candidates = self._candidates(projects)
+            vectors, alive = self._vectors, self._alive
+            if sources:
+                alive = alive & np.isin(self._row_source, [SOURCES.index(source) for source in sources])
+        if isinstance(candidates, np.ndarray) and not len(candidates):
+            return []
+
+        dims = np.flatnonzero(vector) if getattr(self.embedder, "sparse", False) else np.arange(len(vector))
+        if not len(dims):
+            return []
+        weights = (vector[dims] / VECTOR_SCALE).astype(np.float32)
+        if isinstance(candidates, slice):
+            block = vectors[dims, candidates]
+        elif len(candidates) > vectors.shape[1] // 8:
+            block = vectors[dims][:, candidates]
+        else:
+            block = vectors[np.ix_(dims, candidates)]
+        scores = weights @ block.astype(np.float32)
+        scores[~alive[candidates]] = -np.inf
+
+        found = _top_k(scores, k)
+        found = found[scores[found] > 0]  # no shared terms
+        if not len(found):
+            return []
+        rows = found + candidates.start if isinstance(candidates, slice) else candidates[found]
+        return self._hits(rows, scores[found])
+
+    def _hits(self, rows: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        placeholders = ",".join("?" * len(rows))
+        records = {
+            record[0]: record
+            for record in self._reader().execute(
+                f"SELECT row, project, source, field, page, text FROM chunks WHERE row IN ({placeholders})",
+                [int(row) for row in rows],
+            )
+        }
+        hits = []
+        for row, score in zip(rows, scores):
+            record = records.get(int(row))
+            if record is None:
+                continue
+            hits.append({
+                "project": record[1],
+                "source": record[2],
+                "field": record[3],
+                "page": record[4],
+                "text": record[5],
+                "score": round(float(score), 6),
+                "row": int(row),
+            })
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh(self._reader())
+            return {
+                "chunks": self._count,
+                "rows": self._rows,
+                "projects": len({code for code in self._row_project[self._alive]}),
+                "capacity": 0 if self._vectors is None else self._vectors.shape[1],
+                "embedder": self.embedder.name,
+                "dim": self.embedder.dim,
+            }
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def index_brochure(index: RetrievalIndex, project_name: str, markdown: Optional[str], extraction: Optional[Dict[str, Any]]) -> int:
+    """Chunk and (re)index one brochure's markdown and cleaned extraction."""
+    return index.add_project(project_name, make_chunks(markdown, extraction))
+
+
+def index_result(index: RetrievalIndex, result: Dict[str, Any]) -> int:
+    """Index a `process_brochure_pdf` result from the markdown and cleaned JSON it saved."""
+    markdown = None
+    if result.get("response_path") and os.path.exists(result["response_path"]):
+        with open(result["response_path"], "r", encoding="utf-8") as f:
+            markdown = f.read()
+    extraction = None
+    json_path = os.path.join(result.get("project_data_dir") or "", "extracted_data.json")
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            extraction = json.load(f)
+    return index_brochure(index, result["project_name"], markdown, extraction)
+
+
+def index_outputs(index: RetrievalIndex, data_dir: str = "Data", responses_dir: str = "Responses") -> int:
+    """Index every brochure already processed into `data_dir`; returns the number of projects."""
+    count = 0
+    started = time.perf_counter()
+    for name in sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []:
+        project_dir = os.path.join(data_dir, name)
+        if not os.path.isdir(project_dir):
+            continue
+        index_result(index, {
+            "project_name": output_project(name),
+            "project_data_dir": project_dir,
+            "response_path": os.path.join(responses_dir, f"{name}.md"),
+        })
+        count += 1
+    logger.info(f"[INDEX] Indexed {count} projects in {time.perf_counter() - started:.1f}s")
+    return count
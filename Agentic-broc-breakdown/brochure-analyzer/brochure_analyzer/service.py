@@ -0,0 +1,985 @@
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import socket
+import sqlite3
+import shutil
+import hashlib
+import argparse
+import importlib
+import logging
+import threading
+import http.client
+import multiprocessing
+import socketserver
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None
+
+from brochure_analyzer.cache import cache_key, hash_schema
+from brochure_analyzer.schema import schema
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DIR = os.path.join("Service")
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+TERMINAL = (DONE, FAILED, CANCELLED)
+
+# BrochureProcessor keyword arguments a submission may set.
+PROCESSOR_OPTIONS = (
+    "render_mode", "dpi", "target_size", "max_dpi", "max_asset_bytes", "prefer_native", "workers",
+    "output_settings", "archive", "validate_bboxes",
+)
+
+# Spans reported as progress "stage" events; per-asset spans are too chatty.
+PROGRESS_STAGES = (
+    "cache_lookup", "parse", "read_json", "validate_bboxes", "extract_assets", "write_json", "write_manifest",
+    "index", "catalog",
+)
+PROGRESS_COUNTERS = ("pages_rendered", "assets_saved", "assets_skipped", "errors")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        dedupe_key TEXT NOT NULL,
+        status TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        name TEXT NOT NULL,
+        pdf_sha256 TEXT NOT NULL,
+        upload_path TEXT NOT NULL,
+        options TEXT NOT NULL,
+        output_dir TEXT NOT NULL,
+        submitted_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        lease_until REAL,
+        result TEXT,
+        error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, submitted_at)",
+    # At most one queued or running job per identical submission.
+    "CREATE UNIQUE INDEX IF NOT EXISTS jobs_in_flight ON jobs (dedupe_key) WHERE status IN ('queued', 'running')",
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        ts REAL NOT NULL,
+        type TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq)",
+)
+
+
+class QueueFull(RuntimeError):
+    """Raised by `JobQueue.submit` when `max_queued` jobs are already waiting."""
+
+
+class JobQueue:
+    """
+    Persistent brochure job queue in `<service_dir>/queue.sqlite`.
+
+    Submissions are stored under `uploads/<sha256>.pdf` and get their own
+    output directory `jobs/<id>/`, so concurrent jobs never share the
+    relative Responses/, Data/ or JSON_DIR/ folders. Each claim writes to
+    `jobs/<id>/attempt-<n>/`; `finish` accepts only the attempt that still
+    holds the lease, makes its directory the job's `output_dir` and removes
+    the others, so a worker that lost its lease never overwrites the output
+    of the one that took the job over. Identical submissions
+    (same PDF bytes, schema, name and options) that are still queued or
+    running are answered with the existing job. Workers claim the
+    highest-priority, oldest queued job under a lease they renew while
+    working; a job whose lease lapses (its worker died) is queued again, up
+    to `max_attempts` claims. Every state change and progress update is
+    appended to the `events` table for streaming.
+    """
+
+    def __init__(
+        self,
+        service_dir: str = SERVICE_DIR,
+        max_queued: Optional[int] = 1000,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+    ) -> None:
+        self.service_dir = service_dir
+        self.db_path = os.path.join(service_dir, "queue.sqlite")
+        self.uploads_dir = os.path.join(service_dir, "uploads")
+        self.jobs_dir = os.path.join(service_dir, "jobs")
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._schema_hash = hash_schema(schema)
+
+        os.makedirs(self.uploads_dir, exist_ok=True)
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A fresh connection per operation keeps the queue usable from the
+        # HTTP threads and every worker process without sharing handles.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _event(self, conn: sqlite3.Connection, job_id: str, kind: str, data: Dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT INTO events (job_id, ts, type, data) VALUES (?, ?, ?, ?)",
+            (job_id, time.time(), kind, json.dumps(data, ensure_ascii=False, default=str)),
+        )
+
+    def _store_upload(self, pdf_bytes: bytes, digest: str) -> str:
+        path = os.path.join(self.uploads_dir, f"{digest}.pdf")
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+        return path
+
+    def submit(
+        self,
+        pdf_bytes: bytes,
+        name: Optional[str] = None,
+        priority: int = 0,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue one brochure; returns (job, created).
+
+        `created` is False when an identical submission is already queued or
+        running; its job is returned instead (its priority is raised to
+        `priority` if that is higher). Raises QueueFull when `max_queued`
+        jobs are waiting and ValueError for unknown `options`.
+        """
+        options = dict(options or {})
+        unknown = sorted(set(options) - set(PROCESSOR_OPTIONS))
+        if unknown:
+            raise ValueError(f"Unknown options {unknown}; expected any of {list(PROCESSOR_OPTIONS)}")
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        name = name or f"brochure-{digest[:12]}"
+        options_json = json.dumps(options, sort_keys=True)
+        dedupe_key = hashlib.sha256(
+            f"{cache_key(digest, self._schema_hash)}\0{name}\0{options_json}".encode("utf-8")
+        ).hexdigest()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, priority FROM jobs WHERE dedupe_key = ? AND status IN (?, ?)",
+                (dedupe_key, QUEUED, RUNNING),
+            ).fetchone()
+            if row is not None:
+                if priority > row["priority"]:
+                    conn.execute("UPDATE jobs SET priority = ? WHERE id = ?", (priority, row["id"]))
+                self._event(conn, row["id"], "deduplicated", {"priority": max(priority, row["priority"])})
+                job_id, created = row["id"], False
+            else:
+                if self.max_queued is not None:
+                    queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+                    if queued >= self.max_queued:
+                        raise QueueFull(f"{queued} jobs already queued (max_queued={self.max_queued})")
+                # Stored under the write lock, so a finishing job with the
+                # same PDF cannot remove the upload in between.
+                upload_path = self._store_upload(pdf_bytes, digest)
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, dedupe_key, status, priority, name, pdf_sha256, upload_path, options, "
+                    "output_dir, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, dedupe_key, QUEUED, priority, name, digest, upload_path, options_json,
+                     os.path.join(self.jobs_dir, job_id), time.time()),
+                )
+                self._event(conn, job_id, QUEUED, {"priority": priority, "name": name})
+                created = True
+        if created:
+            logger.info(f"[QUEUE] Queued {name} as {job_id} (priority {priority})")
+        return self.get(job_id), created
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Lease the next queued job to `worker`; None when the queue is empty."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY priority DESC, submitted_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started_at = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (RUNNING, worker, now, now + self.lease_seconds, row["id"]),
+            )
+            self._event(conn, row["id"], RUNNING, {"worker": worker})
+            job = self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+        job["attempt_dir"] = os.path.join(job["output_dir"], f"attempt-{job['attempts']}")
+        return job
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend a running job's lease; False if the job is no longer this worker's."""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker, RUNNING),
+            ).rowcount == 1
+
+    def progress(self, job_id: str, kind: str, data: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            # Progress events are advisory; skip the fsync a FULL sync adds.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._event(conn, job_id, kind, data)
+
+    def finish(
+        self,
+        job_id: str,
+        worker: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        attempt_dir: Optional[str] = None,
+    ) -> bool:
+        """
+        Record a job's outcome; False if its lease was lost in the meantime.
+
+        `attempt_dir` (from `claim`) becomes the job's `output_dir` and the
+        directories of its other attempts are removed.
+        """
+        status = FAILED if error is not None else DONE
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, result = ?, error = ?, "
+                "output_dir = COALESCE(?, output_dir) WHERE id = ? AND worker = ? AND status = ?",
+                (status, time.time(), json.dumps(result, ensure_ascii=False, default=str) if result else None,
+                 error, attempt_dir, job_id, worker, RUNNING),
+            ).rowcount == 1
+            if updated:
+                self._event(conn, job_id, status, {"error": error} if error else {})
+                self._release_upload(conn, job_id)
+        if updated and attempt_dir:
+            job_dir = os.path.dirname(attempt_dir)
+            for name in os.listdir(job_dir):
+                path = os.path.join(job_dir, name)
+                if name.startswith("attempt-") and path != attempt_dir:
+                    shutil.rmtree(path, ignore_errors=True)
+        return updated
+
+    def _release_upload(self, conn: sqlite3.Connection, job_id: str) -> None:
+        # Called under the write lock once a job is terminal: remove its
+        # upload unless another queued or running job has the same PDF.
+        row = conn.execute("SELECT pdf_sha256, upload_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        still_needed = conn.execute(
+            "SELECT 1 FROM jobs WHERE pdf_sha256 = ? AND status IN (?, ?)", (row["pdf_sha256"], QUEUED, RUNNING)
+        ).fetchone()
+        if not still_needed:
+            try:
+                os.remove(row["upload_path"])
+            except OSError:
+                pass
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; running jobs are left to finish."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            ).rowcount == 1
+            if cancelled:
+                self._event(conn, job_id, CANCELLED, {})
+                self._release_upload(conn, job_id)
+        return cancelled
+
+    def requeue_expired(self, everything: bool = False) -> int:
+        """
+        Queue again the running jobs whose lease lapsed (or, with
+        `everything`, all running jobs, e.g. at startup when no worker can
+        still hold one). Jobs already claimed `max_attempts` times fail.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ?" + ("" if everything else " AND lease_until < ?"),
+                (RUNNING,) if everything else (RUNNING, now),
+            ).fetchall()
+            for row in rows:
+                if row["attempts"] >= self.max_attempts:
+                    error = f"Worker lost {row['attempts']} times"
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, error = ? WHERE id = ?",
+                        (FAILED, now, error, row["id"]),
+                    )
+                    self._event(conn, row["id"], FAILED, {"error": error})
+                    self._release_upload(conn, row["id"])
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL WHERE id = ?", (QUEUED, row["id"])
+                    )
+                    self._event(conn, row["id"], QUEUED, {"requeued": True})
+        if rows:
+            logger.warning(f"[QUEUE] Requeued {len(rows)} unfinished jobs")
+        return len(rows)
+
+    def _job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job.pop("dedupe_key", None)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._job(row)
+            if job["status"] == QUEUED:
+                job["queue_position"] = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority > ? OR (priority = ? AND submitted_at < ?))",
+                    (QUEUED, row["priority"], row["priority"], row["submitted_at"]),
+                ).fetchone()[0]
+        return job
+
+    def jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY submitted_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY submitted_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, ts, type, data FROM events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        return [{"seq": row["seq"], "ts": row["ts"], "type": row["type"], "data": json.loads(row["data"])} for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+
+class _ProgressSink:
+    """Metrics sink that turns a job's spans and counters into queue events."""
+
+    def __init__(self, queue: JobQueue, job_id: str, interval: float = 0.25) -> None:
+        self.queue = queue
+        self.job_id = job_id
+        self.interval = interval
+        self.counters = {name: 0 for name in PROGRESS_COUNTERS}
+        self._last = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        if event["type"] == "span" and event["name"] in PROGRESS_STAGES:
+            self.queue.progress(self.job_id, "stage", {"stage": event["name"], "seconds": round(event["value"], 6)})
+        elif event["type"] == "counter" and event["name"] in self.counters:
+            with self._lock:
+                self.counters[event["name"]] += event["value"]
+                self._dirty = True
+                if time.monotonic() - self._last < self.interval:
+                    return
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last = time.monotonic()
+            counters = dict(self.counters)
+        self.queue.progress(self.job_id, "progress", counters)
+
+    def close(self) -> None:
+        self.flush()
+
+
+def resolve_parse_fn(spec: Optional[str]) -> Callable[..., Any]:
+    """`module:function` (default `agentic_doc.parse:parse`) -> the callable."""
+    module_name, _, attr = (spec or "agentic_doc.parse:parse").partition(":")
+    return getattr(importlib.import_module(module_name), attr or "parse")
+
+
+def _json_result(result: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+    # Asset bytes are on disk in output_dir; keep only their metadata.
+    assets = [{k: v for k, v in asset.items() if k not in ("data", "thumbnail")} for asset in result["assets"]]
+    report = {k: v for k, v in result["report"].items() if k in ("saved", "skipped", "errors")}
+    return {
+        "project_name": result["project_name"],
+        "cache_hit": result["cache_hit"],
+        "output_dir": output_dir,
+        "response_path": os.path.join(output_dir, "response.md"),
+        "assets": assets,
+        "report": report,
+        "timings": result["timings"],
+    }
+
+
+def _worker_main(
+    service_dir: str,
+    worker: str,
+    settings: Dict[str, Any],
+    wakeup: Any,
+    stop: Any,
+) -> None:
+    # Ctrl-C reaches the whole process group; the service stops workers
+    # through `stop` so the current job can finish.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from brochure_analyzer.wrapper import configure_logging, process_brochure_bytes
+    from brochure_analyzer.cache import ResultCache
+    from brochure_analyzer.metrics import Metrics
+
+    configure_logging()
+    queue = JobQueue(service_dir, lease_seconds=settings["lease_seconds"], max_attempts=settings["max_attempts"])
+    # Everything a cold script start pays for once per brochure: imports,
+    # the parser client, the result cache and the optional stores.
+    parse_fn = resolve_parse_fn(settings.get("parse_fn"))
+    cache = ResultCache(os.path.join(service_dir, "Cache"))
+    index = catalog = None
+    if settings.get("index_dir"):
+        from brochure_analyzer.retrieval import RetrievalIndex
+        index = RetrievalIndex(settings["index_dir"])
+    if settings.get("catalog_dir"):
+        from brochure_analyzer.catalog import Catalog
+        catalog = Catalog(settings["catalog_dir"])
+    logger.info(f"[WORKER] {worker} ready")
+
+    while not stop.is_set():
+        wakeup.acquire(timeout=settings["poll_seconds"])
+        job = queue.claim(worker)
+        if job is None:
+            continue
+        _run_job(queue, job, worker, parse_fn, cache, index, catalog, Metrics, process_brochure_bytes)
+    logger.info(f"[WORKER] {worker} stopped")
+
+
+def _run_job(
+    queue: JobQueue,
+    job: Dict[str, Any],
+    worker: str,
+    parse_fn: Callable[..., Any],
+    cache: Any,
+    index: Any,
+    catalog: Any,
+    metrics_cls: Any,
+    process_fn: Callable[..., Dict[str, Any]],
+) -> None:
+    job_id, output_dir = job["id"], job["attempt_dir"]
+    done, lost = threading.Event(), threading.Event()
+
+    def heartbeat() -> None:
+        while not done.wait(queue.lease_seconds / 3):
+            if not queue.renew(job_id, worker):
+                logger.warning(f"[WORKER] Lost the lease on {job_id}")
+                lost.set()
+                return
+
+    def discard() -> None:
+        # The job was queued again and may already run elsewhere; this
+        # attempt's output must not be promoted.
+        logger.warning(f"[WORKER] {worker} discarding attempt {job['attempts']} of {job_id}")
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    threading.Thread(target=heartbeat, name=f"lease-{job_id[:8]}", daemon=True).start()
+    sink = _ProgressSink(queue, job_id)
+    started = time.perf_counter()
+    try:
+        with open(job["upload_path"], "rb") as f:
+            pdf_bytes = f.read()
+        os.makedirs(output_dir, exist_ok=True)
+        result = process_fn(
+            pdf_bytes,
+            project_name=job["name"],
+            output_dir=output_dir,
+            cache=cache,
+            parse_fn=parse_fn,
+            metrics=metrics_cls(sinks=[sink], run=job_id),
+            index=index,
+            catalog=catalog,
+            **job["options"],
+        )
+        sink.close()
+        if lost.is_set():
+            discard()
+            return
+        with open(os.path.join(output_dir, "response.md"), "w", encoding="utf-8") as f:
+            f.write(result["markdown"])
+        summary = _json_result(result, output_dir)
+        with open(os.path.join(output_dir, "result.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+        if not queue.finish(job_id, worker, result=summary, attempt_dir=output_dir):
+            discard()
+            return
+        logger.info(f"[WORKER] {worker} finished {job['name']} ({job_id}) in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        logger.exception(f"[WORKER] {worker} failed {job['name']} ({job_id})")
+        sink.close()
+        if lost.is_set() or not queue.finish(job_id, worker, error=f"{type(e).__name__}: {e}", attempt_dir=output_dir):
+            discard()
+    finally:
+        done.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_ServiceHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self) -> Tuple[List[str], Dict[str, str]]:
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return [part for part in url.path.split("/") if part], params
+
+    def do_GET(self) -> None:
+        parts, params = self._route()
+        queue = self.server.queue
+        try:
+            limit = int(params.get("limit", 100))
+            wait = float(params.get("wait", 0))
+            after = int(params.get("after", self.headers.get("Last-Event-ID") or 0))
+            if limit < 1 or not 0 <= wait < float("inf") or after < 0:
+                raise ValueError("limit must be positive, wait and after non-negative")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid query: {e}"})
+            return
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok", "workers": self.server.service.alive_workers(), "jobs": queue.counts()})
+        elif parts == ["jobs"]:
+            self._send_json(200, queue.jobs(params.get("status"), limit))
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._wait(parts[1], wait)
+            self._send_json(200, job) if job else self._send_json(404, {"error": "job not found"})
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            self._stream_events(parts[1], after)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _wait(self, job_id: str, wait: float) -> Optional[Dict[str, Any]]:
+        # Long poll: ?wait=N returns as soon as the job finishes, or after N seconds.
+        deadline = time.monotonic() + min(wait, 300)
+        while True:
+            job = self.server.queue.get(job_id)
+            if job is None or job["status"] in TERMINAL or time.monotonic() >= deadline:
+                return job
+            time.sleep(self.server.poll_seconds)
+
+    def _stream_events(self, job_id: str, after: int) -> None:
+        queue = self.server.queue
+        if queue.get(job_id) is None:
+            self._send_json(404, {"error": "job not found"})
+            return
+        # Server-sent events until the job reaches a terminal state.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        last_write = time.monotonic()
+        try:
+            while True:
+                events = queue.events(job_id, after)
+                for event in events:
+                    after = event["seq"]
+                    payload = json.dumps(dict(event["data"], ts=event["ts"]), ensure_ascii=False, default=str)
+                    self.wfile.write(f"id: {after}\nevent: {event['type']}\ndata: {payload}\n\n".encode("utf-8"))
+                    if event["type"] in TERMINAL:
+                        self.wfile.flush()
+                        return
+                if events:
+                    self.wfile.flush()
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write > 15:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    last_write = time.monotonic()
+                elif queue.get(job_id)["status"] in TERMINAL and not queue.events(job_id, after):
+                    return
+                time.sleep(self.server.poll_seconds)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def do_POST(self) -> None:
+        parts, params = self._route()
+        if parts != ["jobs"]:
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            # rfile.read(-1) would block until the client hangs up.
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(f"invalid Content-Length {length}")
+            if length > self.server.max_upload_bytes:
+                self._send_json(413, {"error": f"upload larger than {self.server.max_upload_bytes} bytes"})
+                return
+            # Raw PDF bytes only: the service never opens paths named by a
+            # client. Name, priority and options (JSON) are in the query string.
+            pdf_bytes, name = self.rfile.read(length), params.get("name")
+            priority = int(params.get("priority", 0))
+            options = json.loads(params["options"]) if params.get("options") else None
+            if not pdf_bytes.startswith(b"%PDF"):
+                raise ValueError("body is not a PDF")
+            job, created = self.server.queue.submit(pdf_bytes, name=name, priority=priority, options=options)
+        except QueueFull as e:
+            self._send_json(429, {"error": str(e)}, headers={"Retry-After": str(self.server.retry_after)})
+            return
+        except ValueError as e:
+            self._send_json(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        if created:
+            self.server.service.notify()
+        self._send_json(202 if created else 200, dict(job, deduplicated=not created))
+
+    def do_DELETE(self) -> None:
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send_json(404, {"error": "not found"})
+        elif self.server.queue.cancel(parts[1]):
+            self._send_json(200, self.server.queue.get(parts[1]))
+        else:
+            self._send_json(409, {"error": "only queued jobs can be cancelled"})
+
+
+class _ServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: "BrochureService"
+    queue: JobQueue
+    poll_seconds: float
+    max_upload_bytes: int
+    retry_after: int
+
+
+class _UnixHTTPServer(_ServiceHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = str(self.server_address), 0
+
+    def get_request(self) -> Tuple[socket.socket, Tuple[str, int]]:
+        conn, _ = self.socket.accept()
+        return conn, ("unix", 0)
+
+
+class BrochureService:
+    """
+    Long-running brochure service: a `JobQueue` in `service_dir`, a pool of
+    warm worker processes and an HTTP front end (TCP or a Unix socket).
+
+    Workers import the pipeline, the parser (`parse_fn`, a "module:function"
+    spec, default agentic_doc's `parse`), the result cache and the optional
+    retrieval index and catalog once, then loop claiming jobs. They are
+    spawned, not forked, so the HTTP threads are never copied mid-request.
+    Dead workers are replaced and their jobs queued again once the lease
+    lapses. On start, jobs left running by a previous service are queued
+    again; a lock file keeps a second service off the same `service_dir`.
+
+    HTTP API:
+        POST /jobs                  PDF bytes (?name=&priority=&options=);
+                                    202 new job, 200 deduplicated, 429 queue full
+        GET  /jobs[?status=]        recent jobs
+        GET  /jobs/<id>[?wait=N]    job status, long-polling up to N seconds
+        GET  /jobs/<id>/events      progress as server-sent events
+        DELETE /jobs/<id>           cancel a queued job
+        GET  /health                worker and queue counts
+    """
+
+    def __init__(
+        self,
+        service_dir: str = SERVICE_DIR,
+        workers: Optional[int] = None,
+        parse_fn: Optional[str] = None,
+        max_queued: Optional[int] = 1000,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        index_dir: Optional[str] = None,
+        catalog_dir: Optional[str] = None,
+        poll_seconds: float = 0.05,
+        max_upload_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.service_dir = os.path.abspath(service_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.settings = {
+            "parse_fn": parse_fn,
+            "lease_seconds": lease_seconds,
+            "max_attempts": max_attempts,
+            "index_dir": os.path.abspath(index_dir) if index_dir else None,
+            "catalog_dir": os.path.abspath(catalog_dir) if catalog_dir else None,
+            "poll_seconds": 1.0,
+        }
+        self.poll_seconds = poll_seconds
+        self.max_upload_bytes = max_upload_bytes
+        os.makedirs(self.service_dir, exist_ok=True)
+        self.queue = JobQueue(self.service_dir, max_queued, lease_seconds, max_attempts)
+        self._context = multiprocessing.get_context("spawn")
+        self._wakeup = self._context.Semaphore(0)
+        self._stop = self._context.Event()
+        self._processes: Dict[str, Any] = {}
+        self._server: Optional[_ServiceHTTPServer] = None
+        self._supervisor: Optional[threading.Thread] = None
+        self._lock_file: Any = None
+
+    def notify(self) -> None:
+        """Wake one idle worker (workers also poll, so a missed wake-up only adds latency)."""
+        self._wakeup.release()
+
+    def alive_workers(self) -> int:
+        return sum(process.is_alive() for process in self._processes.values())
+
+    def _spawn(self, name: str) -> None:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.service_dir, name, self.settings, self._wakeup, self._stop),
+            name=name,
+            daemon=True,
+        )
+        process.start()
+        self._processes[name] = process
+
+    def _supervise(self) -> None:
+        while not self._stop.wait(min(5.0, self.queue.lease_seconds / 3)):
+            for name, process in list(self._processes.items()):
+                if not process.is_alive():
+                    logger.warning(f"[SERVICE] Worker {name} exited ({process.exitcode}); restarting")
+                    self._spawn(name)
+            if self.queue.requeue_expired():
+                for _ in range(self.workers):
+                    self.notify()
+
+    def start(self) -> "BrochureService":
+        if fcntl is not None:
+            self._lock_file = open(os.path.join(self.service_dir, "service.lock"), "w")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                raise RuntimeError(f"Another service is already running on {self.service_dir}")
+        # No worker of ours is running yet, so every running job is orphaned.
+        self.queue.requeue_expired(everything=fcntl is not None)
+        for n in range(self.workers):
+            self._spawn(f"worker-{os.getpid()}-{n}")
+        for _ in range(self.queue.counts()[QUEUED]):
+            self.notify()
+        self._supervisor = threading.Thread(target=self._supervise, name="supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info(f"[SERVICE] {self.workers} workers on {self.service_dir}")
+        return self
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None) -> _ServiceHTTPServer:
+        """Start the HTTP front end in a background thread and return the server."""
+        if socket_path:
+            server: _ServiceHTTPServer = _UnixHTTPServer(socket_path, _Handler)
+            where = f"unix:{socket_path}"
+        else:
+            server = _ServiceHTTPServer((host, port), _Handler)
+            where = f"http://{host}:{server.server_port}"
+        server.service, server.queue = self, self.queue
+        server.poll_seconds, server.max_upload_bytes, server.retry_after = self.poll_seconds, self.max_upload_bytes, 1
+        threading.Thread(target=server.serve_forever, name="http", daemon=True).start()
+        self._server = server
+        logger.info(f"[SERVICE] Listening on {where}")
+        return server
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop accepting requests, let workers finish their current job, then exit."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if isinstance(self._server, _UnixHTTPServer) and os.path.exists(self._server.server_address):
+                os.remove(self._server.server_address)
+            self._server = None
+        self._stop.set()
+        for _ in self._processes:
+            self.notify()
+        deadline = time.monotonic() + timeout
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                # Its job stays "running" and is queued again on the next start.
+                process.terminate()
+        self._processes.clear()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        logger.info("[SERVICE] Stopped")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ServiceClient:
+    """
+    Minimal client for a running `BrochureService`, over TCP (`url`, e.g.
+    "http://127.0.0.1:8765") or a Unix socket (`socket_path`).
+    """
+
+    def __init__(self, url: Optional[str] = None, socket_path: Optional[str] = None, timeout: float = 330.0) -> None:
+        if not url and not socket_path:
+            raise ValueError("ServiceClient needs a url or a socket_path")
+        self.url = urlsplit(url) if url else None
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.socket_path:
+            return _UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        return http.client.HTTPConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> Any:
+        conn = self._connection()
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"null")
+        finally:
+            conn.close()
+        if response.status >= 400:
+            if response.status == 429:
+                raise QueueFull(data.get("error"))
+            raise RuntimeError(f"{method} {path} failed ({response.status}): {data.get('error')}")
+        return data
+
+    def submit(
+        self,
+        pdf: Union[bytes, str],
+        name: Optional[str] = None,
+        priority: int = 0,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Upload PDF bytes (or the file at a path) and return the job."""
+        if isinstance(pdf, str):
+            name = name or os.path.splitext(os.path.basename(pdf))[0]
+            with open(pdf, "rb") as f:
+                pdf = f.read()
+        query = {"priority": str(priority)}
+        if name:
+            query["name"] = name
+        if options:
+            query["options"] = json.dumps(options)
+        return self._request("POST", f"/jobs?{urlencode(query)}", body=pdf, headers={"Content-Type": "application/pdf"})
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def wait(self, job_id: str, timeout: float = 300.0) -> Dict[str, Any]:
+        """Block until the job finishes (or `timeout` passes) and return it."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            job = self._request("GET", f"/jobs/{job_id}?wait={max(0.0, min(remaining, 300.0)):.3f}")
+            if job["status"] in TERMINAL or remaining <= 0:
+                return job
+
+    def events(self, job_id: str, after: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield the job's progress events until it finishes."""
+        conn = self._connection()
+        try:
+            conn.request("GET", f"/jobs/{job_id}/events?after={after}")
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"GET /jobs/{job_id}/events failed ({response.status})")
+            event: Dict[str, Any] = {}
+            for raw in response:
+                line = raw.decode("utf-8").rstrip("\n")
+                if not line:
+                    if event:
+                        yield event
+                    event = {}
+                elif line.startswith("id: "):
+                    event["seq"] = int(line[4:])
+                elif line.startswith("event: "):
+                    event["type"] = line[7:]
+                elif line.startswith("data: "):
+                    event["data"] = json.loads(line[6:])
+        finally:
+            conn.close()
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._request("GET", f"/jobs?status={status}" if status else "/jobs")
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/health")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from brochure_analyzer.wrapper import configure_logging
+
+    parser = argparse.ArgumentParser(description="Run the brochure service: job queue, warm workers and HTTP front end.")
+    parser.add_argument("--service-dir", default=SERVICE_DIR, help="Queue, uploads and job outputs (default: Service)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--parse-fn", default=None,
+                        help="Parser as module:function (default: agentic_doc.parse:parse)")
+    parser.add_argument("--max-queued", type=int, default=1000, help="Reject submissions beyond this many queued jobs")
+    parser.add_argument("--lease-seconds", type=float, default=60.0)
+    parser.add_argument("--index-dir", default=None, help="Add every brochure to the retrieval index in this directory")
+    parser.add_argument("--catalog-dir", default=None, help="Upsert every brochure into the catalog in this directory")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    service = BrochureService(
+        args.service_dir, workers=args.workers, parse_fn=args.parse_fn, max_queued=args.max_queued,
+        lease_seconds=args.lease_seconds, index_dir=args.index_dir, catalog_dir=args.catalog_dir,
+    ).start()
+    service.serve(args.host, args.port, socket_path=args.socket)
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopped.set())
+    stopped.wait()
+    service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
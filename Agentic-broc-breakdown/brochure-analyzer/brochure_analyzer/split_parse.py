@@ -0,0 +1,311 @@
+import os
+import json
+import glob
+import time
+import copy
+import shutil
+import logging
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, List, Mapping, Optional, Tuple, Union
+
+import fitz
+
+from brochure_analyzer.parse_dispatch import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+NOT_PRESENT = "Not Present"
+
+# Extraction sections carrying a pageNumber that points into the source PDF.
+PAGE_SECTIONS = ("floorplanConfigs", "amenitiesImages", "masterplanImage", "locationMapImage", "builder")
+
+# List sections merged by concatenation (objects) or order-preserving dedupe (strings).
+CONCAT_SECTIONS = ("floorplanConfigs", "amenitiesImages", "location_highlights")
+DEDUPE_SECTIONS = ("amenities", "tower_names", "interior_specification")
+
+# Single-image sections: the first chunk with a usable bbox wins.
+IMAGE_SECTIONS = ("masterplanImage", "locationMapImage")
+IMAGE_KEYS = ("boundingBoxLTRB", "pageNumber", "imageId")
+
+
+def _present(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip() != "" and value.strip().lower() != NOT_PRESENT.lower()
+    if isinstance(value, (list, dict)):
+        return bool(value)
+    return True
+
+
+def _page_items(extraction: Dict[str, Any]):
+    for section in PAGE_SECTIONS:
+        value = extraction.get(section)
+        if isinstance(value, dict):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    yield item
+
+
+def remap_page_numbers(
+    extraction: Dict[str, Any],
+    mapping: Union[Mapping[int, int], Callable[[int], int]],
+) -> Dict[str, Any]:
+    """
+    Return a copy of `extraction` with every pageNumber translated through
+    `mapping` (a dict or a callable). Unparseable page numbers are left as-is;
+    numbers the mapping does not know are logged and set to None, so the
+    asset is skipped instead of cropped from an unrelated page.
+    """
+    remapped = copy.deepcopy(extraction)
+    translate = mapping if callable(mapping) else mapping.__getitem__
+    for item in _page_items(remapped):
+        page = item.get("pageNumber")
+        if page is None or not str(page).strip().isdigit():
+            continue
+        try:
+            item["pageNumber"] = translate(int(page))
+        except (KeyError, IndexError):
+            logger.warning(f"[SPLIT] Dropping pageNumber {page}: not a page of the parsed document")
+            item["pageNumber"] = None
+    return remapped
+
+
+def _vote(values: List[Any]) -> Any:
+    # Most common present value; ties go to the earliest chunk.
+    present = [v for v in values if _present(v)]
+    if not present:
+        return values[0] if values else NOT_PRESENT
+    counts = Counter(json.dumps(v, sort_keys=True) for v in present)
+    best = max(counts.values())
+    for value in present:
+        if counts[json.dumps(value, sort_keys=True)] == best:
+            return value
+
+
+def merge_extractions(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk extraction dicts (page numbers already rebased) into one
+    dict of the `schema.schema` shape.
+    """
+    merged: Dict[str, Any] = {}
+    keys: List[str] = []
+    for part in parts:
+        keys.extend(k for k in part if k not in keys)
+
+    for key in keys:
+        values = [part.get(key) for part in parts if key in part]
+
+        if key in CONCAT_SECTIONS:
+            items, seen = [], set()
+            for value in values:
+                for item in value if isinstance(value, list) else []:
+                    marker = json.dumps(item, sort_keys=True)
+                    if marker not in seen:
+                        seen.add(marker)
+                        items.append(item)
+            merged[key] = items
+
+        elif key in DEDUPE_SECTIONS:
+            items, seen = [], set()
+            for value in values:
+                for item in value if isinstance(value, list) else []:
+                    marker = str(item).strip().lower()
+                    if _present(item) and marker not in seen:
+                        seen.add(marker)
+                        items.append(item)
+            merged[key] = items or NOT_PRESENT
+
+        elif key in IMAGE_SECTIONS:
+            dicts = [v for v in values if isinstance(v, dict)]
+            merged[key] = next(
+                (v for v in dicts if _present(v.get("boundingBoxLTRB"))),
+                dicts[0] if dicts else _vote(values),
+            )
+
+        elif any(isinstance(v, dict) for v in values):
+            # Nested objects (projectAddress, area, builder): vote field by field.
+            dicts = [v for v in values if isinstance(v, dict)]
+            fields: List[str] = []
+            for d in dicts:
+                fields.extend(f for f in d if f not in fields)
+            combined = {f: _vote([d[f] for d in dicts if f in d]) for f in fields if f not in IMAGE_KEYS}
+            # Keep the logo location of a single chunk together.
+            source = next((d for d in dicts if _present(d.get("boundingBoxLTRB"))), None)
+            if source is not None:
+                combined.update({f: source[f] for f in IMAGE_KEYS if f in source})
+            merged[key] = combined
+
+        else:
+            merged[key] = _vote(values)
+
+    return merged
+
+
+def open_pdf(pdf: Union[str, bytes]) -> fitz.Document:
+    """Open a PDF given as a path or as its bytes."""
+    if isinstance(pdf, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(pdf), filetype="pdf")
+    return fitz.open(pdf)
+
+
+def load_parse_result(parse_result: Any, save_dir: str) -> Dict[str, Any]:
+    """Read the {"markdown", "extraction"} JSON a parse call produced in `save_dir`."""
+    if isinstance(parse_result, (list, tuple)) and parse_result:
+        doc = parse_result[0]
+        result_path = getattr(doc, "result_path", None)
+        if result_path and os.path.exists(str(result_path)):
+            with open(str(result_path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        if getattr(doc, "extraction", None) is not None:
+            return {"markdown": getattr(doc, "markdown", ""), "extraction": doc.extraction}
+
+    files = glob.glob(os.path.join(save_dir, "*.json"))
+    if not files:
+        raise FileNotFoundError(f"Parse produced no JSON in {save_dir}")
+    with open(max(files, key=os.path.getmtime), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_parse_result(data: Dict[str, Any], stem: str, result_save_dir: str) -> List[SimpleNamespace]:
+    """Save `data` the way agentic_doc does and return a matching result list."""
+    os.makedirs(result_save_dir, exist_ok=True)
+    result_path = os.path.join(result_save_dir, f"{stem}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return [SimpleNamespace(
+        result_path=result_path,
+        markdown=data.get("markdown", ""),
+        extraction=data.get("extraction"),
+    )]
+
+
+class SplitParser:
+    """
+    Parse callable that splits large PDFs into page-range chunks, parses the
+    chunks concurrently and merges the results.
+
+    Documents under `min_pages` pages go to `parse_fn` unchanged. Otherwise
+    each chunk of `chunk_pages` pages is parsed on its own (up to
+    `max_workers` at a time). Page numbers are rebased to the original
+    document, and the merged {"markdown", "extraction"} JSON is written to
+    `result_save_dir` like a normal parse. Only chunks that failed are
+    retried, for up to `max_attempts` rounds, with the dispatcher's jittered
+    exponential backoff between rounds.
+
+    The document is a path or the PDF bytes (as `process_brochure_bytes`
+    passes it). Merged results of bytes input are only written to disk when
+    `result_save_dir` is given.
+    """
+
+    def __init__(
+        self,
+        parse_fn: Optional[Callable[..., Any]] = None,
+        chunk_pages: int = 20,
+        min_pages: int = 40,
+        max_workers: int = 4,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        if parse_fn is None:
+            from agentic_doc.parse import parse as parse_fn
+        self.parse_fn = parse_fn
+        self.chunk_pages = chunk_pages
+        self.min_pages = min_pages
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _split(self, pdf: Union[str, bytes], stem: str, work_dir: str) -> List[Tuple[int, str]]:
+        chunks = []
+        with open_pdf(pdf) as src:
+            for start in range(0, src.page_count, self.chunk_pages):
+                end = min(start + self.chunk_pages, src.page_count) - 1
+                chunk_path = os.path.join(work_dir, f"{stem}_pages{start}-{end}.pdf")
+                with fitz.open() as chunk:
+                    chunk.insert_pdf(src, from_page=start, to_page=end)
+                    chunk.save(chunk_path, garbage=3, deflate=True)
+                chunks.append((start, chunk_path))
+        return chunks
+
+    def _parse_chunk(self, chunk_path: str, extraction_schema: Any, **kwargs: Any) -> Dict[str, Any]:
+        save_dir = os.path.splitext(chunk_path)[0]
+        shutil.rmtree(save_dir, ignore_errors=True)
+        os.makedirs(save_dir)
+        result = self.parse_fn(chunk_path, extraction_schema=extraction_schema, result_save_dir=save_dir, **kwargs)
+        return load_parse_result(result, save_dir)
+
+    def __call__(
+        self,
+        pdf: Union[str, bytes],
+        extraction_schema: Any = None,
+        result_save_dir: Optional[str] = None,
+        **kwargs: Any,
+    ):
+        with open_pdf(pdf) as doc:
+            page_count = doc.page_count
+        if page_count < self.min_pages:
+            if result_save_dir is not None:
+                kwargs["result_save_dir"] = result_save_dir
+            return self.parse_fn(pdf, extraction_schema=extraction_schema, **kwargs)
+
+        in_memory = not isinstance(pdf, str)
+        stem = "brochure" if in_memory else os.path.splitext(os.path.basename(pdf))[0]
+        work_dir = tempfile.mkdtemp(prefix=f"{stem}_chunks_")
+        try:
+            chunks = self._split(pdf, stem, work_dir)
+            logger.info(f"[SPLIT] {stem}: {page_count} pages -> {len(chunks)} chunks")
+
+            results: Dict[int, Dict[str, Any]] = {}
+            remaining = list(chunks)
+            errors: Dict[int, str] = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for attempt in range(self.max_attempts):
+                    if not remaining:
+                        break
+                    if attempt:
+                        delay = backoff_delay(attempt - 1, self.base_delay, self.max_delay)
+                        logger.info(f"[SPLIT] Retrying {len(remaining)} chunks in {delay:.1f}s")
+                        time.sleep(delay)
+                    futures = {
+                        start: pool.submit(self._parse_chunk, path, extraction_schema, **kwargs)
+                        for start, path in remaining
+                    }
+                    failed = []
+                    for start, path in remaining:
+                        try:
+                            results[start] = futures[start].result()
+                            errors.pop(start, None)
+                        except Exception as e:
+                            errors[start] = str(e)
+                            failed.append((start, path))
+                            logger.warning(f"[SPLIT] Chunk at page {start} failed (attempt {attempt + 1}): {e}")
+                    remaining = failed
+
+            if remaining:
+                detail = "; ".join(f"pages from {start}: {errors[start]}" for start, _ in remaining)
+                raise RuntimeError(f"{len(remaining)} of {len(chunks)} chunks failed to parse: {detail}")
+
+            starts = sorted(results)
+            parts = [
+                remap_page_numbers(results[start].get("extraction") or {}, lambda page, offset=start: page + offset)
+                for start in starts
+            ]
+            data = {
+                "markdown": "\n\n".join(results[start].get("markdown") or "" for start in starts),
+                "extraction": merge_extractions(parts),
+                "chunks": [{"first_page": start, "pages": min(self.chunk_pages, page_count - start)} for start in starts],
+            }
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if in_memory and result_save_dir is None:
+            return [SimpleNamespace(result_path=None, markdown=data["markdown"], extraction=data["extraction"])]
+        return write_parse_result(data, stem, result_save_dir or ".")
@@ -0,0 +1,437 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+from typing import Dict, Any, BinaryIO, Callable, Optional, Union
+from brochure_analyzer.elements_breakdown import BrochureProcessor
+from brochure_analyzer.schema import schema
+from brochure_analyzer.cache import ResultCache, cache_key, hash_schema, output_name, parse_variant
+from brochure_analyzer.metrics import Metrics, configure_logging, merge_summaries, profiled
+from brochure_analyzer.retrieval import RetrievalIndex, index_brochure, index_result
+from brochure_analyzer.catalog import Catalog, catalog_result
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESPONSES_DIR = os.path.join("Responses")
+DATA_DIR = os.path.join("Data")
+JSON_DIR = os.path.join("JSON_DIR")
+
+
+def ensure_directories() -> None:
+    """Ensures that the main output directories exist."""
+    os.makedirs(RESPONSES_DIR, exist_ok=True)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(JSON_DIR, exist_ok=True)
+
+
+def _find_latest_json_for_project(project_name: str) -> str:
+    pattern = os.path.join(JSON_DIR, f"{project_name}_*.json")
+    files = glob.glob(pattern)
+    if not files:
+        raise FileNotFoundError(f"No JSON files found matching pattern: {pattern}")
+    return max(files, key=os.path.getmtime)
+
+
+def _resolve_parse_output(parse_result: Any, project_name: str) -> str:
+    # agentic_doc reports where it saved each document; only fall back to
+    # scanning JSON_DIR for parse callables that do not.
+    if isinstance(parse_result, (list, tuple)) and parse_result:
+        result_path = getattr(parse_result[0], "result_path", None)
+        if result_path and os.path.exists(str(result_path)):
+            return str(result_path)
+    return _find_latest_json_for_project(project_name)
+
+
+def _project_name(pdf_path: str) -> str:
+    return os.path.splitext(os.path.basename(pdf_path))[0]
+
+
+def parse_stage(
+    pdf_path: str,
+    cache: Optional[ResultCache] = None,
+    parse_fn: Optional[Callable[..., Any]] = None,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, Any]:
+    """
+    Run the remote-parse half of the pipeline for one brochure.
+
+    Returns a job dict for `extract_stage`. When the brochure is fully cached
+    the job already carries the final result under "result". Spans and
+    counters go to `metrics`; without one, the stage's own timing summary is
+    attached to the job (or its result) under "timings".
+    """
+    if metrics is not None:
+        return _parse_stage(pdf_path, cache, parse_fn, metrics)
+    metrics = Metrics(run=_project_name(pdf_path))
+    job = _parse_stage(pdf_path, cache, parse_fn, metrics)
+    (job.get("result") or job)["timings"] = metrics.summary()
+    return job
+
+
+def _parse_stage(
+    pdf_path: str,
+    cache: Optional[ResultCache],
+    parse_fn: Optional[Callable[..., Any]],
+    metrics: Metrics,
+) -> Dict[str, Any]:
+    ensure_directories()
+
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+    cache = cache if cache is not None else ResultCache()
+    with metrics.span("cache_lookup"):
+        key = cache.key_for(pdf_path, schema, parse_variant(parse_fn))
+        cached = cache.get(key)
+
+    project_name = _project_name(pdf_path)
+    # Outputs are named by stem and content hash, so two PDFs with the same
+    # file name (or a renamed re-upload) never share a folder.
+    output_stem = output_name(project_name, key)
+    response_path = os.path.join(RESPONSES_DIR, f"{output_stem}.md")
+    job = {
+        "pdf_path": pdf_path,
+        "project_name": project_name,
+        "output_name": output_stem,
+        "response_path": response_path,
+        "key": key,
+        "cache_hit": False,
+    }
+
+    if cached and cached["project_data_dir"]:
+        metrics.count("cache_hits", kind="result")
+        logger.info(f"[SKIP] Already processed: {project_name} (cached as {cached['project_name']})")
+        job["result"] = {
+            "status": 200,
+            "project_name": project_name,
+            "json_file": cached["json_file"],
+            "project_data_dir": cached["project_data_dir"],
+            "response_path": cached["response_path"],
+            "cache_hit": True,
+        }
+        return job
+
+    if cached:
+        # Parse result is cached but its outputs are gone; rebuild them locally.
+        metrics.count("cache_hits", kind="parse")
+        logger.info(f"[CACHE] Reusing cached parse for: {project_name}")
+        job["json_file"] = cached["json_file"]
+        job["cache_hit"] = True
+        return job
+
+    logger.info(f"[START] Processing brochure: {project_name}")
+
+    # Run parsing (saves JSON to JSON_DIR)
+    if parse_fn is None:
+        # Imported on first use: agentic_doc (and pydantic) are only needed
+        # for remote parsing, not for re-extracting assets from saved JSON.
+        from agentic_doc.parse import parse as parse_fn
+    try:
+        with metrics.span("parse"):
+            parse_result = parse_fn(pdf_path, extraction_schema=schema, result_save_dir=JSON_DIR)
+    except Exception as e:
+        raise RuntimeError(f"Parsing PDF failed: {e}")
+    metrics.count("parse_calls")
+
+    job["json_file"] = cache.put(key, _resolve_parse_output(parse_result, project_name), project_name)
+    return job
+
+
+def extract_stage(
+    job: Dict[str, Any],
+    cache: Optional[ResultCache] = None,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, Any]:
+    """
+    Run the local half of the pipeline: markdown, asset crops and cleaned JSON.
+
+    Without `metrics`, the result's "timings" combine the parse stage's
+    summary (job["timings"]) with this stage's own.
+    """
+    if job.get("result"):
+        return job["result"]
+    if metrics is not None:
+        return _extract_stage(job, cache, metrics)
+    metrics = Metrics(run=job["project_name"])
+    result = _extract_stage(job, cache, metrics)
+    result["timings"] = merge_summaries(job.get("timings"), metrics.summary())
+    return result
+
+
+def _extract_stage(job: Dict[str, Any], cache: Optional[ResultCache], metrics: Metrics) -> Dict[str, Any]:
+    cache = cache if cache is not None else ResultCache()
+    pdf_path = job["pdf_path"]
+    project_name = job["project_name"]
+    response_path = job["response_path"]
+    json_file = job["json_file"]
+
+    # Read JSON
+    try:
+        with metrics.span("read_json"), open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        raise RuntimeError(f"Failed to read JSON file {json_file}: {e}")
+
+    # Save markdown if present
+    markdown_content = data.get("markdown")
+    if markdown_content:
+        with open(response_path, "w", encoding="utf-8") as md_file:
+            md_file.write(markdown_content)
+        logger.info(f"[INFO] Markdown saved to {response_path}")
+    else:
+        logger.warning(f"[WARNING] No 'markdown' key found in {json_file}")
+
+    # Get extraction data
+    extracted_data = data.get("extraction")
+    if not extracted_data:
+        raise RuntimeError(f"No 'extraction' key found in {json_file}")
+
+    # Prepare output directory
+    project_data_dir = os.path.join(DATA_DIR, job["output_name"])
+    os.makedirs(project_data_dir, exist_ok=True)
+
+    # Process brochure assets
+    try:
+        processor = BrochureProcessor(
+            source_pdf_path=pdf_path,
+            extracted_json_data=extracted_data,
+            output_dir=project_data_dir,
+            metrics=metrics,
+        )
+        assets = processor.process_all()
+    except Exception as e:
+        logger.exception("BrochureProcessor failed")
+        raise RuntimeError(f"BrochureProcessor failed: {e}")
+
+    cache.update_outputs(job["key"], response_path, project_data_dir)
+
+    logger.info(f"[DONE] Finished processing: {project_name}")
+    return {
+        "status": 200,
+        "project_name": project_name,
+        "json_file": json_file,
+        "project_data_dir": project_data_dir,
+        "response_path": response_path,
+        "cache_hit": job["cache_hit"],
+        "assets": assets,
+    }
+
+
+def process_brochure_pdf(
+    pdf_path: str,
+    cache: Optional[ResultCache] = None,
+    parse_fn: Optional[Callable[..., Any]] = None,
+    metrics: Optional[Metrics] = None,
+    profile_dir: Optional[str] = None,
+    index: Optional[RetrievalIndex] = None,
+    catalog: Optional[Catalog] = None,
+) -> Dict[str, Any]:
+    """
+    Extract data and process a single brochure PDF.
+
+    Results are cached by PDF content and schema hash, so a brochure that was
+    already parsed (under any file name) is never sent to the remote parser
+    again. Pass `cache` to use a cache other than the default one in CACHE_DIR,
+    and `parse_fn` to replace `agentic_doc.parse` (same call signature).
+    Markdown and assets are written to `Responses/<project>-<hash>.md` and
+    `Data/<project>-<hash>/`, `<hash>` being the start of the PDF's SHA-256,
+    so PDFs that share a file name never share outputs.
+
+    Every stage is timed through `metrics` (a fresh `metrics.Metrics` by
+    default; pass one with sinks to export events) and its summary is
+    returned under "timings". With `profile_dir`, the run is profiled with
+    cProfile into `<profile_dir>/<project_name>.prof`.
+
+    With `index` (a `retrieval.RetrievalIndex`), the saved markdown and
+    cleaned JSON are chunked and indexed for Q&A once the brochure is done,
+    replacing the project's previous chunks. Fully cached brochures are
+    only indexed if the index does not have them yet. With `catalog` (a
+    `catalog.Catalog`), the cleaned JSON is upserted into the project
+    catalog; unchanged extractions are left as they are.
+
+    Returns:
+        dict: {
+            "status": 200,
+            "project_name": str,
+            "json_file": str,
+            "project_data_dir": str,
+            "response_path": str,
+            "cache_hit": bool,
+            "assets": {"saved": [...], "skipped": [...], "errors": [...]},
+            "timings": {"spans": {...}, "counters": {...}, "histograms": {...}},
+            "profile": str  # only with profile_dir
+        }
+
+    Raises:
+        Exception on failure.
+    """
+    cache = cache if cache is not None else ResultCache()
+    metrics = metrics if metrics is not None else Metrics(run=_project_name(pdf_path))
+    profile_path = os.path.join(profile_dir, f"{_project_name(pdf_path)}.prof") if profile_dir else None
+    with profiled(profile_path), metrics.span("brochure"):
+        job = parse_stage(pdf_path, cache=cache, parse_fn=parse_fn, metrics=metrics)
+        result = extract_stage(job, cache=cache, metrics=metrics)
+        if index is not None and not (job.get("result") and index.has_project(result["project_name"])):
+            with metrics.span("index"):
+                index_result(index, result)
+        if catalog is not None:
+            with metrics.span("catalog"):
+                catalog_result(catalog, result)
+    result["timings"] = metrics.summary()
+    if profile_path:
+        result["profile"] = profile_path
+    return result
+
+
+def _parse_output_data(parse_result: Any) -> Dict[str, Any]:
+    # Read {"markdown", "extraction"} off the parse result objects; only
+    # fall back to a JSON file if the parse callable saved one anyway.
+    doc = parse_result[0] if isinstance(parse_result, (list, tuple)) and parse_result else parse_result
+    if isinstance(doc, dict):
+        markdown, extraction = doc.get("markdown"), doc.get("extraction")
+    else:
+        result_path = getattr(doc, "result_path", None)
+        if result_path and os.path.exists(str(result_path)):
+            with open(str(result_path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        markdown, extraction = getattr(doc, "markdown", None), getattr(doc, "extraction", None)
+    if hasattr(extraction, "model_dump"):
+        extraction = extraction.model_dump()
+    return {"markdown": markdown or "", "extraction": extraction}
+
+
+def process_brochure_bytes(
+    pdf: Union[bytes, BinaryIO],
+    project_name: str = "brochure",
+    output_dir: Optional[str] = None,
+    cache: Optional[ResultCache] = None,
+    parse_fn: Optional[Callable[..., Any]] = None,
+    metrics: Optional[Metrics] = None,
+    profile_dir: Optional[str] = None,
+    index: Optional[RetrievalIndex] = None,
+    catalog: Optional[Catalog] = None,
+    **processor_options: Any,
+) -> Dict[str, Any]:
+    """
+    Parse and extract a brochure held in memory.
+
+    `pdf` is the PDF bytes or a binary file object. The document is sent to
+    the parser as bytes and opened with `fitz.open(stream=...)`; nothing is
+    written to the shared Responses/, Data/ or JSON_DIR/ folders, so
+    concurrent calls are independent. Pass `output_dir` to also write the
+    assets, cleaned JSON and manifest there, and `cache` to reuse parse
+    results (keyed by PDF bytes, as in `process_brochure_pdf`). `metrics`,
+    `profile_dir`, `index` and `catalog` work as in `process_brochure_pdf`. Remaining
+    keyword arguments go to `BrochureProcessor`.
+
+    Returns:
+        dict: {
+            "status": 200,
+            "project_name": str,
+            "cache_hit": bool,
+            "markdown": str,
+            "extraction": dict,
+            "cleaned": dict,
+            "assets": [{"category", "label", "page", "bbox", "filename", "name", "path",
+                        "format", "width", "height", "bytes", "sha256", "data", "thumbnail"}, ...],
+            "report": {"saved": [...], "skipped": [...], "errors": [...], ...},
+            "timings": {"spans": {...}, "counters": {...}, "histograms": {...}},
+            "profile": str  # only with profile_dir
+        }
+
+    Raises:
+        Exception on failure.
+    """
+    metrics = metrics if metrics is not None else Metrics(run=project_name)
+    profile_path = os.path.join(profile_dir, f"{project_name}.prof") if profile_dir else None
+    with profiled(profile_path), metrics.span("brochure"):
+        result = _process_brochure_bytes(pdf, project_name, output_dir, cache, parse_fn, metrics, processor_options)
+        if index is not None:
+            with metrics.span("index"):
+                index_brochure(index, project_name, result["markdown"], result["cleaned"])
+        if catalog is not None:
+            with metrics.span("catalog"):
+                catalog.upsert_project(project_name, result["cleaned"])
+    result["timings"] = metrics.summary()
+    if profile_path:
+        result["profile"] = profile_path
+    return result
+
+
+def _process_brochure_bytes(
+    pdf: Union[bytes, BinaryIO],
+    project_name: str,
+    output_dir: Optional[str],
+    cache: Optional[ResultCache],
+    parse_fn: Optional[Callable[..., Any]],
+    metrics: Metrics,
+    processor_options: Dict[str, Any],
+) -> Dict[str, Any]:
+    pdf_bytes = bytes(pdf.read() if hasattr(pdf, "read") else pdf)
+    with metrics.span("cache_lookup"):
+        key = cache_key(hashlib.sha256(pdf_bytes).hexdigest(), hash_schema(schema), parse_variant(parse_fn))
+        cached = cache.get(key) if cache is not None else None
+    if cached:
+        metrics.count("cache_hits", kind="parse")
+        logger.info(f"[CACHE] Reusing cached parse for: {project_name}")
+        with metrics.span("read_json"), open(cached["json_file"], "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        logger.info(f"[START] Processing brochure: {project_name}")
+        if parse_fn is None:
+            from agentic_doc.parse import parse as parse_fn
+        try:
+            with metrics.span("parse"):
+                data = _parse_output_data(parse_fn(pdf_bytes, extraction_schema=schema))
+        except Exception as e:
+            raise RuntimeError(f"Parsing PDF failed: {e}")
+        metrics.count("parse_calls")
+        if not data.get("extraction"):
+            raise RuntimeError(f"No 'extraction' in the parse result for {project_name}")
+        if cache is not None:
+            cache.put_data(key, data, project_name)
+
+    extraction = data.get("extraction")
+    if not extraction:
+        raise RuntimeError(f"No 'extraction' key found in the cached parse for {project_name}")
+
+    try:
+        processor = BrochureProcessor(
+            source_pdf_path=pdf_bytes,
+            extracted_json_data=extraction,
+            output_dir=output_dir,
+            source_name=project_name,
+            collect_assets=True,
+            metrics=metrics,
+            **processor_options,
+        )
+        report = processor.process_all()
+    except Exception as e:
+        logger.exception("BrochureProcessor failed")
+        raise RuntimeError(f"BrochureProcessor failed: {e}")
+
+    logger.info(f"[DONE] Finished processing: {project_name}")
+    return {
+        "status": 200,
+        "project_name": project_name,
+        "cache_hit": bool(cached),
+        "markdown": data.get("markdown") or "",
+        "extraction": extraction,
+        "cleaned": processor.cleaned_data,
+        "assets": processor.assets,
+        "report": report,
+    }
+
+
+if __name__ == "__main__":
+    configure_logging()
+
+    pdf_path = "Brochure/r413082.pdf"
+    try:
+        result = process_brochure_pdf(pdf_path)
+        print(result)
+    except Exception as e:
+        logger.exception("Processing failed")
+        print(f"[ERROR] {e}")
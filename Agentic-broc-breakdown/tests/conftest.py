@@ -0,0 +1,50 @@
+import io
+
+import fitz
+import pytest
+from PIL import Image, ImageDraw
+
+
+def _pattern_image(seed: int, size=(400, 300)) -> Image.Image:
+    """A deterministic, non-flat test image; different seeds hash apart."""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    step = 20 + 7 * seed
+    for i in range(0, size[0], step):
+        draw.rectangle([i, 0, i + step // 2, size[1] // 2 + i // 4], fill=(40 * seed % 256, 0, 0))
+    draw.ellipse([size[0] // 3, size[1] // 2, size[0] // 3 + 40 * (seed + 1), size[1] - 10], fill="navy")
+    return image
+
+
+@pytest.fixture
+def brochure(tmp_path):
+    """
+    A two-page PDF with a builder logo on page 0 and three amenity images on
+    page 1, and the matching extraction dict. Two amenities share a label
+    and a third is literally named like the suffixed duplicate.
+    """
+    boxes = [(0.05, 0.05, 0.45, 0.30), (0.55, 0.05, 0.95, 0.30), (0.05, 0.55, 0.45, 0.80)]
+    labels = ["Pool", "Pool", "Pool_1"]
+    pdf_path = str(tmp_path / "brochure.pdf")
+    with fitz.open() as doc:
+        for page_images in ([(0, (0.05, 0.05, 0.35, 0.20))], [(i + 1, box) for i, box in enumerate(boxes)]):
+            page = doc.new_page(width=595, height=842)
+            for seed, (l, t, r, b) in page_images:
+                buffer = io.BytesIO()
+                _pattern_image(seed).save(buffer, format="PNG")
+                page.insert_image(fitz.Rect(l * 595, t * 842, r * 595, b * 842), stream=buffer.getvalue(), keep_proportion=False)
+        doc.save(pdf_path)
+
+    ltrb = lambda box: ",".join(f"{v:.4f}" for v in box)
+    extraction = {
+        "projectName": "Test Project",
+        "builder": {"name": "Test Developers", "boundingBoxLTRB": ltrb((0.05, 0.05, 0.35, 0.20)), "pageNumber": 0},
+        "floorplanConfigs": [],
+        "amenitiesImages": [
+            {"amenityLabel": label, "boundingBoxLTRB": ltrb(box), "pageNumber": 1}
+            for label, box in zip(labels, boxes)
+        ],
+        "masterplanImage": {},
+        "locationMapImage": {},
+    }
+    return pdf_path, extraction
@@ -0,0 +1,67 @@
+import pytest
+
+from brochure_analyzer.bbox_validation import needs_page_sizes, validate_requests
+
+LETTER = {0: (612.0, 792.0), 1: (612.0, 792.0)}
+
+
+def _request(bbox, page=0, category="amenities", label="Pool", filename=None):
+    return {"category": category, "label": label, "page": page, "bbox": bbox, "filename": filename or f"{label}.jpg"}
+
+
+def test_normalized_box_is_kept_and_swapped_corners_are_fixed():
+    kept, diagnostics = validate_requests([_request("0.6, 0.5, 0.1, 0.2")])
+
+    assert [tuple(map(float, r["bbox"].split(","))) for r in kept] == [(0.1, 0.2, 0.6, 0.5)]
+    assert diagnostics[0]["unit"] == "normalized"
+    assert diagnostics[0]["flags"] == ["inverted"]
+    assert diagnostics[0]["status"] == "ok"
+
+
+def test_point_and_pixel_boxes_are_normalized_from_the_page_size():
+    requests = [
+        _request("61.2, 79.2, 605.88, 712.8", label="Points"),
+        # Too wide for the page at 144 DPI: the smallest DPI it fits is 150.
+        _request([127.5, 165, 1262.25, 1485], label="Pixels"),
+    ]
+    assert needs_page_sizes(requests)
+
+    kept, diagnostics = validate_requests(requests, page_sizes=LETTER)
+
+    assert [d["unit"] for d in diagnostics] == ["points", "pixels"]
+    assert diagnostics[1]["dpi"] == 150
+    for request in kept:
+        assert tuple(map(float, request["bbox"].split(","))) == pytest.approx((0.1, 0.1, 0.99, 0.9))
+
+
+def test_normalized_boxes_do_not_need_page_sizes():
+    assert not needs_page_sizes([_request("0.1,0.1,0.5,0.5"), _request(None)])
+
+
+@pytest.mark.parametrize("bbox, page, reason", [
+    (None, 0, "missing or unparseable bbox"),
+    ("0.1,0.1,0.102,0.5", 0, "degenerate bbox"),
+    ("0.1,0.1,0.5,0.5", 5, "page out of range"),
+    ("0.1,0.1,0.5,0.5", "cover", "invalid page number"),
+    ("900,900,1200,1200", 0, "unknown bbox unit (coordinates do not fit the page)"),
+])
+def test_invalid_boxes_are_rejected_with_a_reason(bbox, page, reason):
+    kept, diagnostics = validate_requests([_request(bbox, page=page)], page_sizes={0: (10.0, 10.0)}, page_count=2)
+
+    assert kept == []
+    assert diagnostics[0]["status"] == "rejected"
+    assert diagnostics[0]["reason"] == reason
+
+
+def test_near_duplicates_merge_into_the_first_box_of_their_category():
+    requests = [
+        _request("0.1,0.1,0.5,0.5", filename="Pool.jpg"),
+        _request("0.1,0.1,0.5,0.51", filename="Pool_1.jpg"),
+        _request("0.1,0.1,0.5,0.5", category="floorplan", filename="2BHK.jpg"),
+        _request("0.1,0.1,0.5,0.5", page=1, filename="Gym.jpg"),
+    ]
+    kept, diagnostics = validate_requests(requests)
+
+    assert [r["filename"] for r in kept] == ["Pool.jpg", "2BHK.jpg", "Gym.jpg"]
+    assert diagnostics[1]["reason"] == "duplicate bbox"
+    assert diagnostics[1]["merged_into"] == "Pool.jpg"
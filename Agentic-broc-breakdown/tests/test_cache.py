@@ -0,0 +1,83 @@
+import os
+import json
+from types import SimpleNamespace
+
+import fitz
+
+from brochure_analyzer.cache import ResultCache, cache_key, hash_file, output_name, output_project
+from brochure_analyzer.wrapper import process_brochure_pdf
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def test_cache_key_variants():
+    pdf_hash, schema_hash = "a" * 64, "b" * 64
+    assert cache_key(pdf_hash, schema_hash) == "a" * 32 + "-" + "b" * 16
+    assert cache_key(pdf_hash, schema_hash, "page_filter:score:0.5") != cache_key(pdf_hash, schema_hash)
+    assert cache_key(pdf_hash, schema_hash, "x") == cache_key(pdf_hash, schema_hash, "x")
+
+
+def test_output_names_round_trip():
+    name = output_name("r413082", "0123456789abcdef")
+    assert name == "r413082-01234567"
+    assert output_project(name) == "r413082"
+    assert output_project("legacy-project") == "legacy-project"
+
+
+def test_put_get_and_eviction_spare_the_new_entry(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    source = _write_json(tmp_path / "a.json", {"extraction": {"x": "y" * 600}})
+    first = cache.put("k1-s", source, "a")
+    assert os.path.exists(first)
+    assert cache.get("k1-s")["project_name"] == "a"
+
+    # The second entry alone exceeds max_bytes: the older one goes, the new one stays.
+    second = cache.put("k2-s", _write_json(tmp_path / "b.json", {"extraction": {"x": "z" * 1200}}), "b")
+    assert os.path.exists(second)
+    assert cache.get("k2-s") is not None
+    assert cache.get("k1-s") is None
+
+
+def test_purge_schema(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    source = _write_json(tmp_path / "a.json", {})
+    cache.put(cache_key("1" * 64, "old" * 10), source, "a")
+    cache.put(cache_key("2" * 64, "new" * 10), source, "b")
+    assert cache.purge_schema("new" * 10) == 1
+    assert cache.stats()["entries"] == 1
+
+
+def _pdf(path, text):
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), text)
+        doc.save(str(path))
+    return str(path)
+
+
+def _fake_parse(pdf_path, extraction_schema=None, result_save_dir=None):
+    result_path = os.path.join(result_save_dir, f"{hash_file(pdf_path)[:12]}.json")
+    _write_json(result_path, {"markdown": f"# {pdf_path}", "extraction": {"projectName": pdf_path}})
+    return [SimpleNamespace(result_path=result_path)]
+
+
+def test_same_file_name_different_pdfs_get_separate_outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "one").mkdir()
+    (tmp_path / "two").mkdir()
+    cache = ResultCache(str(tmp_path / "Cache"))
+    first = process_brochure_pdf(_pdf(tmp_path / "one" / "tower.pdf", "one"), cache=cache, parse_fn=_fake_parse)
+    second = process_brochure_pdf(_pdf(tmp_path / "two" / "tower.pdf", "two"), cache=cache, parse_fn=_fake_parse)
+
+    assert first["project_name"] == second["project_name"] == "tower"
+    assert first["project_data_dir"] != second["project_data_dir"]
+    assert first["response_path"] != second["response_path"]
+
+    # A renamed copy of the first PDF is a cache hit pointing at the first PDF's outputs.
+    renamed = tmp_path / "renamed.pdf"
+    renamed.write_bytes((tmp_path / "one" / "tower.pdf").read_bytes())
+    again = process_brochure_pdf(str(renamed), cache=cache, parse_fn=_fake_parse)
+    assert again["cache_hit"] and again["project_data_dir"] == first["project_data_dir"]
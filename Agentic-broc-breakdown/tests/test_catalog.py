@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from brochure_analyzer.cache import output_name
+from brochure_analyzer.catalog import Catalog, catalog_outputs, normalize_bhk, parse_area, parse_distance, parse_percent
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,250 sq.ft.", (1250.0, 1250.0)),
+    ("950", (950.0, 950.0)),
+    (1000, (1000.0, 1000.0)),
+    ("116.13 Sq. Mtr", (1250.01, 1250.01)),
+    ("120 sq.yd", (1080.0, 1080.0)),
+    ("2.5 Acres", (108900.0, 108900.0)),
+    ("1200 - 1300 SFT", (1200.0, 1300.0)),
+])
+def test_parse_area_units_and_ranges(text, expected):
+    assert parse_area(text) == pytest.approx(expected, abs=0.01)
+
+
+@pytest.mark.parametrize("text", ["1250 sq.ft. (116.13 sq.m.)", "1,250 sqft / 116.13 sqm"])
+def test_parse_area_dual_unit_uses_first_value(text):
+    assert parse_area(text) == pytest.approx((1250.0, 1250.0))
+
+
+@pytest.mark.parametrize("text", ["65%", "Not Present", "not present", "", None])
+def test_parse_area_rejects_percentages_and_missing(text):
+    assert parse_area(text) is None
+
+
+def test_parse_percent():
+    assert parse_percent("65%") == 65.0
+    assert parse_percent("70 %") == 70.0
+    assert parse_percent("Not Present") is None
+
+
+@pytest.mark.parametrize("text, bhk, label, unit_type", [
+    ("3 BHK", 3.0, "3 BHK", "apartment"),
+    ("2BHK", 2.0, "2 BHK", "apartment"),
+    ("2.5 BHK", 2.5, "2.5 BHK", "apartment"),
+    ("3 BHK + Study", 3.0, "3 BHK", "apartment"),
+    ("Three Bedroom", 3.0, "3 BHK", "apartment"),
+    ("4 BHK Duplex", 4.0, "4 BHK", "duplex"),
+    ("1 RK", 0.0, "1 RK", "rk"),
+    ("Studio", 0.0, "Studio", "studio"),
+    ("Penthouse", None, None, "penthouse"),
+    ("Not Present", None, None, "unknown"),
+])
+def test_normalize_bhk(text, bhk, label, unit_type):
+    assert normalize_bhk(text) == {"bhk": bhk, "label": label, "unit_type": unit_type}
+
+
+def test_parse_distance():
+    assert parse_distance("2.5 Km") == {"km": 2.5, "minutes": None}
+    assert parse_distance("10 mins") == {"km": None, "minutes": 10.0}
+
+
+def _write_output(data_dir, project, pdf_hash, extraction):
+    project_dir = data_dir / output_name(project, pdf_hash)
+    project_dir.mkdir(parents=True)
+    (project_dir / "extracted_data.json").write_text(json.dumps(extraction), encoding="utf-8")
+
+
+def test_catalog_outputs_ingests_cleaned_json_and_finds_floorplans(tmp_path):
+    data_dir = tmp_path / "Data"
+    _write_output(data_dir, "Skyline", "0123456789abcdef", {
+        "projectName": "Skyline Towers",
+        "projectAddress": {"City": "Pune", "Locality": "Baner"},
+        "builder": {"name": "Acme Developers"},
+        "amenities": ["Swimming Pool", "Gym"],
+        "floorplanConfigs": [
+            {"bhkType": "2 BHK", "carpetArea": "850 sq.ft."},
+            {"bhkType": "3BHK", "carpetArea": "116.13 Sq. Mtr"},
+        ],
+    })
+    _write_output(data_dir, "Greenwood", "fedcba9876543210", {
+        "projectAddress": {"City": "Mumbai"},
+        "floorplanConfigs": [{"bhkType": "3 BHK", "carpetArea": "1,100 sq.ft."}],
+    })
+    catalog = Catalog(str(tmp_path / "Catalog"))
+
+    assert catalog_outputs(catalog, str(data_dir)) == 2
+    assert catalog.projects() == ["Greenwood", "Skyline"]
+    hits = catalog.find_floorplans(city="pune", bhk=3, min_sqft=1200, amenities=["swimming pool"])
+    assert [(hit["project"], hit["bhk_label"], hit["city"]) for hit in hits] == [("Skyline", "3 BHK", "Pune")]
+    assert [hit["project"] for hit in catalog.find_floorplans(bhk=3, max_sqft=1200)] == ["Greenwood"]
+
+    # Unchanged extractions are skipped on the next ingest.
+    assert catalog_outputs(catalog, str(data_dir)) == 0
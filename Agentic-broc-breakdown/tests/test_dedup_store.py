@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from PIL import Image, ImageDraw
+
+from brochure_analyzer.dedup_store import DedupStore, _bands, dhash, hamming, pixel_hash
+
+
+@pytest.fixture
+def images():
+    base = Image.new("RGB", (400, 300), "white")
+    draw = ImageDraw.Draw(base)
+    for i in range(0, 400, 40):
+        draw.rectangle([i, 0, i + 20, 150 + i // 4], fill="black")
+    near = base.copy()
+    ImageDraw.Draw(near).rectangle([380, 290, 399, 299], fill="gray")
+    return base, near
+
+
+def _save(store, image, path, category=None):
+    return store.save(image, str(path), lambda p: image.save(p, format="JPEG"), category=category)
+
+
+def test_hashes(images):
+    base, near = images
+    assert dhash(base) == dhash(base.resize((200, 150)))
+    assert hamming(dhash(base), dhash(near)) <= 4
+    assert pixel_hash(base) == pixel_hash(base.copy())
+    assert pixel_hash(base) != pixel_hash(near)
+    assert hamming(0b1011, 0b0001) == 2
+
+
+def test_bands_agree_within_max_distance():
+    value = 0x0123456789ABCDEF
+    flipped = value ^ (1 << 3) ^ (1 << 40)  # two bits apart
+    assert any(a == b for a, b in zip(_bands(value, 3), _bands(flipped, 3)))
+
+
+def test_exact_and_near_matches_share_a_blob(tmp_path, images):
+    base, near = images
+    store = DedupStore(str(tmp_path / "store"))
+    first = _save(store, base, tmp_path / "a.jpg", "amenities")
+    again = _save(store, base, tmp_path / "b.jpg", "amenities")
+    close = _save(store, near, tmp_path / "c.jpg", "amenities")
+
+    assert again["exact"] and again["id"] == first["id"]
+    assert not close["exact"] and close["id"] == first["id"]
+    stats = store.stats()
+    assert (stats["misses"], stats["exact_hits"], stats["near_hits"]) == (1, 1, 1)
+    assert os.path.samefile(tmp_path / "a.jpg", tmp_path / "c.jpg")
+
+
+def test_floorplans_only_reuse_identical_pixels(tmp_path, images):
+    base, near = images
+    store = DedupStore(str(tmp_path / "store"))
+    first = _save(store, base, tmp_path / "a.jpg", "floorplan")
+    close = _save(store, near, tmp_path / "b.jpg", "floorplan")
+    again = _save(store, base, tmp_path / "c.jpg", "floorplan")
+
+    assert close["id"] != first["id"]
+    assert again["exact"] and again["id"] == first["id"]
+
+
+def test_flat_images_never_near_match(tmp_path):
+    store = DedupStore(str(tmp_path / "store"))
+    white = _save(store, Image.new("RGB", (200, 200), "white"), tmp_path / "w.jpg")
+    grey = _save(store, Image.new("RGB", (200, 200), (250, 250, 250)), tmp_path / "g.jpg")
+    assert white["id"] != grey["id"]
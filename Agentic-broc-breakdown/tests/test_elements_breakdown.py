@@ -0,0 +1,146 @@
+import io
+import os
+
+import fitz
+import pytest
+from PIL import Image
+
+from brochure_analyzer.dedup_store import DedupStore
+from brochure_analyzer.elements_breakdown import BrochureProcessor
+
+
+def _process(brochure, output_dir, **kwargs):
+    pdf_path, extraction = brochure
+    return BrochureProcessor(
+        source_pdf_path=pdf_path,
+        extracted_json_data=extraction,
+        output_dir=str(output_dir),
+        min_resolution={},
+        **kwargs,
+    ).process_all()
+
+
+def _pixels(brochure, **kwargs):
+    pdf_path, extraction = brochure
+    processor = BrochureProcessor(
+        pdf_path, extraction, output_dir=None, min_resolution={},
+        output_settings={"default": {"format": "png"}}, **kwargs,
+    )
+    processor.process_all()
+    return {asset["filename"]: Image.open(io.BytesIO(asset["data"])).tobytes() for asset in processor.assets}
+
+
+@pytest.fixture
+def vector_brochure(tmp_path):
+    pdf_path = str(tmp_path / "vector.pdf")
+    with fitz.open() as doc:
+        page = doc.new_page(width=595, height=842)
+        for i in range(12):
+            page.draw_rect(fitz.Rect(40 + 40 * i, 60 + 13 * i, 75 + 40 * i, 300 - 7 * i), color=(0, 0, 0.6), width=1.3)
+            page.draw_line(fitz.Point(30, 320 + 21.7 * i), fitz.Point(560, 340 + 19.3 * i), width=0.7)
+        page.insert_text((60, 700), "3 BHK  1,250 sq.ft.", fontsize=23)
+        page.insert_text((52, 160), "Living 14'0\" x 12'6\"", fontsize=17)
+        doc.save(pdf_path)
+    extraction = {
+        "floorplanConfigs": [
+            {"bhkType": "3 BHK", "boundingBoxLTRB": "0.0613,0.0521,0.5187,0.3911", "pageNumber": 0},
+            {"bhkType": "2 BHK", "boundingBoxLTRB": "0.3011,0.3377,0.9499,0.8607", "pageNumber": 0},
+        ],
+    }
+    return pdf_path, extraction
+
+
+@pytest.mark.parametrize("dpi", [150, 300])
+def test_clip_mode_matches_page_mode_on_vector_pages(vector_brochure, dpi):
+    page = _pixels(vector_brochure, dpi=dpi)
+    assert len(page) == 2
+    assert _pixels(vector_brochure, dpi=dpi, render_mode="clip") == page
+
+
+def test_tiled_clip_mode_matches_page_mode_on_text_and_rectangles(vector_brochure, monkeypatch):
+    pdf_path, _ = vector_brochure
+    brochure = (pdf_path, {"floorplanConfigs": [
+        {"bhkType": "3 BHK", "boundingBoxLTRB": "0.0613,0.0521,0.5187,0.3700", "pageNumber": 0},
+    ]})
+    tiled = []
+    render_tiled = BrochureProcessor._render_tiled
+    monkeypatch.setattr(BrochureProcessor, "_render_tiled", lambda self, *a: tiled.append(a) or render_tiled(self, *a))
+
+    page = _pixels(brochure)
+    assert _pixels(brochure, render_mode="clip", max_asset_bytes=6_000_000) == page
+    assert tiled
+
+
+
+def test_crop_over_the_asset_cap_is_spilled_at_full_dpi(vector_brochure, monkeypatch):
+    pdf_path, _ = vector_brochure
+    brochure = (pdf_path, {"floorplanConfigs": [
+        {"bhkType": "3 BHK", "boundingBoxLTRB": "0.0613,0.0521,0.5187,0.3700", "pageNumber": 0},
+    ]})
+    spilled = []
+    crop_buffer = BrochureProcessor._crop_buffer
+
+    def record(self, size):
+        buffer, spill = crop_buffer(self, size)
+        spilled.append(spill)
+        return buffer, spill
+
+    monkeypatch.setattr(BrochureProcessor, "_crop_buffer", record)
+
+    page = _pixels(brochure, dpi=300)
+    clip = _pixels(brochure, dpi=300, render_mode="clip", max_asset_bytes=1_000_000)
+    assert spilled and all(spilled)
+    assert clip == page
+
+@pytest.mark.parametrize("dpi", [150, 300])
+def test_clip_mode_matches_page_mode_on_raster_pages(brochure, dpi):
+    page = _pixels(brochure, dpi=dpi)
+    assert len(page) == 4
+    assert _pixels(brochure, dpi=dpi, render_mode="clip") == page
+
+
+def test_repeated_amenity_labels_get_unique_names(brochure, tmp_path):
+    names = set()
+    for _ in range(3):
+        report = _process(brochure, tmp_path / "out", workers=4)
+        amenities = sorted(os.path.basename(e["path"]) for e in report["saved"] if e["category"] == "amenities")
+        assert amenities == ["Pool.jpg", "Pool_1.jpg", "Pool_1_1.jpg"]
+        names.add(tuple(amenities))
+    assert len(names) == 1
+
+
+def test_incremental_rerun_only_redoes_changed_assets(brochure, tmp_path):
+    pdf_path, extraction = brochure
+    first = _process(brochure, tmp_path / "out", workers=4)
+    mtimes = {e["path"]: os.stat(e["path"]).st_mtime_ns for e in first["saved"]}
+
+    again = _process(brochure, tmp_path / "out", workers=4, incremental=True)
+    assert (len(again["saved"]), len(again["unchanged"])) == (0, len(first["saved"]))
+    assert {path: os.stat(path).st_mtime_ns for path in mtimes} == mtimes
+
+    changed = dict(extraction, amenitiesImages=[
+        dict(extraction["amenitiesImages"][0], boundingBoxLTRB="0.0600,0.0600,0.4400,0.2900"),
+        extraction["amenitiesImages"][1],
+    ])
+    report = _process((pdf_path, changed), tmp_path / "out", incremental=True)
+    assert [os.path.basename(e["path"]) for e in report["saved"]] == ["Pool.jpg"]
+    assert [os.path.basename(e["path"]) for e in report["removed"]] == ["Pool_1_1.jpg"]
+    assert not os.path.exists(report["removed"][0]["path"])
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_rewriting_a_project_leaves_deduplicated_copies_alone(brochure, tmp_path):
+    store = DedupStore(str(tmp_path / "store"))
+    _process(brochure, tmp_path / "a", dedup_store=store)
+    shared = _process(brochure, tmp_path / "b", dedup_store=store)["saved"]
+    assert all(os.stat(e["path"]).st_nlink > 1 for e in shared)
+    before = {e["path"]: _read(e["path"]) for e in shared}
+
+    # Re-extracting project A without the store must replace its files, not
+    # write through the hard links into the blobs B shares.
+    _process(brochure, tmp_path / "a", output_settings={"default": {"format": "jpeg", "quality": 5}})
+    assert {path: _read(path) for path in before} == before
@@ -0,0 +1,80 @@
+import os
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+from brochure_analyzer.page_filter import FilteredParser, select_pages
+
+PAGE_TEXT = [
+    "Skyline Residences by Acme Developers",
+    "",
+    "3 BHK floor plan  Carpet area 1,200 sq.ft.  Balcony  Kitchen",
+    "",
+    "RERA No. P52100012345  Contact us",
+]
+
+
+def _pdf_bytes():
+    with fitz.open() as doc:
+        for text in PAGE_TEXT:
+            page = doc.new_page()
+            if text:
+                page.insert_text((72, 72), text)
+        return doc.tobytes()
+
+
+class _FakeParse:
+    """Reports one floorplan on the second page it was given and one on a page it was not."""
+
+    def __init__(self):
+        self.page_counts = []
+
+    def __call__(self, pdf, extraction_schema=None, result_save_dir=None, **kwargs):
+        with (fitz.open(stream=pdf, filetype="pdf") if isinstance(pdf, bytes) else fitz.open(pdf)) as doc:
+            self.page_counts.append(doc.page_count)
+        extraction = {"floorplanConfigs": [
+            {"bhkType": "3 BHK", "pageNumber": 1},
+            {"bhkType": "4 BHK", "pageNumber": 9},
+        ]}
+        return [SimpleNamespace(result_path=None, markdown="# Skyline", extraction=extraction)]
+
+
+def test_select_pages_modes():
+    scores = [
+        {"page": 0, "text_score": 0, "large_images": 0, "text_chars": 10},
+        {"page": 1, "text_score": 0, "large_images": 0, "text_chars": 0},
+        {"page": 2, "text_score": 9, "large_images": 0, "text_chars": 50},
+        {"page": 3, "text_score": 1, "large_images": 1, "text_chars": 5},
+        {"page": 4, "text_score": 0, "large_images": 0, "text_chars": 0},
+    ]
+    assert select_pages(scores, "conservative") == [0, 2, 3, 4]
+    assert select_pages(scores, "aggressive", min_score=3) == [0, 2, 3]
+    with pytest.raises(ValueError):
+        select_pages(scores, "reckless")
+
+
+def test_bytes_input_is_filtered_and_remapped_in_memory():
+    parse = _FakeParse()
+    parser = FilteredParser(parse)
+    result = parser(_pdf_bytes())
+
+    assert parse.page_counts == [3]
+    assert parser.last_report["kept_pages"] == [0, 2, 4]
+    assert parser.last_report["bytes_saved"] >= 0
+    assert result[0].result_path is None
+    # Reduced page 1 is original page 2; page 9 does not exist and is dropped.
+    assert [c["pageNumber"] for c in result[0].extraction["floorplanConfigs"]] == [2, None]
+
+
+def test_path_input_writes_the_result(tmp_path):
+    pdf_path = tmp_path / "skyline.pdf"
+    pdf_path.write_bytes(_pdf_bytes())
+    result = FilteredParser(_FakeParse())(str(pdf_path), result_save_dir=str(tmp_path / "out"))
+
+    assert os.path.basename(result[0].result_path).startswith("skyline_")
+    assert [c["pageNumber"] for c in result[0].extraction["floorplanConfigs"]] == [2, None]
+
+
+def test_cache_variant_names_the_mode():
+    assert FilteredParser(_FakeParse()).cache_variant != FilteredParser(_FakeParse(), mode="aggressive").cache_variant
@@ -0,0 +1,97 @@
+import pytest
+
+from brochure_analyzer.parse_dispatch import (
+    AIMDLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    ParseDispatcher,
+    backoff_delay,
+    is_retryable_error,
+    is_throttle_error,
+)
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code, message="error"):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_error_classification():
+    assert is_throttle_error(_StatusError(429))
+    assert is_throttle_error(RuntimeError("Too Many Requests"))
+    assert is_retryable_error(_StatusError(503))
+    assert is_retryable_error(TimeoutError())
+    assert not is_retryable_error(_StatusError(400))
+    assert not is_retryable_error(ValueError("encrypted PDF"))
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base_delay=1.0, max_delay=5.0) <= min(5.0, 2 ** attempt)
+
+
+def _flaky(errors, result="ok"):
+    calls = []
+
+    def parse(*args, **kwargs):
+        calls.append(args)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return parse, calls
+
+
+def test_retries_transient_errors_then_succeeds():
+    parse, calls = _flaky([_StatusError(503), TimeoutError("timed out")])
+    dispatcher = ParseDispatcher(parse, base_delay=0.001, max_delay=0.001)
+    assert dispatcher("doc.pdf") == "ok"
+    metrics = dispatcher.metrics()
+    assert len(calls) == 3
+    assert (metrics["retries"], metrics["successes"], metrics["failures"]) == (2, 1, 0)
+
+
+def test_document_errors_are_not_retried_and_keep_the_circuit_closed():
+    breaker = CircuitBreaker(failure_threshold=2)
+    dispatcher = ParseDispatcher(lambda pdf: (_ for _ in ()).throw(ValueError("bad pdf")), breaker=breaker)
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            dispatcher("doc.pdf")
+    assert dispatcher.metrics()["attempts"] == 5
+    assert breaker.state == "closed"
+
+
+def test_transient_failures_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    parse, calls = _flaky([_StatusError(503)] * 10)
+    dispatcher = ParseDispatcher(parse, max_retries=0, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(_StatusError):
+            dispatcher("doc.pdf")
+    with pytest.raises(CircuitOpenError):
+        dispatcher("doc.pdf")
+    assert len(calls) == 2
+    assert dispatcher.metrics()["circuit_rejections"] == 1
+
+
+def test_half_open_breaker_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.allow()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_aimd_limiter_halves_once_per_round_trip():
+    limiter = AIMDLimiter(initial=8, minimum=1)
+    issued = [0.0] * 3
+    for _ in issued:
+        limiter.acquire()
+    limiter.release(throttled=True, issued_at=issued[0])
+    limiter.release(throttled=True, issued_at=issued[1])  # issued before the decrease
+    assert limiter.limit == 4
+    limiter.release()
+    assert limiter.limit == pytest.approx(4.25)
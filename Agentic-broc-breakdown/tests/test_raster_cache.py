@@ -0,0 +1,63 @@
+import os
+
+from PIL import Image
+
+from brochure_analyzer.elements_breakdown import BrochureProcessor
+from brochure_analyzer.raster_cache import RasterCache
+
+
+def _put(cache, image, page=0, pdf_hash="a" * 64):
+    cache.put(pdf_hash, page, 150, image.tobytes(), image.width, image.height, image.width * 3)
+
+
+def test_round_trip_and_keying(tmp_path):
+    cache = RasterCache(str(tmp_path / "rasters"))
+    image = Image.linear_gradient("L").convert("RGB").resize((64, 48))
+    _put(cache, image)
+
+    hit = cache.get("a" * 64, 0, 150)
+    assert hit.size == (64, 48) and hit.tobytes() == image.tobytes()
+    assert cache.get("a" * 64, 1, 150) is None
+    assert cache.get("a" * 64, 0, 300) is None
+    assert cache.get("b" * 64, 0, 150) is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_corrupt_entries_are_discarded(tmp_path):
+    cache = RasterCache(str(tmp_path / "rasters"))
+    _put(cache, Image.new("RGB", (8, 8), "red"))
+    path = cache._path("a" * 64, 0, 150, "rgb")
+    with open(path, "r+b") as f:
+        f.truncate(30)
+    assert cache.get("a" * 64, 0, 150) is None
+    assert not os.path.exists(path)
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    image = Image.new("RGB", (32, 32), "blue")
+    entry_bytes = 24 + 32 * 32 * 3
+    cache = RasterCache(str(tmp_path / "rasters"), max_bytes=2 * entry_bytes)
+    _put(cache, image, page=0)
+    _put(cache, image, page=1)
+    os.utime(cache._path("a" * 64, 0, 150, "rgb"), (1, 1))  # page 0 is the oldest
+    _put(cache, image, page=2)
+    assert cache.get("a" * 64, 0, 150) is None
+    assert cache.get("a" * 64, 1, 150) is not None
+    assert cache.get("a" * 64, 2, 150) is not None
+
+
+def test_cached_rasters_give_identical_assets(brochure, tmp_path):
+    pdf_path, extraction = brochure
+    cache = RasterCache(str(tmp_path / "rasters"))
+
+    def run(output_dir):
+        report = BrochureProcessor(
+            pdf_path, extraction, output_dir=str(output_dir), min_resolution={}, raster_cache=cache,
+        ).process_all()
+        return {os.path.basename(e["path"]): open(e["path"], "rb").read() for e in report["saved"]}
+
+    cold = run(tmp_path / "cold")
+    misses = cache.misses
+    warm = run(tmp_path / "warm")
+    assert warm == cold
+    assert cache.misses == misses and cache.hits >= 2
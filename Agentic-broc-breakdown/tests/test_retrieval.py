@@ -0,0 +1,87 @@
+import pytest
+
+from brochure_analyzer.retrieval import RetrievalIndex, chunk_markdown, index_outputs, make_chunks
+from brochure_analyzer.cache import output_name
+
+CHUNKS = {
+    "Skyline": [
+        {"text": "3 BHK apartments with 1,250 sq.ft. carpet area"},
+        {"text": "Clubhouse with swimming pool and gym"},
+    ],
+    "Greenwood": [
+        {"text": "Villa plots next to the metro station"},
+        {"text": "Possession in December, RERA registered"},
+    ],
+}
+
+
+def _hits(index, query, **kwargs):
+    return [(hit["project"], hit["text"]) for hit in index.search(query, k=10, **kwargs)]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = RetrievalIndex(str(tmp_path / "Index"))
+    for project, chunks in CHUNKS.items():
+        index.add_project(project, chunks)
+    return index
+
+
+def test_search_ranks_matching_chunks_and_filters_by_project(index):
+    assert _hits(index, "swimming pool")[0] == ("Skyline", "Clubhouse with swimming pool and gym")
+    assert _hits(index, "metro station", projects="Skyline") == []
+    assert index.projects() == ["Greenwood", "Skyline"]
+
+
+def test_re_adding_a_project_replaces_its_chunks(index):
+    index.add_project("Skyline", [{"text": "Rooftop infinity pool"}])
+
+    assert [text for _, text in _hits(index, "pool", projects="Skyline")] == ["Rooftop infinity pool"]
+    assert index.stats()["chunks"] == 3
+
+
+def test_reader_follows_another_writer_incrementally(index, tmp_path):
+    reader = RetrievalIndex(str(tmp_path / "Index"))
+    queries = ["pool", "metro station", "possession rera", "3 bhk carpet area"]
+    assert reader.stats()["chunks"] == 4
+
+    steps = [
+        lambda: index.add_project("Lakeview", [{"text": "Lake facing 2 BHK with pool deck"}]),
+        lambda: index.add_project("Skyline", [{"text": "Rooftop infinity pool"}]),
+        lambda: index.delete_project("Greenwood"),
+        lambda: index.add_project("Greenwood", [{"text": "Metro station in 5 mins"}]),
+        index.compact,
+        lambda: index.add_project("Skyline", [{"text": "Pool and spa"}]),
+    ]
+    for step in steps:
+        step()
+        fresh = RetrievalIndex(str(tmp_path / "Index"))
+        assert reader.stats() == fresh.stats()
+        for query in queries:
+            assert reader.search(query, k=10) == fresh.search(query, k=10)
+
+
+def test_chunks_keep_source_pages_and_extraction_fields():
+    markdown = "<!-- text, from page 0 -->\nSkyline Towers\n\n<!-- text, from page 3 -->\nAmenities: pool"
+    assert [(c["text"], c["page"]) for c in chunk_markdown(markdown)] == [
+        ("Skyline Towers", 0), ("Amenities: pool", 3),
+    ]
+
+    chunks = make_chunks(None, {"projectName": "Skyline", "floorplanConfigs": [
+        {"bhkType": "3 BHK", "boundingBoxLTRB": "0.1,0.1,0.5,0.5", "pageNumber": 2},
+    ]})
+    assert [(c["source"], c["field"], c["text"]) for c in chunks] == [
+        ("extraction", "projectName", "projectName: Skyline"),
+        ("extraction", "floorplanConfigs[0]", "Skyline - floorplanConfigs[0]: bhkType: 3 BHK"),
+    ]
+
+
+def test_index_outputs_uses_the_project_name_without_the_pdf_hash(tmp_path):
+    name = output_name("Skyline", "0123456789abcdef")
+    (tmp_path / "Data" / name).mkdir(parents=True)
+    (tmp_path / "Responses").mkdir()
+    (tmp_path / "Responses" / f"{name}.md").write_text("Clubhouse with swimming pool", encoding="utf-8")
+    index = RetrievalIndex(str(tmp_path / "Index"))
+
+    assert index_outputs(index, str(tmp_path / "Data"), str(tmp_path / "Responses")) == 1
+    assert _hits(index, "pool") == [("Skyline", "Clubhouse with swimming pool")]
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import http.client
+
+import pytest
+
+from brochure_analyzer.service import BrochureService, JobQueue, QueueFull, _run_job
+
+PDF = b"%PDF-1.4\n% test brochure\n"
+
+
+def _fake_process(pdf_bytes, project_name, output_dir, **kwargs):
+    with open(os.path.join(output_dir, "asset.jpg"), "wb") as f:
+        f.write(pdf_bytes)
+    return {
+        "project_name": project_name, "cache_hit": False, "markdown": "# Brochure", "assets": [],
+        "report": {"saved": [], "skipped": [], "errors": []}, "timings": {},
+    }
+
+
+class _Metrics:
+    def __init__(self, **kwargs):
+        pass
+
+
+def _run(queue, job, worker, process_fn=_fake_process):
+    _run_job(queue, job, worker, None, None, None, None, _Metrics, process_fn)
+
+
+def test_submit_deduplicates_and_claims_by_priority(tmp_path):
+    queue = JobQueue(str(tmp_path), max_queued=2)
+    low, created = queue.submit(PDF, name="low")
+    same, again = queue.submit(PDF, name="low", priority=3)
+    high, _ = queue.submit(PDF + b"%2", name="high", priority=1)
+
+    assert created and not again and same["id"] == low["id"]
+    with pytest.raises(QueueFull):
+        queue.submit(PDF + b"%3", name="third")
+    assert queue.claim("w1")["id"] == low["id"]  # raised to priority 3
+    assert queue.claim("w1")["id"] == high["id"]
+    assert queue.claim("w1") is None
+
+
+def test_finished_job_points_at_its_attempt_and_releases_the_upload(tmp_path):
+    queue = JobQueue(str(tmp_path))
+    job, _ = queue.submit(PDF, name="skyline")
+    claimed = queue.claim("w1")
+    _run(queue, claimed, "w1")
+
+    done = queue.get(job["id"])
+    assert done["status"] == "done"
+    assert done["output_dir"] == claimed["attempt_dir"] == os.path.join(job["output_dir"], "attempt-1")
+    assert done["result"]["response_path"] == os.path.join(done["output_dir"], "response.md")
+    assert not os.path.exists(job["upload_path"])
+    assert [event["type"] for event in queue.events(job["id"])] == ["queued", "running", "done"]
+
+
+def test_attempt_that_lost_its_lease_is_discarded(tmp_path):
+    queue = JobQueue(str(tmp_path), lease_seconds=0.3)
+    job, _ = queue.submit(PDF, name="skyline")
+    first = queue.claim("w1")
+    taken_over = {}
+
+    def stalled(pdf_bytes, project_name, output_dir, **kwargs):
+        # w1 stalls past its lease and the job is handed to w2.
+        result = _fake_process(pdf_bytes, project_name, output_dir)
+        assert queue.requeue_expired(everything=True) == 1
+        taken_over["job"] = queue.claim("w2")
+        time.sleep(0.5)
+        return result
+
+    _run(queue, first, "w1", stalled)
+    assert not os.path.exists(first["attempt_dir"])
+    assert queue.get(job["id"])["status"] == "running"
+
+    second = taken_over["job"]
+    _run(queue, second, "w2")
+    assert queue.get(job["id"])["output_dir"] == second["attempt_dir"] == os.path.join(job["output_dir"], "attempt-2")
+    assert sorted(os.listdir(job["output_dir"])) == ["attempt-2"]
+    assert sorted(os.listdir(second["attempt_dir"])) == ["asset.jpg", "response.md", "result.json"]
+
+
+def test_cancel_removes_the_upload_of_a_queued_job(tmp_path):
+    queue = JobQueue(str(tmp_path))
+    job, _ = queue.submit(PDF, name="skyline")
+
+    assert queue.cancel(job["id"])
+    assert queue.get(job["id"])["status"] == "cancelled"
+    assert not os.path.exists(job["upload_path"])
+    assert not queue.cancel(job["id"])
+
+
+def test_requeue_fails_jobs_after_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path), max_attempts=2)
+    job, _ = queue.submit(PDF, name="skyline")
+    for _ in range(2):
+        queue.claim("w1")
+        queue.requeue_expired(everything=True)
+
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["error"] == "Worker lost 2 times"
+
+
+@pytest.fixture
+def http_service(tmp_path):
+    # The HTTP front end only; no workers are started.
+    service = BrochureService(str(tmp_path / "Service"), workers=1)
+    server = service.serve(port=0)
+    yield service, server.server_port
+    service.stop()
+
+
+def _post(port, body, headers, path="/jobs?name=skyline"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.putrequest("POST", path)
+        for key, value in headers.items():
+            conn.putheader(key, value)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("length", ["-1", "twelve"])
+def test_post_rejects_a_malformed_content_length(http_service, length):
+    _, port = http_service
+    started = time.monotonic()
+    status, body = _post(port, PDF, {"Content-Type": "application/pdf", "Content-Length": length})
+
+    assert status == 400
+    assert "ValueError" in body["error"]
+    assert time.monotonic() - started < 5
+
+
+def test_post_accepts_pdf_bytes_but_not_server_paths(http_service, tmp_path):
+    service, port = http_service
+    pdf_path = tmp_path / "brochure.pdf"
+    pdf_path.write_bytes(PDF)
+
+    request = json.dumps({"pdf_path": str(pdf_path)}).encode("utf-8")
+    status, _ = _post(port, request, {"Content-Type": "application/json", "Content-Length": str(len(request))})
+    assert status == 400
+    assert service.queue.counts()["queued"] == 0
+
+    status, job = _post(port, PDF, {"Content-Type": "application/pdf", "Content-Length": str(len(PDF))})
+    assert status == 202
+    assert job["name"] == "skyline" and job["status"] == "queued"
+
+
+def test_get_rejects_an_invalid_query(http_service):
+    _, port = http_service
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("GET", "/jobs?limit=0")
+        assert conn.getresponse().status == 400
+    finally:
+        conn.close()
@@ -0,0 +1,114 @@
+import os
+import json
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+from brochure_analyzer.split_parse import NOT_PRESENT, SplitParser, merge_extractions, remap_page_numbers
+
+
+def test_remap_page_numbers_with_dict_and_callable():
+    extraction = {
+        "floorplanConfigs": [{"bhkType": "2 BHK", "pageNumber": 1}, {"bhkType": "3 BHK", "pageNumber": "x"}],
+        "builder": {"name": "B", "pageNumber": 0},
+        "masterplanImage": {"pageNumber": 7},
+    }
+    by_dict = remap_page_numbers(extraction, {0: 10, 1: 11})
+    assert [c["pageNumber"] for c in by_dict["floorplanConfigs"]] == [11, "x"]
+    assert by_dict["builder"]["pageNumber"] == 10
+    assert by_dict["masterplanImage"]["pageNumber"] is None  # not a page of the parsed document
+    assert extraction["builder"]["pageNumber"] == 0  # the input is not modified
+
+    by_offset = remap_page_numbers(extraction, lambda page: page + 20)
+    assert by_offset["floorplanConfigs"][0]["pageNumber"] == 21
+
+
+def test_merge_extractions():
+    parts = [
+        {
+            "projectName": "Skyline",
+            "floorplanConfigs": [{"bhkType": "2 BHK", "pageNumber": 1}],
+            "amenities": ["Pool", "Gym"],
+            "tower_names": NOT_PRESENT,
+            "masterplanImage": {"boundingBoxLTRB": NOT_PRESENT, "pageNumber": NOT_PRESENT},
+            "builder": {"name": "Acme", "boundingBoxLTRB": "0.1,0.1,0.2,0.2", "pageNumber": 0},
+        },
+        {
+            "projectName": "Skyline",
+            "floorplanConfigs": [{"bhkType": "2 BHK", "pageNumber": 1}, {"bhkType": "3 BHK", "pageNumber": 21}],
+            "amenities": ["pool", "Clubhouse"],
+            "tower_names": NOT_PRESENT,
+            "masterplanImage": {"boundingBoxLTRB": "0,0,1,1", "pageNumber": 22},
+            "builder": {"name": NOT_PRESENT, "boundingBoxLTRB": NOT_PRESENT, "pageNumber": NOT_PRESENT},
+        },
+        {"projectName": "Skyline Phase 2", "builder": {"name": "Acme"}},
+    ]
+    merged = merge_extractions(parts)
+
+    assert merged["projectName"] == "Skyline"
+    assert [c["bhkType"] for c in merged["floorplanConfigs"]] == ["2 BHK", "3 BHK"]
+    assert merged["amenities"] == ["Pool", "Gym", "Clubhouse"]
+    assert merged["tower_names"] == NOT_PRESENT
+    assert merged["masterplanImage"] == {"boundingBoxLTRB": "0,0,1,1", "pageNumber": 22}
+    assert merged["builder"] == {"name": "Acme", "boundingBoxLTRB": "0.1,0.1,0.2,0.2", "pageNumber": 0}
+
+
+def _pdf_bytes(pages):
+    with fitz.open() as doc:
+        for i in range(pages):
+            doc.new_page().insert_text((72, 72), f"Page {i}")
+        return doc.tobytes()
+
+
+class _FakeParse:
+    """Returns one floorplan on the first page of each chunk; fails each chunk once if asked."""
+
+    def __init__(self, flaky=False):
+        self.flaky = flaky
+        self.calls = []
+
+    def __call__(self, pdf, extraction_schema=None, result_save_dir=None, **kwargs):
+        self.calls.append(pdf)
+        if self.flaky and self.calls.count(pdf) == 1:
+            raise RuntimeError("transient")
+        extraction = {"floorplanConfigs": [{"bhkType": f"chunk {len(self.calls)}", "pageNumber": 1}]}
+        return [SimpleNamespace(result_path=None, markdown=os.path.basename(str(pdf)), extraction=extraction)]
+
+
+def test_split_parser_rebases_pages_of_bytes_input():
+    parser = SplitParser(_FakeParse(), chunk_pages=4, min_pages=5, max_workers=2)
+    result = parser(_pdf_bytes(10))
+
+    assert result[0].result_path is None
+    assert [c["pageNumber"] for c in result[0].extraction["floorplanConfigs"]] == [1, 5, 9]
+
+
+def test_split_parser_retries_failed_chunks(tmp_path):
+    pdf_path = tmp_path / "big.pdf"
+    pdf_path.write_bytes(_pdf_bytes(10))
+    parse = _FakeParse(flaky=True)
+    parser = SplitParser(parse, chunk_pages=4, min_pages=5, max_attempts=2, base_delay=0.01, max_delay=0.01)
+    result = parser(str(pdf_path), result_save_dir=str(tmp_path / "out"))
+
+    assert len(parse.calls) == 6
+    with open(result[0].result_path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert [c["pageNumber"] for c in saved["extraction"]["floorplanConfigs"]] == [1, 5, 9]
+    assert [c["first_page"] for c in saved["chunks"]] == [0, 4, 8]
+
+
+def test_split_parser_passes_small_documents_through():
+    parse = _FakeParse()
+    pdf = _pdf_bytes(3)
+    SplitParser(parse, min_pages=5)(pdf)
+    assert parse.calls == [pdf]
+
+
+def test_split_parser_gives_up_after_max_attempts():
+    def failing(pdf, **kwargs):
+        raise RuntimeError("down")
+
+    parser = SplitParser(failing, chunk_pages=4, min_pages=5, max_attempts=2, base_delay=0.01, max_delay=0.01)
+    with pytest.raises(RuntimeError, match="3 of 3 chunks failed"):
+        parser(_pdf_bytes(10))